@@ -0,0 +1,32 @@
+"""add ttl_entries for expiring key-value data
+
+Revision ID: a3d8f2c6e9b4
+Revises: f5c1d9e3a7b2
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8f2c6e9b4'
+down_revision: Union[str, None] = 'f5c1d9e3a7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ttl_entries',
+        sa.Column('namespace', sa.String(length=64), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('namespace', 'key'),
+    )
+    op.create_index(op.f('ix_ttl_entries_expires_at'), 'ttl_entries', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ttl_entries_expires_at'), table_name='ttl_entries')
+    op.drop_table('ttl_entries')
@@ -0,0 +1,40 @@
+"""add media blobs for content-addressed uploads
+
+Revision ID: c4f1a9d2e7b3
+Revises: 1f2741139c4e, abcdef123456, b8a7e7f1ca90
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+# This revision also merges the three existing heads.
+revision: str = 'c4f1a9d2e7b3'
+down_revision: Union[str, Sequence[str], None] = ('1f2741139c4e', 'abcdef123456', 'b8a7e7f1ca90')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('filename'),
+    )
+    op.create_index(op.f('ix_media_blobs_id'), 'media_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_media_blobs_sha256'), 'media_blobs', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_media_blobs_sha256'), table_name='media_blobs')
+    op.drop_index(op.f('ix_media_blobs_id'), table_name='media_blobs')
+    op.drop_table('media_blobs')
@@ -0,0 +1,29 @@
+"""add claim columns to social_media_posts
+
+Revision ID: c8a2e5d7f1b9
+Revises: b6e1f4a8d2c7
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a2e5d7f1b9'
+down_revision: Union[str, None] = 'b6e1f4a8d2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('social_media_posts', sa.Column('claimed_by', sa.String(length=64), nullable=True))
+    op.add_column('social_media_posts', sa.Column('lease_until', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_social_media_posts_status_scheduled_at', 'social_media_posts', ['status', 'scheduled_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_social_media_posts_status_scheduled_at', table_name='social_media_posts')
+    op.drop_column('social_media_posts', 'lease_until')
+    op.drop_column('social_media_posts', 'claimed_by')
@@ -0,0 +1,31 @@
+"""add retry bookkeeping to social_media_posts
+
+Revision ID: d4b9f3a6c2e8
+Revises: c8a2e5d7f1b9
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9f3a6c2e8'
+down_revision: Union[str, None] = 'c8a2e5d7f1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('social_media_posts', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('social_media_posts', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('social_media_posts', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index(
+        'ix_social_media_posts_status_next_attempt_at', 'social_media_posts', ['status', 'next_attempt_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_social_media_posts_status_next_attempt_at', table_name='social_media_posts')
+    op.drop_column('social_media_posts', 'last_error')
+    op.drop_column('social_media_posts', 'next_attempt_at')
+    op.drop_column('social_media_posts', 'attempts')
@@ -0,0 +1,44 @@
+"""add paystack webhook events
+
+Revision ID: d7e3b5a1c9f2
+Revises: c4f1a9d2e7b3
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e3b5a1c9f2'
+down_revision: Union[str, None] = 'c4f1a9d2e7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'paystack_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_key', sa.String(length=255), nullable=False),
+        sa.Column('event', sa.String(length=100), nullable=False),
+        sa.Column('reference', sa.String(length=255), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_key'),
+    )
+    op.create_index(op.f('ix_paystack_events_id'), 'paystack_events', ['id'], unique=False)
+    op.create_index(op.f('ix_paystack_events_reference'), 'paystack_events', ['reference'], unique=False)
+    op.create_index(op.f('ix_paystack_events_status'), 'paystack_events', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_paystack_events_status'), table_name='paystack_events')
+    op.drop_index(op.f('ix_paystack_events_reference'), table_name='paystack_events')
+    op.drop_index(op.f('ix_paystack_events_id'), table_name='paystack_events')
+    op.drop_table('paystack_events')
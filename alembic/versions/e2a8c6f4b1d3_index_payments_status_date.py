@@ -0,0 +1,22 @@
+"""index payments by status and date for reconciliation
+
+Revision ID: e2a8c6f4b1d3
+Revises: d7e3b5a1c9f2
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a8c6f4b1d3'
+down_revision: Union[str, None] = 'd7e3b5a1c9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_payments_status_payment_date', 'payments', ['status', 'payment_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payments_status_payment_date', table_name='payments')
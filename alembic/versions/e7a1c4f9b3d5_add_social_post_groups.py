@@ -0,0 +1,45 @@
+"""add social post groups for multi-platform posts
+
+Revision ID: e7a1c4f9b3d5
+Revises: d4b9f3a6c2e8
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c4f9b3d5'
+down_revision: Union[str, None] = 'd4b9f3a6c2e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'social_post_groups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('content_type', sa.String(length=50), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=True),
+        sa.Column('video_url', sa.String(length=255), nullable=True),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_social_post_groups_id'), 'social_post_groups', ['id'], unique=False)
+    with op.batch_alter_table('social_media_posts') as batch_op:
+        batch_op.add_column(sa.Column('group_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_social_media_posts_group_id', 'social_post_groups', ['group_id'], ['id'], ondelete='CASCADE'
+        )
+        batch_op.create_index(op.f('ix_social_media_posts_group_id'), ['group_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('social_media_posts') as batch_op:
+        batch_op.drop_index(op.f('ix_social_media_posts_group_id'))
+        batch_op.drop_constraint('fk_social_media_posts_group_id', type_='foreignkey')
+        batch_op.drop_column('group_id')
+    op.drop_index(op.f('ix_social_post_groups_id'), table_name='social_post_groups')
+    op.drop_table('social_post_groups')
@@ -0,0 +1,32 @@
+"""add leases for cross-worker coordination
+
+Revision ID: f5c1d9e3a7b2
+Revises: e2a8c6f4b1d3
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c1d9e3a7b2'
+down_revision: Union[str, None] = 'e2a8c6f4b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'leases',
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('owner', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index(op.f('ix_leases_expires_at'), 'leases', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_leases_expires_at'), table_name='leases')
+    op.drop_table('leases')
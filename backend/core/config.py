@@ -13,9 +13,64 @@ class Settings(BaseSettings):
     EMAIL_HOST: str
     EMAIL_PORT: int
     POST_SCHEDULER_INTERVAL: int = 60
+    POST_SCHEDULER_SAFETY_POLL_SECONDS: int = 300
+    SOCIAL_DISPATCH_TIMEOUT_SECONDS: float = 30.0
+    SOCIAL_CLAIM_BATCH_SIZE: int = 100
+    SOCIAL_RETRY_MAX_ATTEMPTS: int = 5
+    SOCIAL_RETRY_BASE_SECONDS: float = 60.0
+    SOCIAL_RETRY_MAX_SECONDS: float = 3600.0
+    SOCIAL_DEFAULT_CONCURRENCY: int = 2
+    SOCIAL_PLATFORM_CONCURRENCY: dict[str, int] = {"facebook": 4, "x": 4, "instagram": 2}
+    SOCIAL_PLATFORM_RATE_LIMITS: dict[str, float] = {"facebook": 5.0, "x": 1.0, "instagram": 1.0}
     FACEBOOK_API_TOKEN: str | None = None
     X_API_TOKEN: str | None = None
     INSTAGRAM_API_TOKEN: str | None = None
+    SOCIAL_PLATFORM_BASE_URLS: dict[str, str] = {}
+    SOCIAL_HTTP_TIMEOUT_SECONDS: float = 20.0
+    SOCIAL_HTTP_MAX_CONNECTIONS: int = 10
+    SOCIAL_UPLOAD_CHUNK_BYTES: int = 4 * 1024 * 1024
+    SOCIAL_MEDIA_PROCESS_WORKERS: int = 2
+    THUMBNAIL_CACHE_DIR: str = "frontend/.thumbnail_cache"
+    THUMBNAIL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    UPLOAD_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_VIDEO_BYTES: int = 200 * 1024 * 1024
+    MEDIA_GC_INTERVAL: int = 3600
+    MEDIA_GC_GRACE_SECONDS: int = 24 * 3600
+    MEDIA_STORAGE_BACKEND: str = "local"
+    MEDIA_S3_BUCKET: str | None = None
+    MEDIA_S3_PREFIX: str = "uploads/"
+    MEDIA_S3_REGION: str | None = None
+    MEDIA_S3_ENDPOINT_URL: str | None = None
+    MEDIA_S3_ACCESS_KEY_ID: str | None = None
+    MEDIA_S3_SECRET_ACCESS_KEY: str | None = None
+    MEDIA_PUBLIC_BASE_URL: str | None = None
+    MEDIA_PRESIGNED_URL_EXPIRY: int = 3600
+    PAYSTACK_TIMEOUT_SECONDS: float = 10.0
+    PAYSTACK_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    PAYSTACK_MAX_CONNECTIONS: int = 20
+    PAYSTACK_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    PAYSTACK_MAX_ATTEMPTS: int = 3
+    PAYSTACK_BACKOFF_BASE_SECONDS: float = 0.2
+    PAYSTACK_BACKOFF_MAX_SECONDS: float = 2.0
+    PAYSTACK_RETRY_BUDGET_RATIO: float = 0.2
+    PAYSTACK_BREAKER_FAILURE_THRESHOLD: int = 5
+    PAYSTACK_BREAKER_RECOVERY_SECONDS: float = 30.0
+    PAYSTACK_WEBHOOK_SWEEP_INTERVAL: int = 60
+    PAYSTACK_WEBHOOK_MAX_ATTEMPTS: int = 5
+    PAYSTACK_VERIFY_CACHE_SECONDS: float = 30.0
+    PAYSTACK_VERIFY_LEASE_SECONDS: float = 15.0
+    PAYMENT_RECONCILE_INTERVAL: int = 300
+    PAYMENT_RECONCILE_MIN_AGE_SECONDS: int = 15 * 60
+    PAYMENT_RECONCILE_EXPIRE_SECONDS: int = 24 * 3600
+    PAYMENT_RECONCILE_BATCH_SIZE: int = 100
+    PAYMENT_RECONCILE_CONCURRENCY: int = 8
+    PAYMENT_SUCCESS_TOKEN_TTL_SECONDS: int = 15 * 60
+    TTL_STORE_BACKEND: str = "database"
+    TTL_STORE_MAX_ENTRIES: int = 10000
+    TTL_STORE_MAX_BYTES: int = 8 * 1024 * 1024
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    METRICS_TOKEN: str | None = None
     # If you have more config variables, add them here.
 
     # Pydantic 2.x style config
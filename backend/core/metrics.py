@@ -0,0 +1,338 @@
+"""
+In-process Metrics
+
+A small, dependency-free registry of counters, gauges and histograms for
+operational metrics (circuit breaker states, job throughput, latencies, ...). Metrics are created once
+at import time and updated from request handlers, background jobs and threads.
+
+Metrics updated on every request can be created with ``sharded=True``: each
+thread then updates its own shard without taking a lock, and reads merge the
+shards. Values owned by other libraries (e.g. the database pool) are exported
+by collectors, callbacks that refresh gauges right before ``render()``.
+
+Usage:
+    from backend.core.metrics import counter, gauge, histogram
+
+    PAYSTACK_CALLS = counter("paystack_calls_total", "Paystack API calls.", ["outcome"])
+    PAYSTACK_CALLS.inc(outcome="success")
+
+    LATENCY = histogram("social_post_seconds", "Publish latency.", ["platform"])
+    LATENCY.observe(0.42, platform="x")
+
+    REQUESTS = counter("http_requests_total", "Requests.", ["route"], sharded=True)
+    registry.add_collector(lambda: POOL_SIZE.set(engine.pool.size()))
+
+    registry.render()  # Prometheus text exposition format
+"""
+
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelValues, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, value in self.samples():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing value."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative ``le`` buckets, plus their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def _add(self, series_by_key: Dict[LabelValues, List[float]], key: LabelValues, value: float) -> None:
+        series = series_by_key.get(key)
+        if series is None:
+            series = series_by_key[key] = [0.0] * (len(self.buckets) + 2)
+        for i in range(bisect.bisect_left(self.buckets, value), len(self.buckets)):
+            series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._add(self._series, key, value)
+
+    def all_series(self) -> Dict[LabelValues, List[float]]:
+        """A copy of every series: ``[count per bucket..., +Inf count, sum]`` by label values."""
+        with self._lock:
+            return {key: list(values) for key, values in self._series.items()}
+
+    def count(self, **labels: str) -> float:
+        series = self.all_series().get(self._key(labels))
+        return series[-2] if series else 0.0
+
+    def sum(self, **labels: str) -> float:
+        series = self.all_series().get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    get = count
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        series = sorted(self.all_series().items())
+        bucket_names = self.labelnames + ("le",)
+        for values, data in series:
+            for bound, cumulative in zip(self.buckets + (float("inf"),), data[:-1]):
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, values + (le,))} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(data[-2])}")
+        return "\n".join(lines)
+
+
+class _Shards:
+    """
+    One dict per thread. Only its own thread writes to a shard, so updates need
+    no lock; readers copy each shard (atomic under the GIL) and merge them.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            shards = list(self._shards)
+        return [list(shard.items()) for shard in shards]
+
+
+class _ShardedValues:
+    """Per-thread ``inc`` for counters and gauges; ``_values`` is rebuilt from the shards on read."""
+
+    def _init_shards(self) -> None:
+        self._shards = _Shards()
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        key = self._key(labels)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def _merged(self) -> Dict[LabelValues, float]:
+        merged: Dict[LabelValues, float] = {}
+        for items in self._shards.snapshot():
+            for key, value in items:
+                merged[key] = merged.get(key, 0.0) + value
+        return merged
+
+    def get(self, **labels: str) -> float:
+        return self._merged().get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelValues, float]]:
+        return sorted(self._merged().items())
+
+
+class ShardedCounter(_ShardedValues, Counter):
+    """A counter for hot paths: increments are lock-free."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._init_shards()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        self._add(amount, labels)
+
+
+class ShardedGauge(_ShardedValues, Gauge):
+    """A gauge for hot paths that only moves by ``inc``/``dec`` (e.g. requests in flight)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._init_shards()
+
+    def set(self, value: float, **labels: str) -> None:
+        raise TypeError("Sharded gauges only support inc() and dec().")
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self._add(amount, labels)
+
+
+class ShardedHistogram(Histogram):
+    """A histogram for hot paths: observations are lock-free."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shards = _Shards()
+
+    def observe(self, value: float, **labels: str) -> None:
+        self._add(self._shards.mine(), self._key(labels), value)
+
+    def all_series(self) -> Dict[LabelValues, List[float]]:
+        merged: Dict[LabelValues, List[float]] = {}
+        for items in self._shards.snapshot():
+            for key, values in items:
+                values = list(values)
+                total = merged.get(key)
+                merged[key] = values if total is None else [a + b for a, b in zip(total, values)]
+        return merged
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Registry:
+    """Holds every metric of the process, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run ``collector`` before every render, to refresh metrics owned by other code."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = (), sharded: bool = False) -> Counter:
+    """Create (or fetch the already registered) counter ``name``."""
+    cls = ShardedCounter if sharded else Counter
+    return registry.register(cls(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = (), sharded: bool = False) -> Gauge:
+    """Create (or fetch the already registered) gauge ``name``."""
+    cls = ShardedGauge if sharded else Gauge
+    return registry.register(cls(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+    sharded: bool = False,
+) -> Histogram:
+    """Create (or fetch the already registered) histogram ``name``."""
+    cls = ShardedHistogram if sharded else Histogram
+    return registry.register(cls(name, documentation, labelnames, buckets))
@@ -0,0 +1,245 @@
+"""
+Resilience Helpers for Outbound Calls
+
+Building blocks that keep a degraded upstream (Paystack, social platforms, ...)
+from dragging the app down with it:
+
+- ``Backoff``: exponential backoff with "full jitter", so retries from many
+  requests spread out instead of arriving in synchronized waves.
+- ``RetryBudget``: caps retries to a fraction of recent calls, so an outage
+  cannot multiply our outbound load.
+- ``TokenBucket``: a thread-safe rate limiter (``rate`` calls per second with
+  bursts of up to ``burst``) for APIs that enforce request quotas.
+- ``CircuitBreaker``: after repeated failures, rejects calls immediately for a
+  cool-down period, then lets a few trial calls through (half-open) to probe
+  for recovery.
+
+State changes are exported through ``backend.core.metrics``:
+``circuit_breaker_state`` (0 closed, 1 open, 2 half-open),
+``circuit_breaker_transitions_total``, ``circuit_breaker_rejections_total``
+and ``retry_budget_exhausted_total``.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from backend.core.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+BREAKER_STATE = gauge("circuit_breaker_state", "Circuit breaker state (0 closed, 1 open, 2 half-open).", ["name"])
+BREAKER_TRANSITIONS = counter("circuit_breaker_transitions_total", "Circuit breaker state changes.", ["name", "state"])
+BREAKER_REJECTIONS = counter("circuit_breaker_rejections_total", "Calls rejected by an open circuit breaker.", ["name"])
+RETRY_BUDGET_EXHAUSTED = counter("retry_budget_exhausted_total", "Retries skipped because the budget was spent.", ["name"])
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected by an open circuit breaker."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.0f}s.")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter.
+
+    The delay before retry ``n`` (0-based) is uniform in
+    ``[0, min(max_delay, base * multiplier ** n)]``.
+    """
+
+    def __init__(self, base: float, max_delay: float, multiplier: float = 2.0, rng: Optional[random.Random] = None):
+        self.base = base
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        return self._rng.uniform(0, min(self.max_delay, self.base * self.multiplier ** attempt))
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, bursting up to ``burst``."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, going into debt if needed; returns how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a call is allowed; returns the time waited."""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class RetryBudget:
+    """
+    Allow retries only while they stay below ``ratio`` of the calls made in the
+    last ``window`` seconds (plus ``min_retries`` so low traffic can still retry).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ratio: float = 0.2,
+        min_retries: int = 3,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._calls: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window
+        for events in (self._calls, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_call(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            self._calls.append(now)
+
+    def try_acquire_retry(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                RETRY_BUDGET_EXHAUSTED.inc(name=self.name)
+                return False
+            self._retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``failure_threshold`` consecutive failures; open ->
+    half-open after ``recovery_timeout`` seconds; half-open -> closed after a
+    successful trial call, or back to open on a failed one. At most
+    ``half_open_max_calls`` trial calls run at once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(STATE_VALUES[CLOSED], name=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _transition(self, state: str) -> None:
+        # Caller holds the lock.
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker '{self.name}' {self._state} -> {state}")
+        self._state = state
+        BREAKER_STATE.set(STATE_VALUES[state], name=self.name)
+        BREAKER_TRANSITIONS.inc(name=self.name, state=state)
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state == HALF_OPEN:
+            self._half_open_calls = 0
+        if state == CLOSED:
+            self._failures = 0
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+
+    def before_call(self) -> None:
+        """Reserve a call slot, or raise ``CircuitOpenError``."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+            BREAKER_REJECTIONS.inc(name=self.name)
+            remaining = self.recovery_timeout - (self._clock() - self._opened_at)
+        raise CircuitOpenError(self.name, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def record_ignored(self) -> None:
+        """Release a half-open slot for a call whose outcome says nothing about upstream health."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
@@ -0,0 +1,128 @@
+"""
+Media File Responses
+
+``MediaFileResponse`` is a ``FileResponse`` tuned for large media such as
+uploaded videos:
+
+- Conditional GETs: ``If-None-Match`` / ``If-Modified-Since`` answer 304
+  without touching the file.
+- Single byte ranges answer 206 with only the requested bytes, so seeking in a
+  video costs just the bytes played. ``If-Range`` falls back to the full file
+  when the representation changed.
+- Multi-range requests are rejected with 416; browsers' media players never
+  send them and multipart bodies cannot be sent zero-copy.
+- The body is handed to the server with the ASGI ``zerocopysend``/``pathsend``
+  extensions (``sendfile``) when the server offers them, and streamed in large
+  chunks otherwise.
+"""
+
+import os
+import stat
+from email.utils import parsedate_to_datetime
+from typing import Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, MalformedRangeHeader, RangeNotSatisfiable, Response
+from starlette.types import Receive, Scope, Send
+
+ZERO_COPY_SEND = "http.response.zerocopysend"
+PATH_SEND = "http.response.pathsend"
+
+# Headers that describe the representation and are repeated on a 304.
+NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "expires", "vary", "content-location")
+
+
+class MediaFileResponse(FileResponse):
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stat_result = self.stat_result
+        if stat_result is None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+            if not stat.S_ISREG(stat_result.st_mode):
+                raise RuntimeError(f"File at path {self.path} is not a file.")
+            self.set_stat_headers(stat_result)
+
+        request_headers = Headers(scope=scope)
+        if self.is_not_modified(request_headers, stat_result.st_mtime):
+            headers = {name: self.headers[name] for name in NOT_MODIFIED_HEADERS if name in self.headers}
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        file_size = stat_result.st_size
+        start, end = 0, file_size
+        status_code = self.status_code
+        http_range = request_headers.get("range")
+        http_if_range = request_headers.get("if-range")
+        if http_range is not None and (http_if_range is None or self._should_use_range(http_if_range)):
+            try:
+                ranges = self._parse_range_header(http_range, file_size)
+            except MalformedRangeHeader:
+                # A server may ignore a Range header it does not understand.
+                ranges = None
+            except RangeNotSatisfiable:
+                ranges = []
+            if ranges is not None:
+                if len(ranges) != 1:
+                    response = Response(status_code=416, headers={"content-range": f"bytes */{file_size}"})
+                    await response(scope, receive, send)
+                    return
+                start, end = ranges[0]
+                status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+                self.headers["content-length"] = str(end - start)
+
+        await send({"type": "http.response.start", "status": status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self.send_body(scope, send, (start, end), whole_file=status_code != 206)
+
+        if self.background is not None:
+            await self.background()
+
+    def is_not_modified(self, request_headers: Headers, mtime: float) -> bool:
+        """Evaluate ``If-None-Match`` (preferred) or ``If-Modified-Since``."""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = self.headers.get("etag", "").removeprefix("W/")
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    async def send_body(self, scope: Scope, send: Send, byte_range: Tuple[int, int], whole_file: bool) -> None:
+        start, end = byte_range
+        extensions = scope.get("extensions") or {}
+        if whole_file and PATH_SEND in extensions:
+            await send({"type": PATH_SEND, "path": os.fspath(self.path)})
+            return
+        if ZERO_COPY_SEND in extensions:
+            with await anyio.to_thread.run_sync(open, self.path, "rb") as file:
+                await send({"type": ZERO_COPY_SEND, "file": file, "offset": start, "count": end - start, "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                # The file shrank while streaming; end the response cleanly.
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if start == end:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
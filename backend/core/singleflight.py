@@ -0,0 +1,97 @@
+"""
+Single-flight Call Coalescing
+
+``SingleFlight.do(key, fn)`` runs ``fn`` once for all concurrent callers with the
+same ``key`` on this event loop; the others await the leader's result. Results
+accepted by ``cacheable`` are also kept for ``ttl`` seconds, so callers arriving
+just after the leader finished reuse its result too.
+
+Usage:
+    verifications = SingleFlight("paystack_verify", ttl=30, cacheable=lambda status: status != "pending")
+    status = await verifications.do(reference, lambda: verify(reference))
+
+Only one process is covered; combine it with a DB lease (``backend.services.leases``)
+to coordinate across workers.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from backend.core.metrics import counter
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = counter(
+    "singleflight_calls_total",
+    "Single-flight calls by how they were served (leader, shared, cached).",
+    ["name", "outcome"],
+)
+
+
+class SingleFlight(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        ttl: float = 0.0,
+        cacheable: Optional[Callable[[T], bool]] = None,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.cacheable = cacheable or (lambda result: True)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self._results: "OrderedDict[Any, Tuple[float, T]]" = OrderedDict()
+
+    def _cached(self, key: Any) -> Tuple[bool, Optional[T]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= self._clock():
+            del self._results[key]
+            return False, None
+        return True, result
+
+    def _remember(self, key: Any, result: T) -> None:
+        if self.ttl <= 0 or not self.cacheable(result):
+            return
+        self._results[key] = (self._clock() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def forget(self, key: Any) -> None:
+        """Drop a cached result for ``key``."""
+        self._results.pop(key, None)
+
+    async def do(self, key: Any, fn: Callable[[], Awaitable[T]]) -> T:
+        hit, result = self._cached(key)
+        if hit:
+            SINGLEFLIGHT_CALLS.inc(name=self.name, outcome="cached")
+            return result
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            SINGLEFLIGHT_CALLS.inc(name=self.name, outcome="shared")
+            return await asyncio.shield(pending)
+
+        SINGLEFLIGHT_CALLS.inc(name=self.name, outcome="leader")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+            self._remember(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters get the exception; don't also log it as "never retrieved".
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
@@ -1,9 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 from typing import List, Optional
 
-from backend.models.social_post import SocialMediaPost
-from backend.pydanticschemas.social_post import SocialMediaPostCreate
+from backend.models.social_post import SocialMediaPost, SocialPostGroup
+from backend.pydanticschemas.social_post import SocialMediaPostCreate, SocialPostGroupCreate
 
 class CRUDSocialPost:
     def __init__(self, model):
@@ -39,3 +39,44 @@ class CRUDSocialPost:
 
 crud_social_post = CRUDSocialPost(SocialMediaPost)
 
+
+class CRUDSocialPostGroup:
+    def __init__(self, model):
+        self.model = model
+
+    def create(self, db: Session, obj_in: SocialPostGroupCreate) -> SocialPostGroup:
+        """Create the group and one draft target per platform, sharing its content and media."""
+        content = obj_in.model_dump(exclude={"platforms"})
+        group = self.model(**content)
+        group.targets = [SocialMediaPost(platform=platform, status="draft", **content) for platform in obj_in.platforms]
+        db.add(group)
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+        db.refresh(group)
+        return group
+
+    def get(self, db: Session, group_id: int) -> Optional[SocialPostGroup]:
+        return db.query(self.model).options(selectinload(self.model.targets)).filter(self.model.id == group_id).first()
+
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[SocialPostGroup]:
+        query = db.query(self.model).options(selectinload(self.model.targets))
+        query = query.order_by(self.model.scheduled_at.is_(None), self.model.scheduled_at, self.model.created_at.desc())
+        return query.offset(skip).limit(limit).all()
+
+    def delete(self, db: Session, group_id: int) -> SocialPostGroup:
+        """Delete the group together with its targets."""
+        group = self.get(db, group_id)
+        if not group:
+            raise HTTPException(status_code=404, detail="Post group not found")
+        db.delete(group)
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+        return group
+
+crud_social_post_group = CRUDSocialPostGroup(SocialPostGroup)
@@ -1,17 +1,120 @@
-from fastapi import Request, HTTPException
+import time
+
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from backend.core.database import SessionLocal
+from backend.core.metrics import counter, gauge, histogram
 from backend.models import BlacklistedToken
 
-async def blacklist_middleware(request: Request, call_next):
-    access_token = request.cookies.get("access_token")
-    if access_token:
-        db: Session = SessionLocal()
-        blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token == access_token).first()
+
+def is_blacklisted(access_token: str) -> bool:
+    db: Session = SessionLocal()
+    try:
+        return db.query(BlacklistedToken).filter(BlacklistedToken.token == access_token).first() is not None
+    finally:
         db.close()
-        if blacklisted:
-            return JSONResponse(status_code=401, content={"detail": "Token blacklisted"})
 
-    response = await call_next(request)
-    return response
\ No newline at end of file
+
+class BlacklistMiddleware:
+    """
+    Reject requests whose ``access_token`` cookie has been blacklisted.
+
+    Written as plain ASGI middleware rather than ``@app.middleware("http")``, so
+    responses pass through untouched and server extensions such as zero-copy
+    file sending keep working.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            access_token = HTTPConnection(scope).cookies.get("access_token")
+            if access_token and await run_in_threadpool(is_blacklisted, access_token):
+                response = JSONResponse(status_code=401, content={"detail": "Token blacklisted"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+HTTP_REQUESTS = counter(
+    "http_requests_total", "HTTP requests by route template and status.", ["method", "route", "status"], sharded=True)
+HTTP_DURATION = histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ["method", "route"], sharded=True)
+HTTP_IN_PROGRESS = gauge("http_requests_in_progress", "HTTP requests being handled.", ["method"], sharded=True)
+HTTP_RESPONSE_SIZE = histogram(
+    "http_response_size_bytes", "HTTP response body size.", ["method", "route"], buckets=SIZE_BUCKETS, sharded=True)
+
+
+def route_template(scope: Scope, root_path: str = "") -> str:
+    """
+    The template of the route that handled the request (``/api/courses/{course_id}``),
+    so label values stay bounded whatever paths clients send.
+    """
+    # Mounts extend root_path with their prefix while routing.
+    prefix = scope.get("root_path", "")[len(root_path):]
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is not None:
+        return prefix + path
+    if prefix:
+        # A mounted app without routes of its own, e.g. StaticFiles.
+        return prefix + "/{path:path}"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency, requests in flight and response size per
+    route template (exported on ``/metrics``).
+
+    Plain ASGI middleware like ``BlacklistMiddleware``: it only observes the
+    messages sent, so streaming and zero-copy responses are unaffected. The
+    metrics are sharded, so recording takes no locks.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status_code = 500
+        size = 0
+        content_length = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size, content_length
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-length":
+                        content_length = int(value)
+                        break
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec(method=method)
+            route = route_template(scope, root_path)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_RESPONSE_SIZE.observe(content_length if content_length is not None else size, method=method, route=route)
+
@@ -5,6 +5,10 @@ from backend.models.registration import Registration
 from backend.models.payment import Payment
 from backend.models.order import Order
 from backend.models.blacklisted_tokens import BlacklistedToken
-from backend.models.social_post import SocialMediaPost
+from backend.models.social_post import SocialMediaPost, SocialPostGroup
 from backend.models.category import Category
-
+from backend.models.media_blob import MediaBlob
+from backend.models.paystack_event import PaystackEvent
+from backend.models.lease import Lease
+from backend.models.ttl_entry import TTLEntry
+from backend.models.idempotency_key import IdempotencyKey
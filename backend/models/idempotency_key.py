@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime
+from backend.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key and the response it produced (see backend.services.idempotency)."""
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress, completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(scope={self.scope}, key={self.key}, status={self.status})>"
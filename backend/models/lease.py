@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from backend.core.database import Base
+
+
+class Lease(Base):
+    """A short-lived, named lock shared by all app workers (see backend.services.leases)."""
+
+    __tablename__ = "leases"
+
+    name = Column(String(255), primary_key=True)
+    owner = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Lease(name={self.name}, owner={self.owner}, expires_at={self.expires_at})>"
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from backend.core.database import Base
+
+
+class MediaBlob(Base):
+    """A content-addressed upload, shared by every row that references it."""
+
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    filename = Column(String(255), nullable=False, unique=True)
+    size = Column(Integer, nullable=False, default=0)
+    content_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Last time ref_count dropped to zero; GC waits a grace period after this.
+    released_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<MediaBlob(id={self.id}, filename={self.filename}, ref_count={self.ref_count})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from datetime import datetime
 from backend.core.database import Base
 from sqlalchemy.orm import relationship
@@ -6,6 +6,8 @@ from sqlalchemy.orm import relationship
 
 class Payment(Base):
     __tablename__ = "payments"
+    # Serves the reconciliation scan for stale pending payments.
+    __table_args__ = (Index("ix_payments_status_payment_date", "status", "payment_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     # If an Order is deleted, remove referencing Payments
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from backend.core.database import Base
+
+
+class PaystackEvent(Base):
+    """A webhook event received from Paystack, stored before it is processed."""
+
+    __tablename__ = "paystack_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Identifies the event across Paystack's redeliveries (e.g. "charge.success:123456").
+    event_key = Column(String(255), nullable=False, unique=True)
+    event = Column(String(100), nullable=False)
+    reference = Column(String(255), nullable=True, index=True)
+    payload = Column(Text, nullable=False)
+    # pending -> processed | failed
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    received_at = Column(DateTime, default=datetime.utcnow)
+    # Set while a worker processes the event; stale claims are picked up again.
+    claimed_at = Column(DateTime, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<PaystackEvent(id={self.id}, event={self.event}, reference={self.reference}, status={self.status})>"
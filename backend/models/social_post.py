@@ -1,9 +1,34 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from backend.core.database import Base
 
+
+class SocialPostGroup(Base):
+    """One piece of content cross-posted to several platforms; each target is a SocialMediaPost."""
+
+    __tablename__ = "social_post_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content = Column(Text, nullable=False)
+    content_type = Column(String(50), nullable=False)
+    image_url = Column(String(255), nullable=True)
+    video_url = Column(String(255), nullable=True)
+    scheduled_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    targets = relationship(
+        "SocialMediaPost", back_populates="group", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="SocialMediaPost.id",
+    )
+
+
 class SocialMediaPost(Base):
     __tablename__ = "social_media_posts"
+    __table_args__ = (
+        Index("ix_social_media_posts_status_scheduled_at", "status", "scheduled_at"),
+        Index("ix_social_media_posts_status_next_attempt_at", "status", "next_attempt_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     platform = Column(String(50), nullable=False)
@@ -12,6 +37,17 @@ class SocialMediaPost(Base):
     image_url = Column(String(255), nullable=True)
     video_url = Column(String(255), nullable=True)
     scheduled_at = Column(DateTime, nullable=True)
-    status = Column(String(20), nullable=False, default="draft")
+    status = Column(String(20), nullable=False, default="draft")  # draft, retry, posted, failed, dead_letter
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set while a scheduler worker is publishing the post (see backend.services.post_claims).
+    claimed_by = Column(String(64), nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+    # Publishing attempts so far; a failed attempt is retried at next_attempt_at.
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    # Set for the per-platform targets of a SocialPostGroup; they carry a copy of its content.
+    group_id = Column(Integer, ForeignKey("social_post_groups.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    group = relationship("SocialPostGroup", back_populates="targets")
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Text, DateTime
+from backend.core.database import Base
+
+
+class TTLEntry(Base):
+    """An expiring key-value entry (see backend.services.ttl_store)."""
+
+    __tablename__ = "ttl_entries"
+
+    namespace = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    value = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<TTLEntry(namespace={self.namespace}, key={self.key}, expires_at={self.expires_at})>"
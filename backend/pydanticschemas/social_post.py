@@ -1,5 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from typing import List
+from pydantic import BaseModel, Field, field_validator
 
 class SocialMediaPostBase(BaseModel):
     platform: str = Field(..., max_length=50)
@@ -16,6 +17,40 @@ class SocialMediaPostCreate(SocialMediaPostBase):
 class SocialMediaPostSchema(SocialMediaPostBase):
     id: int
     created_at: datetime
+    attempts: int = 0
+    next_attempt_at: datetime | None = None
+    last_error: str | None = None
+    group_id: int | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class SocialPostGroupBase(BaseModel):
+    content: str
+    content_type: str
+    image_url: str | None = None
+    video_url: str | None = None
+    scheduled_at: datetime | None = None
+
+class SocialPostGroupCreate(SocialPostGroupBase):
+    platforms: List[str] = Field(..., min_length=1)
+
+    @field_validator("platforms")
+    @classmethod
+    def normalize_platforms(cls, platforms: List[str]) -> List[str]:
+        """Lower-case, drop blanks and duplicates, keep the order given."""
+        names = list(dict.fromkeys(p.strip().lower() for p in platforms if p.strip()))
+        if not names:
+            raise ValueError("At least one platform is required.")
+        if any(len(name) > 50 for name in names):
+            raise ValueError("Platform names are at most 50 characters.")
+        return names
+
+class SocialPostGroupSchema(SocialPostGroupBase):
+    id: int
+    created_at: datetime
+    targets: List[SocialMediaPostSchema] = []
 
     class Config:
         from_attributes = True
@@ -14,6 +14,8 @@ from backend.routers.social_media import router as social_media_router
 from backend.routers.teacher_application import router as teacher_app_router
 from backend.routers.testimonial import router as testimonial_router
 from backend.routers.category import router as category_router
+from backend.routers.media import router as media_router
+from backend.routers.metrics import router as metrics_router
 
 # API Router for backend endpoints
 api_router = APIRouter()
@@ -33,6 +35,6 @@ api_router.include_router(teacher_app_router, tags=["teacher_applications"])
 api_router.include_router(testimonial_router, tags=["testimonials"])
 api_router.include_router(category_router)
 
-# Export both routers
-__all__ = ["api_router","pages_router"]
+# Export the routers
+__all__ = ["api_router","pages_router","media_router","metrics_router"]
 
@@ -6,21 +6,23 @@ Admins can either:
   - Upload an image file from their local computer, or
   - Provide an online image URL.
   
-Uploaded images are saved to the local filesystem (e.g. /static/uploads/),
-and the Course record stores the corresponding URL.
+Uploaded images are streamed to the configured media storage (local
+/static/uploads/ or an S3-compatible bucket) by the upload service without
+blocking the event loop, stored once per distinct content and
+reference-counted by the media store,
+and the Course record stores the corresponding URL. Responsive derivatives
+(WebP/AVIF widths and a placeholder) are generated in the background after
+the response is sent.
 
 Endpoints:
   - POST /admin/courses/add: Add a new course.
 """
 
-import os
-import uuid
-import shutil
 import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, File, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, File, status
 from sqlalchemy.orm import Session
 
 from backend.crud.course import crud_course
@@ -30,6 +32,9 @@ from backend.models.course import Course
 from backend.models.user import User
 from backend.pydanticschemas.course import CourseSchema, CourseUpdate
 from backend.routers.auth import get_current_user
+from backend.services import media_store
+from backend.services.image_processing import generate_derivatives_for_url
+from backend.services.uploads import save_upload
 
 logger = logging.getLogger(__name__)
 
@@ -40,12 +45,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin/courses", tags=["Admin Courses"])
 
-# Directory to store uploaded images
-UPLOAD_DIR = os.path.join("frontend/static", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.post("/add", response_model=CourseSchema)
 async def add_course(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     summary: str | None = Form(None),
@@ -79,21 +81,15 @@ async def add_course(
       CourseResponse: The newly created course details.
 
     Raises:
-      HTTPException: 500 if an error occurs during file saving or DB commit.
+      HTTPException: 413 if the image is too large, 500 if an error occurs
+      during file saving or DB commit.
     """
     # If an image file is provided, save it and generate its URL.
+    stored = None
     if image_file and image_file.filename:
-        try:
-            file_extension = os.path.splitext(image_file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(UPLOAD_DIR, unique_filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(image_file.file, buffer)
-            # static files are served at "/static/uploads/"
-            image_url = f"/static/uploads/{unique_filename}"
-        except Exception as e:
-            logger.error(f"Error saving uploaded image: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error saving uploaded image.")
+        stored = await save_upload(image_file, "image")
+        # e.g. "/static/uploads/<sha256>.jpg" with the local backend
+        image_url = stored.url
 
     course_data = {
         "title": title,
@@ -111,6 +107,8 @@ async def add_course(
     try:
         new_course = Course(**course_data)
         db.add(new_course)
+        if stored:
+            media_store.acquire(db, stored)
         db.commit()
         db.refresh(new_course)
     except Exception as e:
@@ -118,6 +116,9 @@ async def add_course(
         logger.error(f"Error creating course: {str(e)}")
         raise HTTPException(status_code=500, detail="Error creating course.")
 
+    if stored and not stored.deduplicated:
+        background_tasks.add_task(generate_derivatives_for_url, image_url)
+
     return new_course
 
 # Delete a Course
@@ -126,12 +127,16 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
     """
     Delete a course by ID.
     """
+    course = crud_course.get_by_id(db=db, course_id=course_id)
+    if course:
+        media_store.release(db, course.image_url)
     crud_course.delete(db=db, course_id=course_id)
     return {"message": f"Course with ID {course_id} successfully deleted."}
 
 @router.put("/{course_id}", response_model=CourseUpdate)
 async def update_course(
     course_id: int,
+    background_tasks: BackgroundTasks,
     title: str = Form(None),
     description: str = Form(None),
     summary: str = Form(None),
@@ -174,17 +179,13 @@ async def update_course(
     if preview_link is not None:
         db_course.preview_link = preview_link
 
+    stored = None
     if image and image.filename:
-        upload_dir = os.path.join("frontend/static", "uploads")
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
-
-        file_path = os.path.join(upload_dir, image.filename)
-
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-
-        db_course.image_url = f"/static/uploads/{image.filename}"
+        stored = await save_upload(image, "image")
+        if stored.url != db_course.image_url:
+            media_store.acquire(db, stored)
+            media_store.release(db, db_course.image_url)
+        db_course.image_url = stored.url
 
     try:
         db.flush()
@@ -199,4 +200,7 @@ async def update_course(
         db.rollback()
         logger.error(f"Error updating course {course_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error updating course.")
+
+    if stored and not stored.deduplicated:
+        background_tasks.add_task(generate_derivatives_for_url, db_course.image_url)
     return db_course
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Media Router
+
+Serves stored uploads and derived media for images under ``/static``.
+
+Endpoints:
+  - GET/HEAD /media/files/{key}: A stored upload. Served directly with the
+    local storage backend, with byte ranges (206), conditional GETs (304) and
+    zero-copy sending where the server supports it; otherwise a redirect to the
+    bucket (pre-signed if private), so the bytes never pass through the app.
+  - GET /media/thumb/{w}x{h}/{path}: Thumbnail of ``/static/{path}`` resized to
+    cover ``w`` x ``h`` (``h`` may be 0 to keep the aspect ratio). Generated on
+    first request and cached on disk. Responses are cacheable for a year only
+    when the URL pins the source version (``?v=``, as ``thumbnail_url`` builds
+    it) or the source is a content-addressed upload; otherwise browsers must
+    revalidate them against the ETag.
+"""
+
+import logging
+import os
+import re
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import RedirectResponse
+
+from backend.core.responses import MediaFileResponse
+
+from backend.services.storage import get_storage
+from backend.services.thumbnails import (
+    MAX_THUMBNAIL_DIMENSION,
+    THUMBNAIL_MEDIA_TYPE,
+    get_thumbnail_cache,
+    resolve_source,
+    source_version,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+SIZE_PATTERN = re.compile(r"^(\d{1,4})x(\d{1,4})$")
+LONG_LIVED_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=300"
+
+
+@router.api_route("/files/{key}", methods=["GET", "HEAD"], name="media-file")
+async def get_media_file(key: str):
+    """
+    Return a stored upload, or redirect to where the storage backend serves it.
+
+    Raises:
+      HTTPException: 404 if the key is invalid or, for local storage, the file does not exist.
+    """
+    storage = get_storage()
+    try:
+        local_path = storage.local_path(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="File not found.")
+    if local_path is None:
+        # Pre-signed URLs expire, so the redirect itself must not be cached for long.
+        return RedirectResponse(storage.download_url(key), status_code=307, headers={"Cache-Control": "private, max-age=60"})
+    if not os.path.isfile(local_path):
+        raise HTTPException(status_code=404, detail="File not found.")
+    # Keys are content hashes, so the bytes behind a URL never change and the
+    # hash makes a strong ETag.
+    etag = f'"{os.path.splitext(key)[0]}"'
+    return MediaFileResponse(local_path, headers={"Cache-Control": LONG_LIVED_CACHE, "ETag": etag})
+
+
+@router.get("/thumb/{size}/{path:path}", name="media-thumbnail")
+async def get_thumbnail(size: str, path: str, v: Optional[str] = None):
+    """
+    Return a cached thumbnail for ``/static/{path}``.
+
+    ``v`` is the source version from ``thumbnail_url``; a missing or outdated
+    one still gets the current thumbnail, just not cached as immutable.
+
+    Raises:
+      HTTPException: 400 for an invalid size, 404 if the source image does not exist,
+      500 if the image cannot be processed.
+    """
+    match = SIZE_PATTERN.match(size)
+    if not match:
+        raise HTTPException(status_code=400, detail="Size must look like '{width}x{height}'.")
+    width, height = int(match.group(1)), int(match.group(2))
+    if not (0 < width <= MAX_THUMBNAIL_DIMENSION) or height > MAX_THUMBNAIL_DIMENSION:
+        raise HTTPException(status_code=400, detail=f"Thumbnail dimensions must be at most {MAX_THUMBNAIL_DIMENSION}px.")
+
+    source = resolve_source(path)
+    if not source:
+        raise HTTPException(status_code=404, detail="Image not found.")
+
+    try:
+        thumb_path = await get_thumbnail_cache().get(source, width, height)
+    except Exception as e:
+        logger.error(f"Error generating thumbnail for {path}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error generating thumbnail.")
+
+    version = source_version(source)
+    # The cache file name is derived from the source version and the box.
+    etag = f'"{os.path.splitext(os.path.basename(thumb_path))[0]}"'
+    return MediaFileResponse(
+        thumb_path,
+        media_type=THUMBNAIL_MEDIA_TYPE,
+        headers={
+            "Cache-Control": LONG_LIVED_CACHE if version is None or v == version else REVALIDATE_CACHE,
+            "ETag": etag,
+        },
+    )
@@ -0,0 +1,40 @@
+"""
+Metrics Router
+
+Serves the process's in-process metrics (``backend.core.metrics``) in the
+Prometheus text exposition format: per-route request metrics recorded by
+``MetricsMiddleware``, the database pool, caches, background jobs and
+external API clients.
+
+Endpoints:
+  - GET /metrics: Every registered counter, gauge and histogram. Requests must
+    send METRICS_TOKEN as a bearer token. Without a token the endpoint is only
+    open with DEBUG=True; otherwise it answers 403, since the metrics reveal
+    every route, the database pool and payment activity.
+
+Settings:
+    - METRICS_TOKEN: Bearer token required to read the metrics.
+    - DEBUG: "True" serves the metrics without a token (local development).
+"""
+
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend.core.config import settings
+from backend.core.metrics import registry
+
+router = APIRouter(tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(authorization: str | None = Header(default=None)):
+    if not settings.METRICS_TOKEN:
+        if settings.DEBUG != "True":
+            raise HTTPException(status_code=403, detail="Metrics are disabled; set METRICS_TOKEN to enable them.")
+    elif not hmac.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
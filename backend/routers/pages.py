@@ -14,12 +14,18 @@ from backend.models.order import Order
 from backend.models.course import Course
 from backend.crud.social_post import crud_social_post
 from backend.routers.auth import get_current_user
+from backend.services.image_processing import responsive_image
+from backend.services.storage import media_url
+from backend.services.thumbnails import thumbnail_url
 
 router = APIRouter()
 
 # Setup Jinja2 templates
 templates_folder_path = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "templates")
 templates = Jinja2Templates(directory=templates_folder_path)
+templates.env.globals["responsive_image"] = responsive_image
+templates.env.globals["thumbnail_url"] = thumbnail_url
+templates.env.globals["media_url"] = media_url
 
 @router.get("/", name="home")
 def home(
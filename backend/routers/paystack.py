@@ -7,10 +7,14 @@ It provides endpoints to initialize a Paystack transaction and to verify a trans
 Features:
     - Validates an Order before initializing payment.
     - Creates a Payment record with status "pending" (without rolling back User/Order on payment failure).
-    - Calls Paystack's initialize_transaction() to obtain an authorization URL.
-    - Verifies the transaction via verify_transaction(), and if successful, marks Payment as "completed"
-      and Order as "paid".
+    - Calls Paystack's initialize_transaction() on the shared async client to obtain an authorization URL.
+    - Receives Paystack webhooks (HMAC-verified, stored idempotently, processed in the background),
+      which mark Payment as "completed" and Order as "paid" via backend.services.payments.
+    - On the browser redirect, reads the already-confirmed state, falling back to one coalesced
+      verify_transaction() per reference (across workers) when the webhook has not arrived yet.
     - Redirects the user back to the registration page with a temporary token and order ID upon successful payment.
+      The token's payload lives in a shared TTL store (see backend.services.ttl_store), so it can be
+      redeemed on any worker and expires after PAYMENT_SUCCESS_TOKEN_TTL_SECONDS if never fetched.
     - Provides an API endpoint to securely retrieve payment success details using the token.
 
 Environment Variables:
@@ -20,6 +24,7 @@ Environment Variables:
 Usage:
     - POST /api/paystack/init: Initializes a payment.
     - GET   /api/paystack/verify: Verifies a payment, generates a token, and redirects.
+    - POST  /api/paystack/webhook: Receives Paystack events.
     - GET   /api/paystack/success_details/{token}: Retrieves payment success details.
 """
 
@@ -27,37 +32,41 @@ import os
 import uuid
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
 import json
 
+from backend.core.config import settings
 from backend.core.database import get_db
 from backend.models.order import Order
 from backend.models.payment import Payment
 from backend.models.registration import Registration
-from backend.services.paystack_service import initialize_transaction, verify_transaction
+from backend.services.idempotency import IDEMPOTENCY_HEADER, run_idempotent_async
+from backend.services.payment_verification import verify_payment
+from backend.services.payments import COMPLETED
+from backend.services.paystack_service import initialize_transaction
+from backend.services.ttl_store import get_ttl_store
+from backend.services.paystack_webhooks import (
+    SIGNATURE_HEADER,
+    InvalidEvent,
+    process_event_by_id,
+    record_event,
+    verify_signature,
+)
 from backend.pydanticschemas.payment import PaymentInitRequest
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/paystack", tags=["Paystack"])
 
-# In-memory storage for temporary tokens and payment data (replace with a more secure mechanism like Redis or a database)
-TEMP_PAYMENT_DATA: Dict[str, Dict[str, Any]] = {}
-
-@router.post("/init")
-def paystack_init_payment(
-    payload: PaymentInitRequest,
-    db: Session = Depends(get_db)
-):
-    """
-    Initializes a Paystack payment for the given Order.
-    ... (rest of the docstring as before)
-    """
-    order_id = payload.order_id
-    email = payload.email
+def payment_success_tokens():
+    """One-time tokens for /success_details, shared by all workers."""
+    return get_ttl_store("payment_success", settings.PAYMENT_SUCCESS_TOKEN_TTL_SECONDS)
 
+def _create_pending_payment(db: Session, order_id: int) -> tuple[str, int]:
+    """Validate the order and record a pending Payment; returns (reference, amount_kobo)."""
     order_obj = db.query(Order).filter(Order.id == order_id).first()
     if not order_obj:
         raise HTTPException(status_code=404, detail="Order not found.")
@@ -90,13 +99,37 @@ def paystack_init_payment(
     registrations = db.query(Registration).filter(Registration.order_id == order_obj.id).all()
     if not registrations:
         raise HTTPException(status_code=400, detail="No courses registered for this order.")
+    return reference, amount_kobo
+
+
+@router.post("/init")
+async def paystack_init_payment(
+    payload: PaymentInitRequest,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+):
+    """
+    Initializes a Paystack payment for the given Order.
+
+    Database work runs in the threadpool; the Paystack call is awaited on the
+    shared pooled client, so no worker thread waits on the network. A retry
+    carrying the same Idempotency-Key gets the original authorization URL back
+    instead of a new Payment and Paystack transaction.
+    """
+    return await run_idempotent_async(
+        db, "paystack-init", idempotency_key, payload.model_dump(), lambda: _init_payment(payload, db)
+    )
+
+
+async def _init_payment(payload: PaymentInitRequest, db: Session) -> dict:
+    reference, amount_kobo = await run_in_threadpool(_create_pending_payment, db, payload.order_id)
 
     # callback_url = "http://127.0.0.1:8002/api/paystack/verify"  # Adjust for production
     # Use the PAYSTACK_CALLBACK_URL env variable, or default to a local URL for development.
     callback_url = os.getenv("PAYSTACK_CALLBACK_URL", "http://localhost:8002/api/paystack/verify")
     try:
-        paystack_response = initialize_transaction(
-            email=email,
+        paystack_response = await initialize_transaction(
+            email=payload.email,
             amount_kobo=amount_kobo,
             callback_url=callback_url,
             reference=reference
@@ -121,18 +154,49 @@ def paystack_init_payment(
         "message": "Payment initialized"
     }
 
+
+def _redirect_for_payment(db: Session, payment: Payment) -> str:
+    """The registration page URL that reports the state of ``payment``."""
+    if payment.status == COMPLETED:
+        paid_at_str = payment.payment_date.strftime("%Y-%m-%d %H:%M:%S")
+        registrations = db.query(Registration).filter(Registration.order_id == payment.order_id).all()
+        courses = [{"title": reg.course.title, "price": float(reg.course.price)} for reg in registrations]
+
+        # Generate a unique token for accessing payment details
+        token = str(uuid.uuid4())
+        payment_success_tokens().set(token, {
+            "order_id": payment.order_id,
+            "amount": float(payment.amount),
+            "payment_date": paid_at_str,
+            "courses": courses
+        })
+        return f"/registration?payment_success=true&order_id={payment.order_id}&token={token}"
+    return f"/registration?payment_success=false&order_id={payment.order_id}"
+
+
+def _redirect_for_reference(db: Session, reference: str) -> str:
+    payment = db.query(Payment).filter(Payment.transaction_id == reference).first()
+    if payment is None:
+        return "/registration?payment_error=payment_not_found"
+    return _redirect_for_payment(db, payment)
+
+
 @router.get("/verify")
-def paystack_verify_payment(
+async def paystack_verify_payment(
     request: Request,
     reference: str,
     db: Session = Depends(get_db)
 ):
     """
-    Verifies a Paystack payment using the transaction reference.
-    ... (rest of the docstring as before)
+    Redirects the user back after checkout with the outcome of the payment.
+
+    Usually the webhook has already confirmed the payment, so this only reads
+    the stored state. Otherwise (webhook delayed or not configured) the
+    transaction is verified with Paystack; concurrent hits for the same
+    reference share a single verification (see payment_verification).
     """
     try:
-        verify_resp = verify_transaction(reference)
+        payment_status = await verify_payment(reference)
     except HTTPException as e:
         logger.error(f"Paystack verify HTTPException: {e.detail}")
         return RedirectResponse(url=f"/registration?payment_error={e.detail}", status_code=302)
@@ -140,76 +204,49 @@ def paystack_verify_payment(
         logger.error(f"Unexpected error verifying Paystack: {str(exc)}")
         return RedirectResponse(url="/registration?payment_error=unexpected", status_code=302)
 
-    if not verify_resp.get("status"):
-        message = verify_resp.get("message", "Verification returned status=False")
-        logger.error(f"Paystack verify error: {message}")
-        return RedirectResponse(url=f"/registration?payment_error={message}", status_code=302)
-
-    data = verify_resp["data"]
-    paystack_status = data["status"]  # Expected "success" if paid
-
-    payment = db.query(Payment).filter(Payment.transaction_id == reference).first()
-    if not payment:
+    if payment_status is None:
         logger.error(f"No Payment record found for reference={reference}")
         return RedirectResponse(url="/registration?payment_error=payment_not_found", status_code=302)
 
-    order_obj = db.query(Order).filter(Order.id == payment.order_id).first()
-    if not order_obj:
-        logger.error(f"No Order found for Payment.order_id={payment.order_id}")
-        return RedirectResponse(url="/registration?payment_error=order_not_found", status_code=302)
-
-    if paystack_status == "success":
-        payment.status = "completed"
-        payment.payment_date = datetime.utcnow()
-        order_obj.status = "paid"
-        try:
-            db.commit()
-            db.refresh(payment)
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error updating Payment/Order to paid: {str(e)}")
-            return RedirectResponse(url="/registration?payment_error=db_commit_error", status_code=302)
-
-        logger.info(f"Payment {payment.id} verified. Order {order_obj.id} marked paid.")
-        paid_at_str = payment.payment_date.strftime("%Y-%m-%d %H:%M:%S")
-        registrations = db.query(Registration).filter(Registration.order_id == order_obj.id).all()
-        courses = [{"title": reg.course.title, "price": float(reg.course.price)} for reg in registrations]
+    redirect_url = await run_in_threadpool(_redirect_for_reference, db, reference)
+    return RedirectResponse(url=redirect_url, status_code=302)
 
-        # Generate a unique token for accessing payment details
-        token = str(uuid.uuid4())
-        TEMP_PAYMENT_DATA[token] = {
-            "order_id": order_obj.id,
-            "amount": float(payment.amount),
-            "payment_date": paid_at_str,
-            "courses": courses
-        }
-
-        redirect_url = f"/registration?payment_success=true&order_id={order_obj.id}&token={token}"
-        return RedirectResponse(url=redirect_url, status_code=302)
-    else:
-        payment.status = "failed"
-        try:
-            db.commit()
-            db.refresh(payment)
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error updating Payment to failed: {str(e)}")
-            return RedirectResponse(url="/registration?payment_error=db_commit_failed", status_code=302)
-
-        logger.warning(f"Payment {payment.id} not successful. Paystack status={paystack_status}")
-        redirect_url = f"/registration?payment_success=false&order_id={order_obj.id}"
-        return RedirectResponse(url=redirect_url, status_code=302)
+
+@router.post("/webhook")
+async def paystack_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Receives Paystack events.
+
+    The signature is checked and the event stored before acknowledging;
+    payment/order updates run in the background after the response is sent.
+
+    Raises:
+      HTTPException: 401 for a missing or invalid signature, 400 for a malformed event.
+    """
+    body = await request.body()
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid signature.")
+    try:
+        event_id, created = await run_in_threadpool(record_event, db, body)
+    except InvalidEvent as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if created:
+        background_tasks.add_task(process_event_by_id, event_id)
+    return {"status": "ok"}
 
 @router.get("/success_details/{token}")
 def get_payment_success_details(token: str):
     """
     Retrieves payment success details using a temporary token.
     """
-    if token in TEMP_PAYMENT_DATA:
-        payment_data = TEMP_PAYMENT_DATA.pop(token)  # Retrieve and remove the token to prevent reuse
-        return payment_data
-    else:
+    payment_data = payment_success_tokens().pop(token)  # Retrieve and remove the token to prevent reuse
+    if payment_data is None:
         raise HTTPException(status_code=404, detail="Invalid or expired payment success token.")
+    return payment_data
     
     
 
@@ -63,7 +63,7 @@ router = APIRouter(prefix="/paystack", tags=["Paystack"])
 
 
 @router.post("/init")
-def paystack_init_payment(
+async def paystack_init_payment(
     payload: PaymentInitRequest,
     db: Session = Depends(get_db)
 ):
@@ -122,7 +122,7 @@ def paystack_init_payment(
     # 6) Call Paystack to initialize the transaction
     callback_url = "http://127.0.0.1:8002/api/paystack/verify"  # Adjust for production
     try:
-        paystack_response = initialize_transaction(
+        paystack_response = await initialize_transaction(
             email=email,
             amount_kobo=amount_kobo,
             callback_url=callback_url,
@@ -150,7 +150,7 @@ def paystack_init_payment(
 
 
 @router.get("/verify")
-def paystack_verify_payment(
+async def paystack_verify_payment(
     reference: str,
     db: Session = Depends(get_db)
 ):
@@ -171,7 +171,7 @@ def paystack_verify_payment(
                  - Redirect the user to the registration page with query parameters indicating failure.
     """
     try:
-        verify_resp = verify_transaction(reference)
+        verify_resp = await verify_transaction(reference)
     except HTTPException as e:
         logger.error(f"Paystack verify HTTPException: {e.detail}")
         return RedirectResponse(url=f"/registration?payment_error={e.detail}", status_code=302)
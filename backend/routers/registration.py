@@ -1,9 +1,9 @@
 from datetime import datetime
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend.pydanticschemas.registration import PublicRegistrationRequest
 from backend.routers.auth import pwd_context
 from backend.models.course import Course
@@ -11,6 +11,7 @@ from backend.models.order import Order
 from backend.models.registration import Registration
 from backend.models.user import User
 from backend.core.database import get_db
+from backend.services.idempotency import IDEMPOTENCY_HEADER, run_idempotent
 from backend.utils.auth_utils import create_or_get_user, set_jwt_cookie_for_user
 
 router = APIRouter()
@@ -19,14 +20,24 @@ logger = logging.getLogger(__name__)
 @router.post("/public-register")
 def public_register(
     data: PublicRegistrationRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
 ):
     """
     1. Create & commit the user in DB (no rollback if payment fails).
     2. Create & commit the order (status="pending").
     3. Create and link the registration entries to the order.
     4. Return {order_id, total_cost} to the frontend.
+
+    A retry carrying the same Idempotency-Key gets the original response back
+    without registering again (see backend.services.idempotency).
     """
+    # Passwords stay out of the stored request fingerprint.
+    payload = data.model_dump(exclude={"password", "confirm_password"})
+    return run_idempotent(db, "public-register", idempotency_key, payload, lambda: _register(data, db))
+
+
+def _register(data: PublicRegistrationRequest, db: Session) -> dict:
     if data.password != data.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match.")
 
@@ -1,21 +1,41 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-import os
-import uuid
-import shutil
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from backend.core.database import get_db
-from backend.crud.social_post import crud_social_post
+from backend.crud.social_post import crud_social_post, crud_social_post_group
 from backend.models.user import User
-from backend.pydanticschemas.social_post import SocialMediaPostCreate, SocialMediaPostSchema
+from backend.pydanticschemas.social_post import (
+    SocialMediaPostCreate,
+    SocialMediaPostSchema,
+    SocialPostGroupCreate,
+    SocialPostGroupSchema,
+)
 from backend.routers.auth import get_current_user
+from backend.services import media_store
+from backend.services.platform_media import prepare_post_media
+from backend.services.social_scheduler import notify_post_removed, notify_post_scheduled, requeue_post
+from backend.services.uploads import save_upload
 
 router = APIRouter(prefix="/admin/social-posts", tags=["Social Media"])
 
-# Directory to store uploaded media
-UPLOAD_DIR = os.path.join("frontend/static", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+async def _save_media(
+    db: Session, image: UploadFile | None, video: UploadFile | None, references: int = 1
+) -> Tuple[Optional[str], Optional[str]]:
+    """Store the uploaded image and video once, counting a reference for each row that uses them."""
+    urls = []
+    for upload, kind in ((image, "image"), (video, "video")):
+        if upload and upload.filename:
+            stored = await save_upload(upload, kind)
+            for _ in range(references):
+                media_store.acquire(db, stored)
+            urls.append(stored.url)
+        else:
+            urls.append(None)
+    return urls[0], urls[1]
+
 
 @router.get("/", response_model=List[SocialMediaPostSchema])
 async def list_posts(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -25,6 +45,7 @@ async def list_posts(db: Session = Depends(get_db), current_user: User = Depends
 
 @router.post("/", response_model=SocialMediaPostSchema, status_code=status.HTTP_201_CREATED)
 async def create_post(
+    background_tasks: BackgroundTasks,
     platform: str = Form(...),
     content: str = Form(...),
     content_type: str = Form(...),
@@ -37,24 +58,7 @@ async def create_post(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    image_url = None
-    video_url = None
-
-    if image and image.filename:
-        file_ext = os.path.splitext(image.filename)[1]
-        unique_name = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_name)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-        image_url = f"/static/uploads/{unique_name}"
-
-    if video and video.filename:
-        file_ext = os.path.splitext(video.filename)[1]
-        unique_name = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_name)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
-        video_url = f"/static/uploads/{unique_name}"
+    image_url, video_url = await _save_media(db, image, video)
 
     post_data = SocialMediaPostCreate(
         platform=platform,
@@ -64,12 +68,90 @@ async def create_post(
         video_url=video_url,
         scheduled_at=scheduled_at,
     )
-    return crud_social_post.create(db, post_data)
+    post = crud_social_post.create(db, post_data)
+    if image_url:
+        # Platform-sized image, rendered in the media process pool after the response.
+        background_tasks.add_task(prepare_post_media, post.platform, image_url)
+    notify_post_scheduled(post.id, post.scheduled_at)
+    return post
+
+@router.get("/groups", response_model=List[SocialPostGroupSchema])
+async def list_post_groups(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return crud_social_post_group.get_all(db)
+
+@router.post("/groups", response_model=SocialPostGroupSchema, status_code=status.HTTP_201_CREATED)
+async def create_post_group(
+    background_tasks: BackgroundTasks,
+    platforms: List[str] = Form(...),
+    content: str = Form(...),
+    content_type: str = Form(...),
+    scheduled_at: Optional[str] = Form(None),
+    image: UploadFile | None = File(None),
+    video: UploadFile | None = File(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cross-post one piece of content: the media is uploaded and stored once, and
+    each platform gets its own target post (status, retries) that the scheduler
+    publishes in parallel with the others.
+
+    ``platforms`` may be repeated or comma-separated.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    try:
+        group_data = SocialPostGroupCreate(
+            platforms=[name for entry in platforms for name in entry.split(",")],
+            content=content,
+            content_type=content_type,
+            scheduled_at=scheduled_at,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    # One reference for the group and one for each of its targets.
+    image_url, video_url = await _save_media(db, image, video, references=len(group_data.platforms) + 1)
+    group = crud_social_post_group.create(
+        db, group_data.model_copy(update={"image_url": image_url, "video_url": video_url}))
+    for target in group.targets:
+        if image_url:
+            background_tasks.add_task(prepare_post_media, target.platform, image_url)
+        notify_post_scheduled(target.id, target.scheduled_at)
+    return group
+
+@router.delete("/groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_post_group(group_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    group = crud_social_post_group.get(db, group_id)
+    if group is None:
+        raise HTTPException(status_code=404, detail="Post group not found")
+    target_ids = [target.id for target in group.targets]
+    media_store.release(db, group.image_url, group.video_url)
+    for target in group.targets:
+        media_store.release(db, target.image_url, target.video_url)
+    crud_social_post_group.delete(db, group_id)
+    for post_id in target_ids:
+        notify_post_removed(post_id)
+    return {"detail": f"Post group {group_id} deleted"}
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(post_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
+    post = db.query(crud_social_post.model).filter(crud_social_post.model.id == post_id).first()
+    if post:
+        media_store.release(db, post.image_url, post.video_url)
     crud_social_post.delete(db, post_id)
+    notify_post_removed(post_id)
     return {"detail": f"Post {post_id} deleted"}
 
+@router.post("/{post_id}/requeue", response_model=SocialMediaPostSchema)
+def requeue_social_post(post_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Retry a failed or dead-lettered post from scratch."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return requeue_post(db, post_id)
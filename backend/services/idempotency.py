@@ -0,0 +1,239 @@
+"""
+Idempotency Keys
+
+Clients on flaky connections retry POSTs. When a request carries an
+``Idempotency-Key`` header, the first request with that key does the work and
+its response is stored in ``idempotency_keys``; retries with the same key get
+the stored response back (marked ``Idempotent-Replayed: true``) without running
+the handler again, so no new user/order/payment rows or Paystack transactions
+are created.
+
+- The key is claimed with an ``in_progress`` row before the handler runs, so a
+  retry that arrives while the original is still running gets ``409`` instead
+  of doing the work twice. A claim left by a crashed worker lapses after
+  IDEMPOTENCY_LOCK_SECONDS.
+- Each key is bound to a fingerprint of the request body; reusing a key for a
+  different request is rejected with ``422``.
+- Only successful responses are stored. If the handler raises, the claim is
+  dropped and the client may retry with the same key.
+- Stored responses expire after IDEMPOTENCY_KEY_TTL_SECONDS.
+
+Settings:
+    - IDEMPOTENCY_KEY_TTL_SECONDS: How long a stored response is replayed.
+    - IDEMPOTENCY_LOCK_SECONDS: How long an in-progress claim blocks retries.
+
+Usage:
+    return run_idempotent(db, "public-register", idempotency_key, payload, lambda: _register(data, db))
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.core.metrics import counter
+from backend.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+IDEMPOTENCY_REQUESTS = counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key, by outcome (new, replayed, in_progress, mismatch).",
+    ["scope", "outcome"],
+)
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: Any
+
+    def to_response(self) -> JSONResponse:
+        return JSONResponse(self.body, status_code=self.status_code, headers={REPLAYED_HEADER: "true"})
+
+
+def request_fingerprint(payload: Any) -> str:
+    """SHA-256 of the canonical JSON form of a request payload."""
+    canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _validate_key(key: str) -> None:
+    if not key.strip() or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters.",
+        )
+
+
+def begin(db: Session, scope: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+    """
+    Claim ``key`` in ``scope`` for a new request. Commits.
+
+    Returns
+    -------
+    StoredResponse or None
+        The response to replay, or None if the caller now owns the key and must
+        run the request, then call ``complete`` (or ``release`` on failure).
+
+    Raises
+    ------
+    HTTPException
+        409 if the original request is still in progress, 422 if the key was
+        used for a different request.
+    """
+    _validate_key(key)
+    now = datetime.utcnow()
+    claim = {
+        IdempotencyKey.fingerprint: fingerprint,
+        IdempotencyKey.status: IN_PROGRESS,
+        IdempotencyKey.response_status: None,
+        IdempotencyKey.response_body: None,
+        IdempotencyKey.locked_until: now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+        IdempotencyKey.created_at: now,
+        IdempotencyKey.expires_at: now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    }
+    db.add(IdempotencyKey(scope=scope, key=key, **{column.key: value for column, value in claim.items()}))
+    try:
+        db.commit()
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="new")
+        return None
+    except IntegrityError:
+        db.rollback()
+
+    # Take over a record that expired or whose owner died mid-request.
+    lapsed = (
+        db.query(IdempotencyKey)
+        .filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            or_(
+                IdempotencyKey.expires_at <= now,
+                and_(IdempotencyKey.status == IN_PROGRESS, IdempotencyKey.locked_until <= now),
+            ),
+        )
+        .update(claim, synchronize_session=False)
+    )
+    db.commit()
+    if lapsed:
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="new")
+        return None
+
+    record = db.query(IdempotencyKey).filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key).first()
+    if record is None:
+        # Released between our insert and read; the client can simply retry.
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="in_progress")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Request is being retried; try again.")
+    if record.fingerprint != fingerprint:
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="mismatch")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request.",
+        )
+    if record.status == COMPLETED:
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="replayed")
+        return StoredResponse(record.response_status, json.loads(record.response_body))
+    IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="in_progress")
+    retry_after = max(1, int((record.locked_until - now).total_seconds()))
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def complete(db: Session, scope: str, key: str, status_code: int, body: Any) -> None:
+    """Store the response for a claimed key. Commits."""
+    db.query(IdempotencyKey).filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key).update(
+        {
+            IdempotencyKey.status: COMPLETED,
+            IdempotencyKey.response_status: status_code,
+            IdempotencyKey.response_body: json.dumps(jsonable_encoder(body)),
+            IdempotencyKey.locked_until: None,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def release(db: Session, scope: str, key: str) -> None:
+    """Drop an in-progress claim so the request can be retried. Commits."""
+    db.rollback()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.status == IN_PROGRESS
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """Delete expired records; returns how many were removed. Commits."""
+    removed = (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.expires_at <= datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return removed
+
+
+def run_idempotent(
+    db: Session,
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Any],
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    """Run ``handler`` once per ``key`` (no key: always run it) and replay its result to retries."""
+    if key is None:
+        return handler()
+    stored = begin(db, scope, key, request_fingerprint(payload))
+    if stored is not None:
+        return stored.to_response()
+    try:
+        result = handler()
+    except Exception:
+        release(db, scope, key)
+        raise
+    complete(db, scope, key, status_code, result)
+    return result
+
+
+async def run_idempotent_async(
+    db: Session,
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    """``run_idempotent`` for async handlers; database work runs in the threadpool."""
+    if key is None:
+        return await handler()
+    stored = await run_in_threadpool(begin, db, scope, key, request_fingerprint(payload))
+    if stored is not None:
+        return stored.to_response()
+    try:
+        result = await handler()
+    except Exception:
+        await run_in_threadpool(release, db, scope, key)
+        raise
+    await run_in_threadpool(complete, db, scope, key, status_code, result)
+    return result
@@ -0,0 +1,325 @@
+"""
+Responsive Image Derivatives
+
+This module turns a source image served from ``/static`` into a set of
+smaller, modern-format derivatives and a tiny inline placeholder, so pages
+can ship ``srcset`` markup instead of multi-megabyte originals.
+
+For every source image we produce:
+    - One file per width in DERIVATIVE_WIDTHS (never upscaled) for each
+      enabled format (WebP always, AVIF when Pillow supports it).
+    - A ~16px wide WebP placeholder, stored inline as a data URI.
+    - A ``manifest.json`` describing the variants, read by the template helper.
+
+Derivatives live under ``frontend/static/derivatives/<relative source path>/``,
+e.g. ``/static/images/hero.webp`` -> ``/static/derivatives/images/hero.webp/640.webp``.
+
+Usage:
+------
+1. Offline, for the images already in the repository::
+
+       python -m backend.services.image_processing            # images + uploads
+       python -m backend.services.image_processing --force frontend/static/images
+
+2. In the background after an upload (see ``admin_courses``)::
+
+       background_tasks.add_task(generate_derivatives_for_url, image_url)
+
+3. In templates, via the ``responsive_image`` global registered by ``pages``::
+
+       {{ responsive_image(course.image_url, alt=course.title, sizes="(min-width: 768px) 33vw, 100vw") }}
+"""
+
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+from html import escape
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from markupsafe import Markup
+
+try:
+    from PIL import Image, ImageOps, features
+except ModuleNotFoundError:  # Pillow is optional; pages fall back to the original image.
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "static"))
+STATIC_URL_PREFIX = "/static/"
+DERIVATIVE_DIRNAME = "derivatives"
+DERIVATIVE_ROOT = os.path.join(STATIC_ROOT, DERIVATIVE_DIRNAME)
+MANIFEST_NAME = "manifest.json"
+
+DERIVATIVE_WIDTHS: Tuple[int, ...] = (320, 640, 960, 1280, 1920)
+PLACEHOLDER_WIDTH = 16
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tiff"}
+
+# Encoder settings per output format: (Pillow format name, MIME type, save kwargs)
+FORMAT_OPTIONS: Dict[str, Tuple[str, str, dict]] = {
+    "avif": ("AVIF", "image/avif", {"quality": 50, "speed": 8}),
+    "webp": ("WEBP", "image/webp", {"quality": 75, "method": 4}),
+}
+
+
+def enabled_formats() -> List[str]:
+    """Return the output formats supported by the installed Pillow, best first."""
+    if Image is None:
+        return []
+    formats = []
+    if features.check("avif"):
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    return formats
+
+
+# Path helpers ---------------------------------------------------------------
+
+def url_to_path(url: Optional[str]) -> Optional[str]:
+    """Map a ``/static/...`` URL to a file under STATIC_ROOT, or None for anything else."""
+    if not url or not url.startswith(STATIC_URL_PREFIX):
+        return None
+    relative = url[len(STATIC_URL_PREFIX):].split("?", 1)[0]
+    path = os.path.abspath(os.path.join(STATIC_ROOT, relative))
+    if not path.startswith(STATIC_ROOT + os.sep):
+        return None
+    return path
+
+
+def _relative_source(source_path: str) -> str:
+    return os.path.relpath(os.path.abspath(source_path), STATIC_ROOT).replace(os.sep, "/")
+
+
+def derivative_dir(source_path: str) -> str:
+    """Directory holding the derivatives of ``source_path``."""
+    return os.path.join(DERIVATIVE_ROOT, *_relative_source(source_path).split("/"))
+
+
+def _derivative_url(source_path: str, filename: str) -> str:
+    return f"{STATIC_URL_PREFIX}{DERIVATIVE_DIRNAME}/{_relative_source(source_path)}/{filename}"
+
+
+def target_widths(original_width: int) -> List[int]:
+    """Widths to generate for an image, never upscaling past the original."""
+    widths = [w for w in DERIVATIVE_WIDTHS if w < original_width]
+    if original_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+# Generation -----------------------------------------------------------------
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _encode(image, fmt: str) -> bytes:
+    pil_format, _, options = FORMAT_OPTIONS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def prepare_image(image):
+    """Apply EXIF orientation and convert to a mode the WebP/AVIF encoders accept."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("P", "PA", "LA"):
+        return image.convert("RGBA")
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGB")
+    return image
+
+
+def resize_to_width(image, width: int):
+    """Downscale ``image`` to ``width`` keeping its aspect ratio (never upscales)."""
+    if width >= image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def load_manifest(source_path: str) -> Optional[dict]:
+    manifest_path = os.path.join(derivative_dir(source_path), MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_derivatives(source_path: str, force: bool = False) -> Optional[dict]:
+    """
+    Generate all derivatives and the placeholder for one source image.
+
+    Parameters
+    ----------
+    source_path : str
+        Path of an image file under STATIC_ROOT.
+    force : bool
+        Regenerate even if an up-to-date manifest already exists.
+
+    Returns
+    -------
+    dict | None
+        The manifest written for the image, or None if Pillow is missing or the
+        file could not be processed.
+    """
+    if Image is None:
+        logger.warning("Pillow is not installed; skipping derivatives for %s", source_path)
+        return None
+
+    source_path = os.path.abspath(source_path)
+    source_mtime = os.path.getmtime(source_path)
+    if not force:
+        existing = load_manifest(source_path)
+        if existing and existing.get("source_mtime") == source_mtime:
+            return existing
+
+    try:
+        with Image.open(source_path) as original:
+            original.load()
+            image = prepare_image(original)
+    except Exception as e:
+        logger.error(f"Could not open image {source_path}: {str(e)}")
+        return None
+
+    out_dir = derivative_dir(source_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    variants: Dict[str, List[List]] = {}
+    for fmt in enabled_formats():
+        variants[fmt] = []
+        for width in target_widths(image.width):
+            filename = f"{width}.{fmt}"
+            _atomic_write(os.path.join(out_dir, filename), _encode(resize_to_width(image, width), fmt))
+            variants[fmt].append([width, _derivative_url(source_path, filename)])
+
+    placeholder = base64.b64encode(_encode(resize_to_width(image, PLACEHOLDER_WIDTH), "webp")).decode("ascii")
+    manifest = {
+        "source": f"{STATIC_URL_PREFIX}{_relative_source(source_path)}",
+        "source_mtime": source_mtime,
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+        "placeholder": f"data:image/webp;base64,{placeholder}",
+    }
+    _atomic_write(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest).encode("utf-8"))
+    _manifest_cache.pop(manifest["source"], None)
+    logger.info(f"Generated {sum(len(v) for v in variants.values())} derivatives for {manifest['source']}")
+    return manifest
+
+
+def generate_derivatives_for_url(url: Optional[str]) -> Optional[dict]:
+    """Background-task entry point: generate derivatives for a ``/static/...`` URL."""
+    path = url_to_path(url)
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        return generate_derivatives(path)
+    except Exception:
+        logger.exception("Derivative generation failed for %s", url)
+        return None
+
+
+def iter_source_images(paths: Iterable[str]) -> Iterable[str]:
+    """Yield every image file under ``paths``, skipping previously generated derivatives."""
+    for base in paths:
+        if os.path.isfile(base):
+            yield base
+            continue
+        for root, dirs, files in os.walk(base):
+            dirs[:] = [d for d in dirs if os.path.join(root, d) != DERIVATIVE_ROOT]
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS:
+                    yield os.path.join(root, name)
+
+
+# Template helper ------------------------------------------------------------
+
+# source url -> (manifest mtime, manifest)
+_manifest_cache: Dict[str, Tuple[float, Optional[dict]]] = {}
+
+
+def _cached_manifest(url: str) -> Optional[dict]:
+    path = url_to_path(url)
+    if not path:
+        return None
+    manifest_path = os.path.join(derivative_dir(path), MANIFEST_NAME)
+    try:
+        mtime = os.path.getmtime(manifest_path)
+    except OSError:
+        return None
+    cached = _manifest_cache.get(url)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    manifest = load_manifest(path)
+    _manifest_cache[url] = (mtime, manifest)
+    return manifest
+
+
+def _render_attrs(attrs: Dict[str, object]) -> str:
+    return "".join(
+        f' {name}="{escape(str(value))}"' for name, value in attrs.items() if value is not None
+    )
+
+
+def responsive_image(url: Optional[str], alt: str = "", sizes: str = "100vw", **attrs) -> Markup:
+    """
+    Render an image as ``<picture>`` with AVIF/WebP ``srcset`` sources.
+
+    Falls back to a plain ``<img>`` when the image has no derivatives (external
+    URLs, or uploads still being processed). Extra keyword arguments become
+    attributes of the ``<img>`` element, e.g. ``class``, ``style``, ``loading``.
+    """
+    img_attrs: Dict[str, object] = {"src": url or "", "alt": alt}
+    img_attrs.update(attrs)
+    manifest = _cached_manifest(url) if url else None
+    if not manifest:
+        return Markup(f"<img{_render_attrs(img_attrs)}>")
+
+    img_attrs.setdefault("width", manifest["width"])
+    img_attrs.setdefault("height", manifest["height"])
+    placeholder_style = f"background-size:cover;background-image:url({manifest['placeholder']})"
+    existing_style = img_attrs.get("style")
+    img_attrs["style"] = f"{existing_style.rstrip(';')};{placeholder_style}" if existing_style else placeholder_style
+
+    sources = []
+    for fmt, entries in manifest["variants"].items():
+        if not entries:
+            continue
+        srcset = ", ".join(f"{variant_url} {width}w" for width, variant_url in entries)
+        mime = FORMAT_OPTIONS[fmt][1]
+        sources.append(f'<source type="{mime}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">')
+    return Markup(f"<picture>{''.join(sources)}<img{_render_attrs(img_attrs)}></picture>")
+
+
+# Command line ---------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate responsive image derivatives.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[os.path.join(STATIC_ROOT, "images"), os.path.join(STATIC_ROOT, "uploads")],
+        help="Image files or directories under frontend/static (default: images and uploads).",
+    )
+    parser.add_argument("--force", action="store_true", help="Regenerate existing derivatives.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    processed = 0
+    for source in iter_source_images(p for p in args.paths if os.path.exists(p)):
+        if generate_derivatives(source, force=args.force):
+            processed += 1
+    logger.info(f"Processed {processed} images.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Database Leases
+
+Named, expiring locks stored in the ``leases`` table, so work can be coordinated
+across uvicorn workers and hosts that share the database.
+
+- ``acquire_lease`` takes the lease if it is free, expired, or already ours.
+- ``release_lease`` gives it back; only the owner can release it.
+- A holder that crashes simply lets its lease expire.
+
+Usage:
+    owner = new_owner()
+    if acquire_lease(db, f"paystack-verify:{reference}", owner, ttl=15):
+        try:
+            ...
+        finally:
+            release_lease(db, f"paystack-verify:{reference}", owner)
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.models.lease import Lease
+
+
+def new_owner() -> str:
+    """A unique owner token for one lease holder."""
+    return f"{socket.gethostname()[:32]}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+def acquire_lease(db: Session, name: str, owner: str, ttl: float) -> bool:
+    """Try to take lease ``name`` for ``ttl`` seconds; returns True on success. Commits."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    taken = (
+        db.query(Lease)
+        .filter(Lease.name == name, or_(Lease.expires_at <= now, Lease.owner == owner))
+        .update({Lease.owner: owner, Lease.expires_at: expires_at, Lease.acquired_at: now}, synchronize_session=False)
+    )
+    if taken:
+        db.commit()
+        return True
+    db.add(Lease(name=name, owner=owner, expires_at=expires_at, acquired_at=now))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Someone else holds a live lease.
+        db.rollback()
+        return False
+    return True
+
+
+def release_lease(db: Session, name: str, owner: str) -> None:
+    """Release lease ``name`` if ``owner`` still holds it. Commits."""
+    db.query(Lease).filter(Lease.name == name, Lease.owner == owner).delete(synchronize_session=False)
+    db.commit()
+
+
+def purge_expired_leases(db: Session) -> int:
+    """Delete leases that have expired; returns how many were removed. Commits."""
+    removed = db.query(Lease).filter(Lease.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+    db.commit()
+    return removed
@@ -0,0 +1,196 @@
+"""
+Content-addressed Media Store
+
+Keeps track of uploaded files by content hash so identical uploads share one
+file, and removes files that nothing references any more.
+
+- ``save_upload`` stores files under the key ``<sha256><ext>``; ``acquire`` records
+  a reference to that key in the ``media_blobs`` table (one row per file, with a
+  refcount). Files live in whichever ``storage`` backend is configured.
+- ``release`` drops a reference when a course image is replaced or a
+  course/post is deleted.
+- ``collect_garbage`` recomputes the real references from ``Course.image_url``
+  and the ``image_url``/``video_url`` of social posts and post groups, fixes
+  any refcount drift, and deletes unreferenced files (and their image
+  derivatives) once they have been unreferenced for MEDIA_GC_GRACE_SECONDS. Untracked legacy uploads that
+  nothing references are removed after the same grace period, as are platform
+  derivatives (see ``platform_media``) whose source is no longer referenced.
+
+Settings:
+    - MEDIA_GC_INTERVAL: Seconds between garbage collection runs.
+    - MEDIA_GC_GRACE_SECONDS: How long an unreferenced file is kept before deletion.
+"""
+
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.course import Course
+from backend.models.media_blob import MediaBlob
+from backend.models.social_post import SocialMediaPost, SocialPostGroup
+from backend.services.image_processing import derivative_dir
+from backend.services.platform_media import derivative_stem
+from backend.services.storage import StorageBackend, get_storage, key_from_url
+from backend.services.uploads import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+def acquire(db: Session, stored: StoredUpload) -> MediaBlob:
+    """
+    Record one more reference to a stored upload.
+
+    The change is flushed but not committed; it becomes permanent together with
+    the row that references the file.
+    """
+    blob = db.query(MediaBlob).filter(MediaBlob.filename == stored.key).first()
+    if blob is None:
+        try:
+            with db.begin_nested():
+                blob = MediaBlob(
+                    sha256=stored.sha256,
+                    filename=stored.key,
+                    size=stored.size,
+                    content_type=stored.content_type,
+                    ref_count=0,
+                )
+                db.add(blob)
+        except IntegrityError:
+            # Another request registered the same file first.
+            blob = db.query(MediaBlob).filter(MediaBlob.filename == stored.key).one()
+    blob.ref_count = MediaBlob.ref_count + 1
+    blob.released_at = None
+    db.flush()
+    return blob
+
+
+def release(db: Session, *urls: Optional[str]) -> None:
+    """Drop one reference for each media URL; unknown or external URLs are ignored."""
+    for url in urls:
+        key = key_from_url(url)
+        if not key:
+            continue
+        blob = db.query(MediaBlob).filter(MediaBlob.filename == key).first()
+        if blob is None:
+            continue
+        blob.ref_count = MediaBlob.ref_count - 1
+        blob.released_at = datetime.utcnow()
+    db.flush()
+
+
+def referenced_keys(db: Session) -> Counter:
+    """Count how many rows reference each stored file."""
+    urls: Iterable[Optional[str]] = [
+        *(row[0] for row in db.query(Course.image_url).filter(Course.image_url.isnot(None))),
+        # Usually an external video link, which key_from_url ignores; an uploaded preview is kept.
+        *(row[0] for row in db.query(Course.preview_link).filter(Course.preview_link.isnot(None))),
+        *(row[0] for row in db.query(SocialMediaPost.image_url).filter(SocialMediaPost.image_url.isnot(None))),
+        *(row[0] for row in db.query(SocialMediaPost.video_url).filter(SocialMediaPost.video_url.isnot(None))),
+        *(row[0] for row in db.query(SocialPostGroup.image_url).filter(SocialPostGroup.image_url.isnot(None))),
+        *(row[0] for row in db.query(SocialPostGroup.video_url).filter(SocialPostGroup.video_url.isnot(None))),
+    ]
+    return Counter(key for key in map(key_from_url, urls) if key)
+
+
+def _remove(storage: StorageBackend, key: str) -> int:
+    freed = storage.delete(key)
+    local_path = storage.local_path(key)
+    if local_path:
+        shutil.rmtree(derivative_dir(local_path), ignore_errors=True)
+    return freed
+
+
+def collect_garbage(db: Session, storage: Optional[StorageBackend] = None, grace_seconds: Optional[int] = None) -> Dict[str, int]:
+    """
+    Reconcile refcounts with the real references and delete orphaned uploads.
+
+    Returns
+    -------
+    dict
+        ``reconciled`` refcounts fixed, ``deleted`` files removed and ``freed_bytes``.
+    """
+    storage = storage or get_storage()
+    if grace_seconds is None:
+        grace_seconds = settings.MEDIA_GC_GRACE_SECONDS
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=grace_seconds)
+    cutoff_ts = time.time() - grace_seconds
+    stats = {"reconciled": 0, "deleted": 0, "freed_bytes": 0}
+
+    references = referenced_keys(db)
+    # A deduplicated upload bumps the modification time, so a concurrent
+    # re-upload of an orphaned file is never collected.
+    modified = dict(storage.list_keys())
+    tracked = set()
+    for blob in db.query(MediaBlob).all():
+        actual = references.get(blob.filename, 0)
+        if blob.ref_count != actual:
+            stats["reconciled"] += 1
+            blob.ref_count = actual
+            if actual == 0 and blob.released_at is None:
+                blob.released_at = now
+        expired = (blob.released_at or blob.created_at) <= cutoff and modified.get(blob.filename, 0) <= cutoff_ts
+        if actual == 0 and expired:
+            stats["freed_bytes"] += _remove(storage, blob.filename)
+            stats["deleted"] += 1
+            db.delete(blob)
+        tracked.add(blob.filename)
+    db.commit()
+
+    # Uploads from before content addressing and replaced files. Platform
+    # derivatives live as long as their source is referenced.
+    referenced_stems = {os.path.splitext(key)[0] for key in references}
+    for key, mtime in modified.items():
+        if key in tracked or key in references or mtime > cutoff_ts:
+            continue
+        if derivative_stem(key) in referenced_stems:
+            continue
+        stats["freed_bytes"] += _remove(storage, key)
+        stats["deleted"] += 1
+    stats["freed_bytes"] += storage.purge_temp_files(cutoff_ts)
+
+    if stats["deleted"] or stats["reconciled"]:
+        logger.info(
+            f"Media GC removed {stats['deleted']} files ({stats['freed_bytes']} bytes), "
+            f"reconciled {stats['reconciled']} refcounts."
+        )
+    return stats
+
+
+def run_media_gc() -> None:
+    """Scheduler entry point: run one garbage collection pass."""
+    db = SessionLocal()
+    try:
+        collect_garbage(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Media garbage collection failed")
+    finally:
+        db.close()
+
+
+_scheduler: BackgroundScheduler | None = None
+
+def start_media_gc() -> None:
+    """Start the background media garbage collector if not already running."""
+    global _scheduler
+    if _scheduler:
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        run_media_gc,
+        IntervalTrigger(seconds=settings.MEDIA_GC_INTERVAL),
+    )
+    scheduler.start()
+    _scheduler = scheduler
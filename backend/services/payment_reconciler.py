@@ -0,0 +1,252 @@
+"""
+Pending Payment Reconciliation
+
+Payments whose user never came back from checkout (and whose webhook never
+arrived) would otherwise stay ``pending`` forever. A periodic job on the app's
+event loop re-verifies them with Paystack:
+
+- Stale pending payments (older than PAYMENT_RECONCILE_MIN_AGE_SECONDS, so users
+  still on the checkout page are left alone) are read in keyset-paginated
+  batches of PAYMENT_RECONCILE_BATCH_SIZE.
+- Each batch is verified concurrently on the shared Paystack client, at most
+  PAYMENT_RECONCILE_CONCURRENCY calls in flight.
+- Results are written with one bulk UPDATE per status
+  (``payments.apply_paystack_statuses_bulk``). References Paystack answers
+  "Transaction reference not found" for, or still reports "abandoned" (checkout
+  not completed yet) or "ongoing", are marked failed once older than
+  PAYMENT_RECONCILE_EXPIRE_SECONDS; until then the customer may still pay.
+  Other rejections leave the payment pending.
+- The run stops early while the Paystack circuit breaker is open.
+- Every uvicorn worker runs the job, but each run first takes the
+  ``payment-reconcile`` lease (``backend.services.leases``) for a whole interval
+  and renews it after every batch, so one worker reconciles per interval.
+
+Each run records ``payment_reconcile_*`` metrics: payments checked per outcome,
+run duration, throughput and lag (age of the oldest payment still pending).
+
+Settings:
+    - PAYMENT_RECONCILE_INTERVAL: Seconds between runs.
+    - PAYMENT_RECONCILE_MIN_AGE_SECONDS: Minimum age of a pending payment before it is checked.
+    - PAYMENT_RECONCILE_EXPIRE_SECONDS: Age after which payments unknown to Paystack are failed.
+    - PAYMENT_RECONCILE_BATCH_SIZE: Payments read and updated per batch.
+    - PAYMENT_RECONCILE_CONCURRENCY: Maximum concurrent Paystack verify calls.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.metrics import counter, gauge
+from backend.models.payment import Payment
+from backend.services.idempotency import purge_expired_idempotency_keys
+from backend.services.leases import acquire_lease, new_owner, purge_expired_leases
+from backend.services.payments import COMPLETED, FAILED, PENDING, apply_paystack_statuses_bulk, parse_paid_at
+from backend.services.paystack_service import PaystackClient, TransactionNotFound, get_paystack_client
+
+logger = logging.getLogger(__name__)
+
+RECONCILED = counter("payment_reconcile_payments_total", "Pending payments checked by outcome.", ["outcome"])
+RUN_DURATION = gauge("payment_reconcile_last_run_seconds", "Duration of the last reconciliation run.")
+THROUGHPUT = gauge("payment_reconcile_throughput", "Payments checked per second in the last run.")
+LAG = gauge("payment_reconcile_lag_seconds", "Age of the oldest payment still pending after the last run.")
+
+RECONCILE_LEASE = "payment-reconcile"
+# Paystack statuses of a checkout the customer may still complete.
+UNFINISHED_PAYSTACK_STATUSES = frozenset({"abandoned", "ongoing"})
+
+# A verify result: Paystack status and paid_at, or None if it could not be determined.
+Verification = Optional[Tuple[str, Optional[datetime]]]
+
+
+def _take_lease(owner: str) -> bool:
+    db = SessionLocal()
+    try:
+        # Kept until it expires, not released: workers whose timers fire later
+        # in the same interval must find it taken.
+        return acquire_lease(db, RECONCILE_LEASE, owner, settings.PAYMENT_RECONCILE_INTERVAL)
+    finally:
+        db.close()
+
+
+def _load_batch(after_id: int, cutoff: datetime, limit: int) -> List[Tuple[int, str, datetime]]:
+    db = SessionLocal()
+    try:
+        return [
+            tuple(row)
+            for row in db.query(Payment.id, Payment.transaction_id, Payment.payment_date)
+            .filter(Payment.status == PENDING, Payment.payment_date <= cutoff, Payment.id > after_id)
+            .order_by(Payment.id)
+            .limit(limit)
+        ]
+    finally:
+        db.close()
+
+
+def _apply(statuses: Dict[str, Tuple[str, Optional[datetime]]]) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return apply_paystack_statuses_bulk(db, statuses)
+    finally:
+        db.close()
+
+
+def _oldest_pending_age(now: datetime) -> float:
+    db = SessionLocal()
+    try:
+        oldest = db.query(func.min(Payment.payment_date)).filter(Payment.status == PENDING).scalar()
+        # Housekeeping: verification leases left behind by crashed workers,
+        # and idempotency records past their TTL.
+        purge_expired_leases(db)
+        purge_expired_idempotency_keys(db)
+    finally:
+        db.close()
+    return max(0.0, (now - oldest).total_seconds()) if oldest else 0.0
+
+
+class CircuitOpen(Exception):
+    """Paystack is failing fast; stop this run."""
+
+
+async def _verify(client: PaystackClient, semaphore: asyncio.Semaphore, reference: str, created: datetime, expire_before: datetime) -> Verification:
+    async with semaphore:
+        try:
+            data = (await client.verify_transaction(reference))["data"]
+        except TransactionNotFound:
+            if created <= expire_before:
+                # Never initialized on Paystack (or long gone): give up on it.
+                return "abandoned", None
+            return None
+        except HTTPException as e:
+            if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+                raise CircuitOpen()
+            # Any other rejection (a bad or rotated key, ...) says nothing about the payment.
+            logger.warning(f"Could not reconcile payment {reference}: {e.detail}")
+            return None
+    paystack_status = data.get("status")
+    if (paystack_status or "").lower() in UNFINISHED_PAYSTACK_STATUSES:
+        return ("abandoned", None) if created <= expire_before else None
+    return paystack_status, parse_paid_at(data.get("paid_at"))
+
+
+async def reconcile_pending_payments(
+    client: Optional[PaystackClient] = None, owner: Optional[str] = None
+) -> Optional[Dict[str, float]]:
+    """
+    Run one reconciliation pass.
+
+    With ``owner``, the pass runs only if that owner can take (or already holds)
+    the reconciliation lease, and stops if it loses the lease between batches.
+
+    Returns
+    -------
+    dict or None
+        ``checked``, ``completed``, ``failed``, ``unresolved`` counts, plus
+        ``duration`` (s), ``throughput`` (payments/s) and ``lag`` (s); None if
+        another worker holds the lease.
+    """
+    if owner is not None and not await run_in_threadpool(_take_lease, owner):
+        logger.debug("Payment reconciliation is running on another worker this interval.")
+        return None
+    client = client or get_paystack_client()
+    started = time.monotonic()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=settings.PAYMENT_RECONCILE_MIN_AGE_SECONDS)
+    expire_before = now - timedelta(seconds=settings.PAYMENT_RECONCILE_EXPIRE_SECONDS)
+    semaphore = asyncio.Semaphore(settings.PAYMENT_RECONCILE_CONCURRENCY)
+    stats: Dict[str, float] = {"checked": 0, "completed": 0, "failed": 0, "unresolved": 0}
+
+    after_id = 0
+    while True:
+        batch = await run_in_threadpool(_load_batch, after_id, cutoff, settings.PAYMENT_RECONCILE_BATCH_SIZE)
+        if not batch:
+            break
+        after_id = batch[-1][0]
+        results = await asyncio.gather(
+            *(_verify(client, semaphore, reference, created, expire_before) for _, reference, created in batch),
+            return_exceptions=True,
+        )
+        statuses = {}
+        checked = 0
+        circuit_open = False
+        for (_, reference, _), result in zip(batch, results):
+            if isinstance(result, CircuitOpen):
+                circuit_open = True
+                continue
+            checked += 1
+            if isinstance(result, BaseException):
+                logger.error(f"Unexpected error reconciling payment {reference}: {result!r}")
+            elif result is not None:
+                statuses[reference] = result
+        counts = await run_in_threadpool(_apply, statuses) if statuses else {}
+
+        stats["checked"] += checked
+        stats["completed"] += counts.get(COMPLETED, 0)
+        stats["failed"] += counts.get(FAILED, 0)
+        stats["unresolved"] += checked - sum(counts.values())
+        if circuit_open:
+            logger.warning("Paystack circuit is open; stopping payment reconciliation early.")
+            break
+        if len(batch) < settings.PAYMENT_RECONCILE_BATCH_SIZE:
+            break
+        if owner is not None and not await run_in_threadpool(_take_lease, owner):
+            logger.warning("Lost the payment reconciliation lease; stopping early.")
+            break
+
+    stats["duration"] = time.monotonic() - started
+    stats["throughput"] = stats["checked"] / stats["duration"] if stats["duration"] > 0 else 0.0
+    stats["lag"] = await run_in_threadpool(_oldest_pending_age, datetime.utcnow())
+
+    for outcome in ("completed", "failed", "unresolved"):
+        RECONCILED.inc(stats[outcome], outcome=outcome)
+    RUN_DURATION.set(stats["duration"])
+    THROUGHPUT.set(stats["throughput"])
+    LAG.set(stats["lag"])
+    if stats["checked"]:
+        logger.info(
+            f"Reconciled {int(stats['checked'])} pending payments in {stats['duration']:.2f}s "
+            f"({stats['completed']:.0f} completed, {stats['failed']:.0f} failed, "
+            f"{stats['throughput']:.1f}/s, lag {stats['lag']:.0f}s)"
+        )
+    return stats
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run_forever() -> None:
+    owner = new_owner()
+    while True:
+        await asyncio.sleep(settings.PAYMENT_RECONCILE_INTERVAL)
+        try:
+            await reconcile_pending_payments(owner=owner)
+        except Exception:
+            logger.exception("Payment reconciliation failed")
+
+
+def start_payment_reconciler() -> None:
+    """Start the periodic reconciliation task on the running event loop if not already running."""
+    global _task
+    if _task and not _task.done():
+        return
+    _task = asyncio.get_running_loop().create_task(_run_forever())
+
+
+async def stop_payment_reconciler() -> None:
+    """Cancel the reconciliation task (app shutdown)."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -0,0 +1,126 @@
+"""
+Coalesced Payment Verification
+
+Double-clicks, refreshes and repeated redirects to ``/api/paystack/verify`` for the
+same reference must not each call Paystack and race on the same ``Payment``.
+``verify_payment`` makes sure one verification per reference is in flight:
+
+- Within a worker, concurrent calls share one ``SingleFlight`` leader, and a
+  completed status is cached for PAYSTACK_VERIFY_CACHE_SECONDS.
+- Across workers, the leader takes the DB lease ``paystack-verify:<reference>``
+  before calling Paystack. A worker that finds the lease taken waits for the
+  holder to finish and reads the stored result instead of calling Paystack.
+- Only a completed payment is final. A failed one is verified again, since the
+  customer may retry the checkout and pay (or an expired payment may be paid late).
+
+Settings:
+    - PAYSTACK_VERIFY_CACHE_SECONDS: How long a final status is served from memory.
+    - PAYSTACK_VERIFY_LEASE_SECONDS: Lease duration; bounds how long other workers wait.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.singleflight import SingleFlight
+from backend.models.payment import Payment
+from backend.services.leases import acquire_lease, new_owner, release_lease
+from backend.services.payments import COMPLETED, TERMINAL_STATUSES, apply_paystack_status
+from backend.services.paystack_service import verify_transaction
+
+logger = logging.getLogger(__name__)
+
+LEASE_POLL_INTERVAL = 0.2
+
+_verifications: SingleFlight[Optional[str]] = SingleFlight(
+    "paystack_verify",
+    ttl=settings.PAYSTACK_VERIFY_CACHE_SECONDS,
+    cacheable=lambda payment_status: payment_status == COMPLETED,
+)
+
+
+def lease_name(reference: str) -> str:
+    return f"paystack-verify:{reference}"
+
+
+def _payment_status(reference: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        row = db.query(Payment.status).filter(Payment.transaction_id == reference).first()
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def _try_lease(reference: str, owner: str) -> bool:
+    db = SessionLocal()
+    try:
+        return acquire_lease(db, lease_name(reference), owner, settings.PAYSTACK_VERIFY_LEASE_SECONDS)
+    finally:
+        db.close()
+
+
+def _release(reference: str, owner: str) -> None:
+    db = SessionLocal()
+    try:
+        release_lease(db, lease_name(reference), owner)
+    finally:
+        db.close()
+
+
+def _apply(reference: str, paystack_status: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        result = apply_paystack_status(db, reference, paystack_status)
+        return result.payment.status if result.payment else None
+    finally:
+        db.close()
+
+
+async def _verify_once(reference: str) -> Optional[str]:
+    owner = new_owner()
+    deadline = time.monotonic() + settings.PAYSTACK_VERIFY_LEASE_SECONDS
+    waited = False
+    while True:
+        payment_status = await run_in_threadpool(_payment_status, reference)
+        if payment_status is None or payment_status == COMPLETED:
+            return payment_status
+        if waited and payment_status in TERMINAL_STATUSES:
+            # The lease holder has (re)verified it; don't verify it again.
+            return payment_status
+        if await run_in_threadpool(_try_lease, reference, owner):
+            break
+        waited = True
+        if time.monotonic() >= deadline:
+            # The holder is slow; report what we know rather than pile on.
+            return payment_status
+        await asyncio.sleep(LEASE_POLL_INTERVAL)
+
+    try:
+        verify_resp = await verify_transaction(reference)
+        paystack_status = verify_resp["data"]["status"]  # Expected "success" if paid
+        return await run_in_threadpool(_apply, reference, paystack_status)
+    finally:
+        await run_in_threadpool(_release, reference, owner)
+
+
+async def verify_payment(reference: str) -> Optional[str]:
+    """
+    Bring the Payment for ``reference`` up to date with Paystack, once.
+
+    Returns
+    -------
+    str or None
+        The resulting Payment status, or None if no Payment has this reference.
+
+    Raises
+    ------
+    HTTPException
+        Propagated from the Paystack client (400, 502, 503).
+    """
+    return await _verifications.do(reference, lambda: _verify_once(reference))
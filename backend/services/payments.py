@@ -0,0 +1,164 @@
+"""
+Payment Status Transitions
+
+The one place that moves a ``Payment`` (and its ``Order``) between states, shared
+by the browser redirect, the Paystack webhook worker and background jobs so they
+all agree on the rules:
+
+- Paystack "success" -> Payment "completed", Order "paid".
+- Paystack "failed"/"reversed"/"abandoned" -> Payment "failed".
+- Anything else (e.g. "ongoing", "pending") leaves the payment pending.
+- A completed payment is never downgraded, and repeating a transition is a
+  no-op, so events may be applied more than once and in any order.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from backend.models.order import Order
+from backend.models.payment import Payment
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+TERMINAL_STATUSES = frozenset({COMPLETED, FAILED})
+
+PAYSTACK_STATUS_MAP = {
+    "success": COMPLETED,
+    "failed": FAILED,
+    "reversed": FAILED,
+    "abandoned": FAILED,
+}
+
+
+@dataclass
+class TransitionResult:
+    payment: Optional[Payment]
+    changed: bool = False
+
+
+def payment_status_for(paystack_status: Optional[str]) -> Optional[str]:
+    """Our Payment status for a Paystack transaction status, or None to leave it pending."""
+    return PAYSTACK_STATUS_MAP.get((paystack_status or "").lower())
+
+
+def parse_paid_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse Paystack's ``paid_at`` timestamp (ISO 8601, UTC) into a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def apply_paystack_status(
+    db: Session,
+    reference: str,
+    paystack_status: Optional[str],
+    paid_at: Optional[datetime] = None,
+) -> TransitionResult:
+    """
+    Apply a Paystack transaction status to the Payment with ``reference`` and commit.
+
+    Returns
+    -------
+    TransitionResult
+        ``payment`` is None if no Payment has this reference; ``changed`` tells
+        whether anything was written.
+    """
+    payment = (
+        db.query(Payment)
+        .filter(Payment.transaction_id == reference)
+        .with_for_update()
+        .first()
+    )
+    if payment is None:
+        db.rollback()
+        logger.error(f"No Payment record found for reference={reference}")
+        return TransitionResult(None)
+
+    new_status = payment_status_for(paystack_status)
+    if new_status is None or payment.status == new_status or payment.status == COMPLETED:
+        db.rollback()
+        return TransitionResult(payment)
+
+    payment.status = new_status
+    if new_status == COMPLETED:
+        payment.payment_date = paid_at or datetime.utcnow()
+        order_obj = db.query(Order).filter(Order.id == payment.order_id).first()
+        if order_obj is not None:
+            order_obj.status = "paid"
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Payment {payment.id} ({reference}) -> {new_status}")
+    return TransitionResult(payment, changed=True)
+
+
+def apply_paystack_statuses_bulk(
+    db: Session,
+    statuses: Mapping[str, Tuple[Optional[str], Optional[datetime]]],
+) -> Dict[str, int]:
+    """
+    Apply many Paystack results at once, with one UPDATE per target status.
+
+    ``statuses`` maps a payment reference to ``(paystack_status, paid_at)``.
+    Only payments that are still pending are touched, so a concurrent webhook or
+    redirect that already finished a payment wins. Commits.
+
+    Returns
+    -------
+    dict
+        Number of payments moved to ``completed`` and ``failed``.
+    """
+    completed: Dict[str, datetime] = {}
+    failed = []
+    now = datetime.utcnow()
+    for reference, (paystack_status, paid_at) in statuses.items():
+        new_status = payment_status_for(paystack_status)
+        if new_status == COMPLETED:
+            completed[reference] = paid_at or now
+        elif new_status == FAILED:
+            failed.append(reference)
+
+    counts = {COMPLETED: 0, FAILED: 0}
+    try:
+        if completed:
+            order_ids = select(Payment.order_id).where(
+                Payment.transaction_id.in_(completed), Payment.status == PENDING
+            )
+            db.execute(
+                update(Order).where(Order.id.in_(order_ids)).values(status="paid"),
+                execution_options={"synchronize_session": False},
+            )
+            counts[COMPLETED] = db.execute(
+                update(Payment)
+                .where(Payment.transaction_id.in_(completed), Payment.status == PENDING)
+                .values(
+                    status=COMPLETED,
+                    payment_date=case(completed, value=Payment.transaction_id, else_=Payment.payment_date),
+                ),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+        if failed:
+            counts[FAILED] = db.execute(
+                update(Payment)
+                .where(Payment.transaction_id.in_(failed), Payment.status == PENDING)
+                .values(status=FAILED),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return counts
@@ -1,23 +1,48 @@
 """
 Paystack Service Integration
 
-This module provides helper functions to interact with the Paystack API:
-- Initialize a transaction for payment (with 2 retries)
-- Verify a transaction after payment (with 2 retries)
+This module provides an asynchronous client for the Paystack API:
+- Initialize a transaction for payment
+- Verify a transaction after payment
+
+Transient failures are retried with exponential backoff and jitter, limited by
+a retry budget, and a circuit breaker fails fast with a 503 "payments
+temporarily unavailable" response while Paystack is down (see
+``backend.core.resilience``).
+
+A single ``PaystackClient`` wraps one ``httpx.AsyncClient`` for the whole process,
+so calls reuse pooled keep-alive connections (HTTP/2 when the ``h2`` package is
+installed) instead of paying a TCP+TLS handshake per payment, and never block a
+worker thread while waiting on Paystack.
 
 Environment Variables Required:
 ------------------------------
 - PAYSTACK_SECRET_KEY : Your secret key from Paystack (test or live key).
 - PAYSTACK_BASE_URL   : Base URL for Paystack API. Defaults to "https://api.paystack.co".
 
+Settings:
+---------
+- PAYSTACK_TIMEOUT_SECONDS: Default per-call timeout.
+- PAYSTACK_CONNECT_TIMEOUT_SECONDS: Timeout for establishing a connection.
+- PAYSTACK_MAX_CONNECTIONS: Size of the connection pool.
+- PAYSTACK_KEEPALIVE_EXPIRY_SECONDS: How long idle connections are kept open.
+- PAYSTACK_MAX_ATTEMPTS: Attempts per call, including the first.
+- PAYSTACK_BACKOFF_BASE_SECONDS / PAYSTACK_BACKOFF_MAX_SECONDS: Retry backoff bounds.
+- PAYSTACK_RETRY_BUDGET_RATIO: Retries allowed as a fraction of recent calls.
+- PAYSTACK_BREAKER_FAILURE_THRESHOLD: Consecutive failures that open the circuit.
+- PAYSTACK_BREAKER_RECOVERY_SECONDS: How long the circuit stays open before probing.
+
 Usage:
 ------
-1. Call initialize_transaction(...) with user email, amount in kobo, a callback URL,
+1. ``start_paystack_client()`` / ``close_paystack_client()`` are called on app
+   startup and shutdown; ``get_paystack_client()`` returns the shared client.
+
+2. ``await initialize_transaction(...)`` with user email, amount in kobo, a callback URL,
    and a unique reference for the transaction. This returns a JSON response from Paystack
    containing an `authorization_url` which the user should be redirected to in order to complete payment.
 
-2. After payment, Paystack redirects (or you can manually check) to your callback
-   with the `reference`. Use verify_transaction(...) to confirm the status of the transaction.
+3. After payment, Paystack redirects (or you can manually check) to your callback
+   with the `reference`. Use ``await verify_transaction(...)`` to confirm the status of the transaction.
    This returns a JSON object indicating success or failure.
 
 References:
@@ -25,156 +50,292 @@ References:
 - Paystack API Docs: https://paystack.com/docs/api
 """
 
+import asyncio
+import importlib.util
+import logging
+import math
 import os
-import requests
+from typing import Any, Dict, Optional
+
+import httpx
 from dotenv import load_dotenv
-from requests.exceptions import RequestException, Timeout
 from fastapi import HTTPException, status
 
+from backend.core.config import settings
+from backend.core.metrics import counter
+from backend.core.resilience import Backoff, CircuitBreaker, CircuitOpenError, RetryBudget
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY", "")
 PAYSTACK_BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co")
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+PAYMENTS_UNAVAILABLE = "Payments are temporarily unavailable. Please try again in a few minutes."
+# Paystack's answer to verifying a reference it has never seen.
+NOT_FOUND_MESSAGE = "transaction reference not found"
 
-def initialize_transaction(email: str, amount_kobo: int, callback_url: str, reference: str) -> dict:
+PAYSTACK_CALLS = counter("paystack_calls_total", "Paystack API calls by outcome.", ["action", "outcome"])
+PAYSTACK_RETRIES = counter("paystack_retries_total", "Paystack API calls retried.", ["action"])
+
+
+def payments_unavailable(retry_after: float) -> HTTPException:
+    """The fail-fast response returned while the Paystack circuit is open."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=PAYMENTS_UNAVAILABLE,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class PaystackRejected(HTTPException):
     """
-    Initialize a Paystack transaction with up to 2 retries on network/timeout errors.
+    Paystack answered but refused the call (a 400 to our caller).
 
-    Parameters
-    ----------
-    email : str
-        The customer's email address.
-    amount_kobo : int
-        The amount to be charged, in Kobo (1 NGN = 100 Kobo).
-    callback_url : str
-        The URL to which Paystack will redirect after payment is completed or cancelled.
-    reference : str
-        A unique reference string for this transaction.
-
-    Returns
-    -------
-    dict
-        A JSON response from Paystack containing data such as the authorization URL
-        where the user should be redirected to make payment. The "status" field indicates
-        whether the initialization was successful (True/False).
-
-    Raises
-    ------
-    HTTPException
-        - 400 if Paystack returns a 4xx error or fails with an error message.
-        - 502 if there's a network error, timeout, or we exhaust retries.
+    ``upstream_status`` and ``message`` keep Paystack's own answer, so callers can
+    tell a bad request from, say, a rejected secret key (401).
     """
-    url = f"{PAYSTACK_BASE_URL}/transaction/initialize"
-    headers = {
-        "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "email": email,
-        "amount": amount_kobo,
-        "callback_url": callback_url,
-        "reference": reference,
-    }
-
-    attempts = 2
-    for attempt in range(attempts):
-        try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=10)
-            resp.raise_for_status()  # Raise for 4xx/5xx
-            data = resp.json()
 
-            # If "status" is False, Paystack is indicating an error
-            if not data.get("status"):
-                # E.g. { "status": false, "message": "Invalid key" }
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Paystack init error: {data.get('message')}"
-                )
-            return data
+    def __init__(self, action: str, upstream_status: int, message: str):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Paystack {action} error: {message}")
+        self.upstream_status = upstream_status
+        self.message = message
 
-        except Timeout:
-            # Retry on timeout
-            if attempt < attempts - 1:
-                continue
-            # If final attempt fails, raise 502
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="Paystack timeout after multiple attempts."
-            )
 
-        except RequestException as e:
-            # Could be a connection error, DNS error, 4xx/5xx w/ no JSON, etc.
-            if attempt < attempts - 1:
-                continue
-            # If final attempt fails, raise 502
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Network error contacting Paystack: {str(e)}"
-            )
+class TransactionNotFound(PaystackRejected):
+    """Paystack does not know the transaction reference."""
 
 
-def verify_transaction(reference: str) -> dict:
+class PaystackClient:
     """
-    Verify a Paystack transaction with up to 2 retries on network/timeout errors.
-
-    After the user completes or cancels a payment,
-    Paystack can redirect with a reference, or you
-    can otherwise retrieve the reference. Then you
-    call this endpoint to confirm the final status
-    of the transaction on Paystack's side.
+    Pooled asynchronous Paystack API client.
 
     Parameters
     ----------
-    reference : str
-        The unique transaction reference used during initialization.
-
-    Returns
-    -------
-    dict
-        A JSON response from Paystack indicating the result.
-        The "status" field indicates success (True/False),
-        and `data.status` typically shows "success" if the payment
-        was successful.
-
-    Raises
-    ------
-    HTTPException
-        - 400 if Paystack returns a 4xx error or fails with an error message.
-        - 502 if there's a network error, timeout, or we exhaust retries.
+    secret_key : str
+        Paystack secret key sent as the bearer token.
+    base_url : str
+        Base URL of the Paystack API.
+    transport : httpx.AsyncBaseTransport, optional
+        Custom transport (e.g. ``httpx.ASGITransport`` for a fake Paystack in tests).
+    breaker, retry_budget, backoff : optional
+        Resilience policies; default to ones built from settings.
     """
-    url = f"{PAYSTACK_BASE_URL}/transaction/verify/{reference}"
-    headers = {
-        "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    attempts = 2
-    for attempt in range(attempts):
-        try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
 
-            if not data.get("status"):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Paystack verify error: {data.get('message')}"
+    def __init__(
+        self,
+        secret_key: str = PAYSTACK_SECRET_KEY,
+        base_url: str = PAYSTACK_BASE_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        backoff: Optional[Backoff] = None,
+    ):
+        self.max_attempts = settings.PAYSTACK_MAX_ATTEMPTS
+        self.breaker = breaker or CircuitBreaker(
+            "paystack",
+            failure_threshold=settings.PAYSTACK_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.PAYSTACK_BREAKER_RECOVERY_SECONDS,
+        )
+        self.retry_budget = retry_budget or RetryBudget("paystack", ratio=settings.PAYSTACK_RETRY_BUDGET_RATIO)
+        self.backoff = backoff or Backoff(
+            settings.PAYSTACK_BACKOFF_BASE_SECONDS,
+            settings.PAYSTACK_BACKOFF_MAX_SECONDS,
+        )
+        self.timeout = httpx.Timeout(
+            settings.PAYSTACK_TIMEOUT_SECONDS,
+            connect=settings.PAYSTACK_CONNECT_TIMEOUT_SECONDS,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {secret_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                keepalive_expiry=settings.PAYSTACK_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=HTTP2_AVAILABLE and transport is None,
+            transport=transport,
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        action: str,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Call Paystack and return its JSON body.
+
+        Timeouts, connection errors, 429 and 5xx answers are retried with
+        exponential backoff and jitter while the retry budget allows. ``action``
+        ("init", "verify", ...) is used in error messages and metrics.
+
+        Raises
+        ------
+        HTTPException
+            - 400 if Paystack rejects the request (4xx or ``"status": false``).
+            - 502 if there's a network error, timeout, or we exhaust retries.
+            - 503 while the circuit breaker is open.
+        """
+        self.retry_budget.record_call()
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                PAYSTACK_CALLS.inc(action=action, outcome="rejected")
+                raise payments_unavailable(e.retry_after)
+
+            try:
+                resp = await self._client.request(
+                    method,
+                    path,
+                    json=json,
+                    timeout=timeout if timeout is not None else self.timeout,
                 )
-            return data
+            except httpx.TimeoutException:
+                failure = f"Paystack {action} timeout after multiple attempts."
+            except httpx.TransportError as e:
+                failure = f"Network error contacting Paystack: {str(e)}"
+            except BaseException:
+                self.breaker.record_ignored()
+                raise
+            else:
+                if resp.status_code not in RETRYABLE_STATUS_CODES:
+                    # Paystack answered; even a 4xx means the upstream is healthy.
+                    self.breaker.record_success()
+                    return self._parse(resp, action)
+                failure = f"Paystack {action} failed with HTTP {resp.status_code}."
 
-        except Timeout:
-            if attempt < attempts - 1:
-                continue
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="Paystack verification timeout after multiple attempts."
-            )
+            self.breaker.record_failure()
+            attempt += 1
+            if attempt >= self.max_attempts or not self.retry_budget.try_acquire_retry():
+                PAYSTACK_CALLS.inc(action=action, outcome="error")
+                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=failure)
+            PAYSTACK_RETRIES.inc(action=action)
+            await asyncio.sleep(self.backoff.delay(attempt - 1))
 
-        except RequestException as e:
-            if attempt < attempts - 1:
-                continue
+    @staticmethod
+    def _parse(resp: httpx.Response, action: str) -> Dict[str, Any]:
+        try:
+            data = resp.json()
+        except ValueError:
+            PAYSTACK_CALLS.inc(action=action, outcome="error")
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Network error verifying Paystack payment: {str(e)}"
+                detail=f"Invalid response from Paystack {action} (HTTP {resp.status_code})."
             )
+
+        # If "status" is False, Paystack is indicating an error
+        if resp.is_error or not data.get("status"):
+            # E.g. { "status": false, "message": "Invalid key" }
+            PAYSTACK_CALLS.inc(action=action, outcome="rejected_by_paystack")
+            message = str(data.get("message") or "")
+            not_found = resp.status_code in (400, 404) and message.lower().startswith(NOT_FOUND_MESSAGE)
+            raise (TransactionNotFound if not_found else PaystackRejected)(action, resp.status_code, message)
+        PAYSTACK_CALLS.inc(action=action, outcome="success")
+        return data
+
+    async def initialize_transaction(
+        self, email: str, amount_kobo: int, callback_url: str, reference: str, timeout: Optional[float] = None
+    ) -> dict:
+        """
+        Initialize a Paystack transaction.
+
+        Parameters
+        ----------
+        email : str
+            The customer's email address.
+        amount_kobo : int
+            The amount to be charged, in Kobo (1 NGN = 100 Kobo).
+        callback_url : str
+            The URL to which Paystack will redirect after payment is completed or cancelled.
+        reference : str
+            A unique reference string for this transaction.
+        timeout : float, optional
+            Overrides the default per-call timeout.
+
+        Returns
+        -------
+        dict
+            A JSON response from Paystack containing data such as the authorization URL
+            where the user should be redirected to make payment.
+        """
+        payload = {
+            "email": email,
+            "amount": amount_kobo,
+            "callback_url": callback_url,
+            "reference": reference,
+        }
+        return await self.request("POST", "/transaction/initialize", "init", json=payload, timeout=timeout)
+
+    async def verify_transaction(self, reference: str, timeout: Optional[float] = None) -> dict:
+        """
+        Verify a Paystack transaction.
+
+        Returns
+        -------
+        dict
+            A JSON response from Paystack; `data.status` is "success" if the payment
+            was successful.
+        """
+        return await self.request("GET", f"/transaction/verify/{reference}", "verify", timeout=timeout)
+
+
+_client: Optional[PaystackClient] = None
+
+
+def get_paystack_client() -> PaystackClient:
+    """Return the process-wide Paystack client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = PaystackClient()
+    return _client
+
+
+def set_paystack_client(client: Optional[PaystackClient]) -> None:
+    """Replace the process-wide client (used by tests and tooling)."""
+    global _client
+    _client = client
+
+
+async def start_paystack_client() -> None:
+    """App startup hook: open the shared connection pool."""
+    get_paystack_client()
+    logger.info(f"Paystack client ready (http2={HTTP2_AVAILABLE}).")
+
+
+async def close_paystack_client() -> None:
+    """App shutdown hook: close pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def initialize_transaction(email: str, amount_kobo: int, callback_url: str, reference: str) -> dict:
+    """Initialize a transaction with the shared client (see ``PaystackClient.initialize_transaction``)."""
+    return await get_paystack_client().initialize_transaction(email, amount_kobo, callback_url, reference)
+
+
+async def verify_transaction(reference: str) -> dict:
+    """Verify a transaction with the shared client (see ``PaystackClient.verify_transaction``)."""
+    return await get_paystack_client().verify_transaction(reference)
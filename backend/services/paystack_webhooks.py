@@ -0,0 +1,203 @@
+"""
+Paystack Webhook Ingestion
+
+Paystack POSTs transaction events to ``/api/paystack/webhook``. The endpoint only
+verifies the signature, stores the event and acknowledges it; the status change
+happens here, off the request path:
+
+- ``verify_signature``: HMAC-SHA512 of the raw body with the secret key must
+  match the ``x-paystack-signature`` header.
+- ``record_event``: stores the event once; Paystack redeliveries of the same
+  event are recognised by their ``event_key`` and ignored.
+- ``process_event``: claims a stored event and applies it through
+  ``backend.services.payments``. Runs as a background task right after the
+  response, and from a periodic sweep that retries failures and picks up events
+  left behind by a crash.
+
+Settings:
+    - PAYSTACK_WEBHOOK_SWEEP_INTERVAL: Seconds between sweeps for unprocessed events.
+    - PAYSTACK_WEBHOOK_MAX_ATTEMPTS: Attempts before an event is marked failed.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.paystack_event import PaystackEvent
+from backend.services.payments import apply_paystack_status, parse_paid_at
+from backend.services.paystack_service import PAYSTACK_SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "x-paystack-signature"
+# Events that carry a transaction status we act on.
+TRANSACTION_EVENTS = frozenset({"charge.success"})
+# A claim older than this is assumed to belong to a crashed worker.
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+class InvalidEvent(ValueError):
+    """The webhook body is not a Paystack event."""
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret_key: str = PAYSTACK_SECRET_KEY) -> bool:
+    """Check ``x-paystack-signature`` (hex HMAC-SHA512 of the raw body)."""
+    if not signature or not secret_key:
+        return False
+    expected = hmac.new(secret_key.encode("utf-8"), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+def parse_event(body: bytes) -> Tuple[str, str, Optional[str], dict]:
+    """Return ``(event_key, event, reference, payload)`` for a webhook body."""
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, ValueError):
+        raise InvalidEvent("Body is not JSON.")
+    if not isinstance(payload, dict) or not isinstance(payload.get("event"), str):
+        raise InvalidEvent("Missing event type.")
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    reference = data.get("reference")
+    identity = data.get("id") or reference or hashlib.sha256(body).hexdigest()
+    return f"{payload['event']}:{identity}", payload["event"], reference, payload
+
+
+def record_event(db: Session, body: bytes) -> Tuple[int, bool]:
+    """
+    Store a verified webhook body.
+
+    Returns
+    -------
+    tuple
+        ``(event_id, created)``; ``created`` is False for a redelivered event.
+    """
+    event_key, event, reference, _ = parse_event(body)
+    existing = db.query(PaystackEvent.id).filter(PaystackEvent.event_key == event_key).first()
+    if existing:
+        return existing[0], False
+    row = PaystackEvent(
+        event_key=event_key,
+        event=event,
+        reference=reference,
+        payload=body.decode("utf-8"),
+        status="pending",
+    )
+    db.add(row)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent delivery of the same event won.
+        db.rollback()
+        existing = db.query(PaystackEvent.id).filter(PaystackEvent.event_key == event_key).one()
+        return existing[0], False
+    return row.id, True
+
+
+def _claim(db: Session, event_id: int) -> bool:
+    now = datetime.utcnow()
+    claimed = (
+        db.query(PaystackEvent)
+        .filter(PaystackEvent.id == event_id, PaystackEvent.status == "pending")
+        .filter((PaystackEvent.claimed_at.is_(None)) | (PaystackEvent.claimed_at < now - CLAIM_TIMEOUT))
+        .update({PaystackEvent.claimed_at: now}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def process_event(db: Session, event_id: int) -> bool:
+    """
+    Apply one stored event if no other worker holds it.
+
+    Returns True if the event was processed by this call.
+    """
+    if not _claim(db, event_id):
+        return False
+    event = db.query(PaystackEvent).filter(PaystackEvent.id == event_id).one()
+    try:
+        if event.event in TRANSACTION_EVENTS and event.reference:
+            data = json.loads(event.payload).get("data") or {}
+            result = apply_paystack_status(
+                db,
+                event.reference,
+                data.get("status", "success"),
+                paid_at=parse_paid_at(data.get("paid_at")),
+            )
+            if result.payment is None:
+                raise LookupError(f"No Payment for reference {event.reference}")
+        event.status = "processed"
+        event.processed_at = datetime.utcnow()
+        event.last_error = None
+    except Exception as e:
+        db.rollback()
+        event = db.query(PaystackEvent).filter(PaystackEvent.id == event_id).one()
+        event.attempts += 1
+        event.last_error = str(e)
+        if event.attempts >= settings.PAYSTACK_WEBHOOK_MAX_ATTEMPTS:
+            event.status = "failed"
+            logger.error(f"Giving up on Paystack event {event.id} ({event.event_key}): {e}")
+        else:
+            logger.warning(f"Paystack event {event.id} failed (attempt {event.attempts}): {e}")
+    event.claimed_at = None
+    db.commit()
+    return event.status == "processed"
+
+
+def process_event_by_id(event_id: int) -> None:
+    """Background-task entry point: process one event in its own session."""
+    db = SessionLocal()
+    try:
+        process_event(db, event_id)
+    except Exception:
+        db.rollback()
+        logger.exception(f"Processing Paystack event {event_id} failed")
+    finally:
+        db.close()
+
+
+def process_pending_events(limit: int = 100) -> int:
+    """Scheduler entry point: process unprocessed events, oldest first."""
+    db = SessionLocal()
+    processed = 0
+    try:
+        ids = [
+            row[0]
+            for row in db.query(PaystackEvent.id)
+            .filter(PaystackEvent.status == "pending")
+            .order_by(PaystackEvent.id)
+            .limit(limit)
+        ]
+        for event_id in ids:
+            processed += process_event(db, event_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Paystack webhook sweep failed")
+    finally:
+        db.close()
+    return processed
+
+
+_scheduler: BackgroundScheduler | None = None
+
+def start_webhook_worker() -> None:
+    """Start the periodic sweep for unprocessed webhook events if not already running."""
+    global _scheduler
+    if _scheduler:
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        process_pending_events,
+        IntervalTrigger(seconds=settings.PAYSTACK_WEBHOOK_SWEEP_INTERVAL),
+    )
+    scheduler.start()
+    _scheduler = scheduler
@@ -0,0 +1,235 @@
+"""
+Per-platform Media Derivatives
+
+Platforms limit the size, aspect ratio and file size of attached images. When a
+social post is created, its image is rendered once for the post's platform in a
+``ProcessPoolExecutor``, off the request path and outside the web worker's GIL:
+
+- The image is cropped (centred) into the platform's aspect ratio range,
+  downscaled to fit its maximum dimensions and encoded as JPEG, lowering the
+  quality until it fits the platform's byte limit.
+- The result is stored next to the original in media storage, under a key
+  derived from the source key, the platform and the spec
+  (``<stem>.<platform>-<spec tag>.jpg``). Identical uploads share derivatives,
+  and changing a spec produces new ones.
+- At dispatch, ``platform_image_url`` returns the stored derivative. If
+  preprocessing has not finished (or failed), it renders the derivative in the
+  calling thread instead, so platform limits are always applied.
+
+Videos are published unchanged. Re-encoding them to platform bitrate limits
+needs ffmpeg, which is not a dependency.
+
+Settings:
+    - SOCIAL_MEDIA_PROCESS_WORKERS: Processes rendering platform derivatives.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.services.post_dispatcher import platform_key
+from backend.services.storage import TEMP_PREFIX, StorageBackend, get_storage, key_from_url
+
+try:
+    from PIL import Image, ImageOps
+except ModuleNotFoundError:  # Pillow is optional; posts then carry the original image.
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_PATTERN = re.compile(r"^(?P<stem>.+)\.(?P<platform>[a-z0-9]+)-(?P<tag>[0-9a-f]{8})\.jpg$")
+MIN_QUALITY = 40
+
+
+@dataclass(frozen=True)
+class MediaSpec:
+    """Image limits of one platform."""
+
+    max_width: int
+    max_height: int
+    max_bytes: int
+    min_aspect: Optional[float] = None  # width / height
+    max_aspect: Optional[float] = None
+    quality: int = 85
+
+    @property
+    def tag(self) -> str:
+        return hashlib.sha1(repr(self).encode("ascii")).hexdigest()[:8]
+
+
+PLATFORM_MEDIA_SPECS = {
+    "facebook": MediaSpec(max_width=2048, max_height=2048, max_bytes=4 * 1024 * 1024),
+    "x": MediaSpec(max_width=4096, max_height=4096, max_bytes=5 * 1024 * 1024),
+    "instagram": MediaSpec(max_width=1080, max_height=1350, max_bytes=8 * 1024 * 1024, min_aspect=4 / 5, max_aspect=1.91),
+}
+
+
+def media_spec(platform: str) -> Optional[MediaSpec]:
+    return PLATFORM_MEDIA_SPECS.get(platform_key(platform))
+
+
+def derivative_key(source_key: str, platform: str, spec: MediaSpec) -> str:
+    return f"{os.path.splitext(source_key)[0]}.{platform_key(platform)}-{spec.tag}.jpg"
+
+
+def derivative_stem(key: str) -> Optional[str]:
+    """The source key's stem if ``key`` names a platform derivative, else None (used by the media GC)."""
+    match = DERIVATIVE_PATTERN.match(key)
+    return match.group("stem") if match else None
+
+
+# Rendering (runs in worker processes) ----------------------------------------
+
+def _crop_to_aspect(image, spec: MediaSpec):
+    aspect = image.width / image.height
+    if spec.max_aspect and aspect > spec.max_aspect:
+        width = round(image.height * spec.max_aspect)
+        left = (image.width - width) // 2
+        return image.crop((left, 0, left + width, image.height))
+    if spec.min_aspect and aspect < spec.min_aspect:
+        height = round(image.width / spec.min_aspect)
+        top = (image.height - height) // 2
+        return image.crop((0, top, image.width, top + height))
+    return image
+
+
+def _flatten(image):
+    """JPEG has no alpha channel: composite transparent images onto white."""
+    if image.mode in ("P", "PA", "LA"):
+        image = image.convert("RGBA")
+    if image.mode == "RGBA":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def render_platform_image(data: bytes, spec: MediaSpec) -> bytes:
+    """Fit the image in ``data`` to ``spec``; returns JPEG bytes."""
+    with Image.open(io.BytesIO(data)) as original:
+        image = _flatten(ImageOps.exif_transpose(original))
+    image = _crop_to_aspect(image, spec)
+    image.thumbnail((spec.max_width, spec.max_height), Image.LANCZOS)
+    while True:
+        quality = spec.quality
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            if buffer.tell() <= spec.max_bytes or quality <= MIN_QUALITY:
+                break
+            quality -= 10
+        if buffer.tell() <= spec.max_bytes or min(image.size) <= 64:
+            return buffer.getvalue()
+        image = image.resize((round(image.width * 0.75), round(image.height * 0.75)), Image.LANCZOS)
+
+
+# Storage -------------------------------------------------------------------
+
+def _read(storage: StorageBackend, key: str) -> bytes:
+    body = storage.open(key)
+    try:
+        return body.read()
+    finally:
+        body.close()
+
+
+def _store(storage: StorageBackend, key: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=storage.temp_dir)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        storage.save_file(tmp_path, key, "image/jpeg")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _target(platform: str, url: Optional[str]) -> Optional[Tuple[str, MediaSpec, str]]:
+    """``(source key, spec, derivative key)`` for a stored image on a platform with limits."""
+    if Image is None:
+        return None
+    key = key_from_url(url)
+    spec = media_spec(platform)
+    if key is None or spec is None or derivative_stem(key) is not None:
+        return None
+    return key, spec, derivative_key(key, platform, spec)
+
+
+# Entry points ----------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_media_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the web worker already runs scheduler threads.
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.SOCIAL_MEDIA_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_media_pool() -> None:
+    """App shutdown hook: stop the worker processes."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def prepare_post_media(platform: str, image_url: Optional[str]) -> Optional[str]:
+    """
+    Background-task entry point: render the platform derivative of a post's image.
+
+    Returns the derivative's URL, or None if the image needs none or it failed.
+    """
+    target = _target(platform, image_url)
+    if target is None:
+        return None
+    key, spec, derived = target
+    storage = get_storage()
+    try:
+        if not await run_in_threadpool(storage.exists, derived):
+            data = await run_in_threadpool(_read, storage, key)
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                get_media_pool(), render_platform_image, data, spec)
+            await run_in_threadpool(_store, storage, derived, rendered)
+            logger.info(f"Prepared {platform_key(platform)} image {derived} ({len(rendered)} bytes)")
+    except Exception:
+        logger.exception("Preparing %s media failed for %s", platform, image_url)
+        return None
+    return storage.url(derived)
+
+
+def platform_image_url(url: Optional[str], platform: str) -> Optional[str]:
+    """The image to publish on ``platform``: its derivative, rendered now if still missing."""
+    target = _target(platform, url)
+    if target is None:
+        return url
+    key, spec, derived = target
+    storage = get_storage()
+    try:
+        if not storage.exists(derived):
+            logger.info(f"Rendering {derived} at dispatch; preprocessing has not finished.")
+            _store(storage, derived, render_platform_image(_read(storage, key), spec))
+    except Exception:
+        logger.exception("Rendering %s media failed for %s; publishing the original", platform, url)
+        return url
+    return storage.url(derived)
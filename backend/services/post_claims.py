@@ -0,0 +1,176 @@
+"""
+Claiming Due Social Posts
+
+Every uvicorn worker runs the post scheduler. To make sure a post is published
+by only one of them, a worker first claims a batch of due posts (``draft``
+posts past ``scheduled_at`` and ``retry`` posts past ``next_attempt_at``) by
+writing its token to ``claimed_by`` and an expiry to ``lease_until``; other
+workers skip claimed posts until the lease runs out, so a worker that crashes
+mid-run only delays its posts. Several workers drain a backlog in parallel,
+each taking its own batch. Fresh posts are claimed first; retries only fill
+the rest of a batch, so a pile of failing posts cannot crowd out new ones.
+
+- MySQL/MariaDB and PostgreSQL: candidates are selected with
+  ``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent workers pick disjoint
+  rows without waiting on each other.
+- SQLite (and others): an atomic conditional ``UPDATE`` that only takes rows
+  still unclaimed; the rows carrying our token afterwards are ours.
+
+Claimed posts are loaded with only the columns needed to publish them
+(``DISPATCH_COLUMNS``). Their outcomes are written back by ``PostResultWriter``.
+It groups posts with the same new status and issues one
+``UPDATE ... WHERE id IN (...)`` per group and chunk, rather than one
+statement per post; errors, which differ from post to post, are written with
+a ``CASE id ...`` expression in the same statement.
+
+Usage:
+    owner = new_owner()
+    posts = claim_due_posts(db, owner, limit=100, lease_seconds=120)
+    ...
+    writer = PostResultWriter(db, owner)
+    writer.add(post.id, "posted")
+    writer.flush()
+    release_claims(db, owner, [post.id for post in unfinished])
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, or_
+from sqlalchemy.orm import Session, load_only
+
+from backend.models.social_post import SocialMediaPost
+
+DRAFT = "draft"
+RETRY = "retry"
+SKIP_LOCKED_DIALECTS = frozenset({"mysql", "mariadb", "postgresql"})
+# What the dispatcher and the platform handlers read from a claimed post.
+DISPATCH_COLUMNS = (
+    SocialMediaPost.id,
+    SocialMediaPost.platform,
+    SocialMediaPost.content,
+    SocialMediaPost.content_type,
+    SocialMediaPost.image_url,
+    SocialMediaPost.video_url,
+    SocialMediaPost.status,
+    SocialMediaPost.scheduled_at,
+    SocialMediaPost.next_attempt_at,
+    SocialMediaPost.attempts,
+)
+UPDATE_CHUNK_SIZE = 500
+MAX_ERROR_LENGTH = 1000
+
+
+def _unleased(now: datetime):
+    return or_(SocialMediaPost.lease_until.is_(None), SocialMediaPost.lease_until <= now)
+
+
+def _fresh(now: datetime):
+    return and_(SocialMediaPost.status == DRAFT, SocialMediaPost.scheduled_at <= now)
+
+
+def _retry(now: datetime):
+    return and_(SocialMediaPost.status == RETRY, SocialMediaPost.next_attempt_at <= now)
+
+
+def _candidate_ids(db: Session, due, order_by, now: datetime, limit: int) -> List[int]:
+    query = db.query(SocialMediaPost.id).filter(due, _unleased(now)).order_by(order_by).limit(limit)
+    if db.get_bind().dialect.name in SKIP_LOCKED_DIALECTS:
+        query = query.with_for_update(skip_locked=True)
+    return [row[0] for row in query.all()]
+
+
+def claim_due_posts(db: Session, owner: str, limit: int, lease_seconds: float) -> List[SocialMediaPost]:
+    """Claim up to ``limit`` due posts for ``owner`` and return them, fresh posts first. Commits."""
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=lease_seconds)
+    ids = _candidate_ids(db, _fresh(now), SocialMediaPost.scheduled_at, now, limit)
+    if len(ids) < limit:
+        ids += _candidate_ids(db, _retry(now), SocialMediaPost.next_attempt_at, now, limit - len(ids))
+    if not ids:
+        db.rollback()
+        return []
+    # Re-checks the claim condition, so rows taken by another worker in the
+    # meantime are left alone.
+    db.query(SocialMediaPost).filter(
+        SocialMediaPost.id.in_(ids), or_(_fresh(now), _retry(now)), _unleased(now)
+    ).update(
+        {SocialMediaPost.claimed_by: owner, SocialMediaPost.lease_until: lease_until},
+        synchronize_session=False,
+    )
+    db.commit()
+    claimed = (
+        db.query(SocialMediaPost)
+        .options(load_only(*DISPATCH_COLUMNS))
+        .filter(SocialMediaPost.id.in_(ids), SocialMediaPost.claimed_by == owner)
+        .all()
+    )
+    position = {post_id: i for i, post_id in enumerate(ids)}
+    return sorted(claimed, key=lambda post: position[post.id])
+
+
+def release_claims(db: Session, owner: str, post_ids: Sequence[int]) -> None:
+    """Give back claimed posts that were not handled, so they are due again. Commits."""
+    if not post_ids:
+        return
+    db.query(SocialMediaPost).filter(
+        SocialMediaPost.id.in_(list(post_ids)), SocialMediaPost.claimed_by == owner
+    ).update({SocialMediaPost.claimed_by: None, SocialMediaPost.lease_until: None}, synchronize_session=False)
+    db.commit()
+
+
+class PostResultWriter:
+    """Collects publish outcomes for claimed posts and writes them in set-based UPDATEs."""
+
+    def __init__(self, db: Session, owner: str, chunk_size: int = UPDATE_CHUNK_SIZE):
+        self.db = db
+        self.owner = owner
+        self.chunk_size = chunk_size
+        # (status, next_attempt_at) -> {post id: last error}
+        self._groups: Dict[Tuple[str, Optional[datetime]], Dict[int, Optional[str]]] = {}
+
+    def add(
+        self,
+        post_id: int,
+        status: str,
+        next_attempt_at: Optional[datetime] = None,
+        last_error: Optional[str] = None,
+    ) -> None:
+        """Record that a publish attempt of ``post_id`` ended in ``status``."""
+        if last_error is not None:
+            last_error = last_error[:MAX_ERROR_LENGTH]
+        self._groups.setdefault((status, next_attempt_at), {})[post_id] = last_error
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._groups.values())
+
+    def flush(self) -> int:
+        """Write everything recorded so far and release the claims; returns rows updated. Commits."""
+        updated = 0
+        for (status, next_attempt_at), errors in self._groups.items():
+            ids = list(errors)
+            for start in range(0, len(ids), self.chunk_size):
+                chunk = ids[start:start + self.chunk_size]
+                distinct = {errors[post_id] for post_id in chunk}
+                if len(distinct) == 1:
+                    last_error = distinct.pop()
+                else:
+                    last_error = case({post_id: errors[post_id] for post_id in chunk}, value=SocialMediaPost.id)
+                updated += (
+                    self.db.query(SocialMediaPost)
+                    .filter(SocialMediaPost.id.in_(chunk), SocialMediaPost.claimed_by == self.owner)
+                    .update(
+                        {
+                            SocialMediaPost.status: status,
+                            SocialMediaPost.attempts: SocialMediaPost.attempts + 1,
+                            SocialMediaPost.next_attempt_at: next_attempt_at,
+                            SocialMediaPost.last_error: last_error,
+                            SocialMediaPost.claimed_by: None,
+                            SocialMediaPost.lease_until: None,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+        self._groups.clear()
+        self.db.commit()
+        return updated
@@ -0,0 +1,171 @@
+"""
+Concurrent Social Post Dispatch
+
+Publishes a batch of due posts with one thread pool ("lane") per platform, so a
+slow or rate-limited platform only delays its own posts:
+
+- Each lane runs at most SOCIAL_PLATFORM_CONCURRENCY[platform] handlers at once
+  (SOCIAL_DEFAULT_CONCURRENCY for platforms not listed).
+- Handlers for a platform are started at most SOCIAL_PLATFORM_RATE_LIMITS[platform]
+  times per second, shared across runs (unlisted platforms are not limited).
+- A handler that runs longer than SOCIAL_DISPATCH_TIMEOUT_SECONDS is reported as
+  timed out. Python threads cannot be killed, so its thread is abandoned and
+  the run moves on.
+- Posts that have not started when the run reaches its time limit (by default
+  the scheduler interval) are deferred. They stay due for the next run instead
+  of overrunning this one.
+
+Per-platform latency and outcomes are exported as ``social_post_publish_seconds``
+and ``social_posts_dispatched_total``.
+
+Settings:
+    - SOCIAL_DEFAULT_CONCURRENCY / SOCIAL_PLATFORM_CONCURRENCY: Handlers in flight per platform.
+    - SOCIAL_PLATFORM_RATE_LIMITS: Posts per second per platform.
+    - SOCIAL_DISPATCH_TIMEOUT_SECONDS: Per-post handler timeout.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from backend.core.metrics import counter, histogram
+from backend.core.resilience import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+POSTED = "posted"
+FAILED = "failed"
+TIMEOUT = "timeout"
+UNSUPPORTED = "unsupported"
+DEFERRED = "deferred"
+
+# Names that share a platform's lane, limits and metrics.
+PLATFORM_ALIASES = {"twitter": "x"}
+# Upper bound on how long the collector sleeps between checks for timeouts.
+POLL_INTERVAL = 0.1
+
+PUBLISH_SECONDS = histogram("social_post_publish_seconds", "Time spent in a platform handler.", ["platform"])
+DISPATCHED = counter("social_posts_dispatched_total", "Dispatched social posts by outcome.", ["platform", "outcome"])
+
+
+@dataclass
+class DispatchResult:
+    post_id: int
+    platform: str
+    outcome: str
+    seconds: float = 0.0
+    error: Optional[str] = None
+    # From a failed handler's exception (``PlatformError``), when it has them.
+    status_code: Optional[int] = None
+    retry_after: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == POSTED
+
+
+def platform_key(platform: str) -> str:
+    name = (platform or "").lower()
+    return PLATFORM_ALIASES.get(name, name)
+
+
+class _Task:
+    """One post in a lane; ``started`` is set by the worker thread."""
+
+    def __init__(self, post: Any, platform: str):
+        self.post = post
+        self.platform = platform
+        self.started: Optional[float] = None
+
+
+class PostDispatcher:
+    def __init__(
+        self,
+        handlers: Mapping[str, Callable[[Any], None]],
+        concurrency: Optional[Mapping[str, int]] = None,
+        rate_limits: Optional[Mapping[str, float]] = None,
+        timeout: float = 30.0,
+        default_concurrency: int = 2,
+    ):
+        # Kept by reference, so handlers registered later are picked up.
+        self.handlers = handlers
+        self.concurrency = {platform_key(k): v for k, v in (concurrency or {}).items()}
+        self.timeout = timeout
+        self.default_concurrency = default_concurrency
+        self._buckets = {
+            platform_key(name): TokenBucket(rate) for name, rate in (rate_limits or {}).items() if rate and rate > 0
+        }
+
+    def _run(self, handler: Callable[[Any], None], task: _Task) -> None:
+        bucket = self._buckets.get(task.platform)
+        if bucket is not None:
+            bucket.acquire()
+        task.started = time.monotonic()
+        handler(task.post)
+
+    def dispatch(self, posts: Iterable[Any], max_run_seconds: Optional[float] = None) -> Dict[int, DispatchResult]:
+        """
+        Publish ``posts`` (objects with ``id`` and ``platform``); returns a result per post id.
+
+        Handlers receive the post object itself and run on lane threads, so they
+        must only read its already loaded attributes.
+        """
+        results: Dict[int, DispatchResult] = {}
+        lanes: Dict[str, List[_Task]] = {}
+        for post in posts:
+            platform = platform_key(post.platform)
+            if self.handlers.get((post.platform or "").lower()) is None:
+                results[post.id] = self._record(DispatchResult(post.id, platform, UNSUPPORTED))
+                continue
+            lanes.setdefault(platform, []).append(_Task(post, platform))
+
+        run_deadline = time.monotonic() + max_run_seconds if max_run_seconds else None
+        executors: List[ThreadPoolExecutor] = []
+        pending: Dict[Future, _Task] = {}
+        try:
+            for platform, tasks in lanes.items():
+                workers = max(1, min(len(tasks), self.concurrency.get(platform, self.default_concurrency)))
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"post-{platform}")
+                executors.append(executor)
+                for task in tasks:
+                    handler = self.handlers[task.post.platform.lower()]
+                    pending[executor.submit(self._run, handler, task)] = task
+
+            while pending:
+                done, _ = wait(list(pending), timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in done:
+                    task = pending.pop(future)
+                    seconds = now - task.started if task.started else 0.0
+                    error = future.exception()
+                    if error is not None:
+                        logger.warning(f"Posting {task.post.id} to {task.platform} failed: {error!r}")
+                        results[task.post.id] = self._record(
+                            DispatchResult(task.post.id, task.platform, FAILED, seconds, repr(error),
+                                           getattr(error, "status_code", None), getattr(error, "retry_after", None)))
+                    else:
+                        results[task.post.id] = self._record(DispatchResult(task.post.id, task.platform, POSTED, seconds))
+                for future, task in list(pending.items()):
+                    if task.started is not None and now - task.started >= self.timeout:
+                        logger.warning(f"Posting {task.post.id} to {task.platform} timed out after {self.timeout}s")
+                        del pending[future]
+                        results[task.post.id] = self._record(
+                            DispatchResult(task.post.id, task.platform, TIMEOUT, now - task.started))
+                    elif task.started is None and run_deadline is not None and now >= run_deadline:
+                        if future.cancel():
+                            del pending[future]
+                            results[task.post.id] = self._record(DispatchResult(task.post.id, task.platform, DEFERRED))
+        finally:
+            for executor in executors:
+                # Never block on abandoned (timed out) handlers.
+                executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    @staticmethod
+    def _record(result: DispatchResult) -> DispatchResult:
+        DISPATCHED.inc(platform=result.platform, outcome=result.outcome)
+        if result.outcome in (POSTED, FAILED, TIMEOUT):
+            PUBLISH_SECONDS.observe(result.seconds, platform=result.platform)
+        return result
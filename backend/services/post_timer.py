@@ -0,0 +1,122 @@
+"""
+Due-Time Timer for Scheduled Posts
+
+Instead of polling the database on a fixed interval, the scheduler keeps the
+upcoming ``scheduled_at`` times in a min-heap and sleeps until the earliest one.
+When that time comes (or ``wake`` is called), it runs the dispatch callback.
+
+- ``schedule`` adds or moves a post; the timer thread is notified only if the
+  post became the earliest one.
+- ``cancel`` forgets a post. Removed and rescheduled entries are dropped lazily
+  when they reach the top of the heap.
+- ``replace`` swaps in a fresh snapshot from the database (the safety poll).
+- If the callback returns a truthy value (due posts are left over), it is
+  called again right away.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PostTimer:
+    def __init__(self, callback: Callable[[], Any], clock: Callable[[], float] = time.time):
+        self._callback = callback
+        self._clock = clock
+        self._heap: List[Tuple[float, int]] = []
+        self._due_at: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._kick = False
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def _discard_stale(self) -> None:
+        # Caller holds the lock.
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """Timestamp of the earliest scheduled post, if any."""
+        with self._cond:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def schedule(self, post_id: int, when: float) -> None:
+        with self._cond:
+            self._discard_stale()
+            earliest = self._heap[0][0] if self._heap else None
+            self._due_at[post_id] = when
+            heapq.heappush(self._heap, (when, post_id))
+            if earliest is None or when < earliest:
+                self._cond.notify()
+
+    def cancel(self, post_id: int) -> None:
+        with self._cond:
+            self._due_at.pop(post_id, None)
+
+    def replace(self, entries: Iterable[Tuple[int, float]]) -> None:
+        """Replace everything with ``(post_id, when)`` pairs."""
+        with self._cond:
+            self._due_at = dict(entries)
+            self._heap = [(when, post_id) for post_id, when in self._due_at.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def wake(self) -> None:
+        """Run the callback as soon as possible."""
+        with self._cond:
+            self._kick = True
+            self._cond.notify()
+
+    def _pop_due(self, now: float) -> None:
+        # Caller holds the lock.
+        while self._heap and self._heap[0][0] <= now:
+            when, post_id = heapq.heappop(self._heap)
+            if self._due_at.get(post_id) == when:
+                del self._due_at[post_id]
+
+    def _wait_until_due(self) -> bool:
+        """Block until something is due; returns False once stopped."""
+        with self._cond:
+            while self._running:
+                self._discard_stale()
+                now = self._clock()
+                if self._kick or (self._heap and self._heap[0][0] <= now):
+                    self._kick = False
+                    self._pop_due(now)
+                    return True
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            return False
+
+    def _run(self) -> None:
+        while self._wait_until_due():
+            try:
+                more = self._callback()
+            except Exception:
+                logger.exception("Scheduled post dispatch failed")
+                continue
+            if more:
+                self.wake()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="post-timer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,187 @@
+"""
+Social Platform Clients
+
+One ``PlatformClient`` per platform, each with its own pooled ``httpx.Client``.
+Connections and TLS sessions are reused across posts, and a slow platform
+cannot exhaust the connection pool of another. Clients are used from the
+post dispatcher's lane threads; ``httpx.Client`` is thread-safe.
+
+- Requests carry the platform token from settings (FACEBOOK_API_TOKEN,
+  X_API_TOKEN, INSTAGRAM_API_TOKEN) as a bearer token.
+- Attached media are streamed from storage in chunks (init, append...,
+  finalize), so large videos are never held in memory. Images are sent as
+  their platform derivative (see platform_media).
+- Error responses raise ``PlatformError`` with the status code and, for rate
+  limits, ``Retry-After``; transport errors have no status code. The
+  scheduler retries transport errors, 429 and 5xx (no sooner than
+  ``Retry-After``) and fails posts on any other 4xx.
+
+A platform without an entry in SOCIAL_PLATFORM_BASE_URLS has no client, and its
+posts are only simulated. ``backend.testing.fake_platform`` serves this API
+locally with configurable latency and rate limits.
+
+Settings:
+    - SOCIAL_PLATFORM_BASE_URLS: API base URL per platform, e.g. {"x": "http://localhost:8020/x"}.
+    - SOCIAL_HTTP_TIMEOUT_SECONDS / SOCIAL_HTTP_MAX_CONNECTIONS: Per-platform client limits.
+    - SOCIAL_UPLOAD_CHUNK_BYTES: Media upload chunk size.
+"""
+
+import logging
+import mimetypes
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.core.config import settings
+from backend.services.platform_media import platform_image_url
+from backend.services.storage import StorageBackend, get_storage, key_from_url
+
+logger = logging.getLogger(__name__)
+
+
+class PlatformError(Exception):
+    """A platform API call failed."""
+
+    def __init__(self, platform: str, status_code: Optional[int], message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{platform}: {status_code or 'error'} {message}")
+        self.platform = platform
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def platform_token(platform: str) -> Optional[str]:
+    return {
+        "facebook": settings.FACEBOOK_API_TOKEN,
+        "x": settings.X_API_TOKEN,
+        "instagram": settings.INSTAGRAM_API_TOKEN,
+    }.get(platform)
+
+
+class PlatformClient:
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        token: Optional[str] = None,
+        timeout: float = 20.0,
+        max_connections: int = 10,
+        chunk_size: int = 4 * 1024 * 1024,
+        transport: Optional[httpx.BaseTransport] = None,
+        storage: Optional[StorageBackend] = None,
+    ):
+        self.name = name
+        self.chunk_size = chunk_size
+        self._storage = storage
+        self._client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {token}"} if token else {},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            response = self._client.request(method, path, **kwargs)
+        except httpx.HTTPError as exc:
+            raise PlatformError(self.name, None, f"{type(exc).__name__}: {exc}") from exc
+        if response.status_code >= 400:
+            try:
+                retry_after = float(response.headers["retry-after"])
+            except (KeyError, ValueError):
+                retry_after = None
+            raise PlatformError(self.name, response.status_code, response.text[:200], retry_after)
+        return response.json() if response.content else {}
+
+    def upload_media(self, url: str) -> str:
+        """Upload a stored media file in chunks; returns the platform's media id."""
+        key = key_from_url(url)
+        if key is None:
+            raise PlatformError(self.name, None, f"Media {url} is not in our storage.")
+        media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        media_id = str(self._request("POST", "/media/upload/init", json={"media_type": media_type})["media_id"])
+        storage = self._storage or get_storage()
+        total = 0
+        source = storage.open(key)
+        try:
+            segment = 0
+            while True:
+                chunk = source.read(self.chunk_size)
+                if not chunk:
+                    break
+                self._request(
+                    "POST",
+                    f"/media/upload/{media_id}/append",
+                    params={"segment_index": segment},
+                    content=chunk,
+                    headers={"content-type": "application/octet-stream"},
+                )
+                total += len(chunk)
+                segment += 1
+        finally:
+            source.close()
+        self._request("POST", f"/media/upload/{media_id}/finalize", json={"total_bytes": total})
+        return media_id
+
+    def publish(self, post: Any) -> str:
+        """Publish ``post`` with its media; returns the platform's post id."""
+        image_url = platform_image_url(post.image_url, self.name)
+        media_ids: List[str] = [self.upload_media(url) for url in (image_url, post.video_url) if url]
+        data = self._request(
+            "POST",
+            "/posts",
+            json={"text": post.content, "content_type": post.content_type, "media_ids": media_ids},
+        )
+        return str(data["id"])
+
+
+_clients: Dict[str, PlatformClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_platform_client(platform: str) -> Optional[PlatformClient]:
+    """The shared client for ``platform``, or None if no API is configured for it."""
+    client = _clients.get(platform)
+    if client is not None and not client.is_closed:
+        return client
+    base_url = settings.SOCIAL_PLATFORM_BASE_URLS.get(platform)
+    if not base_url:
+        return None
+    with _clients_lock:
+        client = _clients.get(platform)
+        if client is None or client.is_closed:
+            client = _clients[platform] = PlatformClient(
+                platform,
+                base_url,
+                token=platform_token(platform),
+                timeout=settings.SOCIAL_HTTP_TIMEOUT_SECONDS,
+                max_connections=settings.SOCIAL_HTTP_MAX_CONNECTIONS,
+                chunk_size=settings.SOCIAL_UPLOAD_CHUNK_BYTES,
+            )
+    return client
+
+
+def set_platform_client(platform: str, client: Optional[PlatformClient]) -> None:
+    """Replace the client for ``platform`` (used by tests and tooling)."""
+    with _clients_lock:
+        if client is None:
+            _clients.pop(platform, None)
+        else:
+            _clients[platform] = client
+
+
+def close_platform_clients() -> None:
+    """App shutdown hook: close every platform connection pool."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -1,30 +1,123 @@
-from datetime import datetime
-from typing import Callable, Dict
+"""
+Social Post Scheduler
+
+Publishes ``SocialMediaPost`` rows when their ``scheduled_at`` time comes.
+
+A ``PostTimer`` keeps the upcoming due times in memory and runs
+``dispatch_due_posts`` the moment the earliest one is reached, so posts go out
+on time and an idle system does not query the database. The routers call
+``notify_post_scheduled``/``notify_post_removed`` when posts are created or
+deleted. A slow safety poll reloads the upcoming posts from the database, to
+pick up posts created by other workers, released claims and anything the
+notifications missed.
+
+A post whose handler fails with a transient error (no response from the
+platform, 429 or 5xx) is retried with exponential backoff, waiting at least
+as long as the platform's ``Retry-After``: it moves to ``retry`` with
+``next_attempt_at`` set, and after SOCIAL_RETRY_MAX_ATTEMPTS attempts it is
+parked as ``dead_letter`` until an admin requeues it. Other 4xx responses
+(bad request, expired token, forbidden) would fail the same way again, so
+those posts fail at once. A post
+whose handler times out is dead-lettered at once: the dispatcher cannot stop
+the handler, which may still publish it, so an automatic retry could post it
+twice. Posts for unsupported platforms fail permanently.
+
+Every run records ``social_scheduler_*`` metrics (served on ``/metrics``):
+dispatch lag per platform (from a post's due time until its attempt finished),
+run duration, claimed batch sizes, results per platform and status, and runs
+that overran POST_SCHEDULER_INTERVAL. Runs that publish anything also log one
+``key=value`` summary line, with the same fields under ``extra["dispatch_run"]``
+for JSON log formatters. An overrun is logged as a warning.
+
+Settings:
+    - POST_SCHEDULER_INTERVAL: Time budget of one dispatch run, in seconds.
+    - POST_SCHEDULER_SAFETY_POLL_SECONDS: Seconds between safety polls.
+    - SOCIAL_RETRY_MAX_ATTEMPTS: Attempts before a post is dead-lettered.
+    - SOCIAL_RETRY_BASE_SECONDS / SOCIAL_RETRY_MAX_SECONDS: Backoff between attempts.
+"""
+
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 
 from backend.core.config import settings
 from backend.core.database import SessionLocal
+from backend.core.metrics import counter, gauge, histogram
 from backend.models.social_post import SocialMediaPost
+from backend.services.leases import new_owner
+from backend.services.post_claims import DRAFT, RETRY, PostResultWriter, claim_due_posts, release_claims
+from backend.services.post_dispatcher import DEFERRED, FAILED, TIMEOUT, PostDispatcher
+from backend.services.post_timer import PostTimer
+from backend.services.social_platforms import get_platform_client
 
+logger = logging.getLogger(__name__)
 
-# Placeholder posting functions ---------------------------------------------
+POSTED = "posted"
+DEAD_LETTER = "dead_letter"
+# Statuses an admin can requeue.
+REQUEUEABLE_STATUSES = frozenset({"failed", RETRY, DEAD_LETTER})
+# Dispatch outcomes worth another attempt. Not TIMEOUT: the abandoned handler may still publish.
+RETRYABLE_OUTCOMES = frozenset({FAILED})
+TOO_MANY_REQUESTS = 429
+
+DISPATCH_LAG = histogram(
+    "social_scheduler_lag_seconds",
+    "Seconds from a post's due time until its publish attempt finished.",
+    ["platform"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200),
+)
+RUN_SECONDS = histogram(
+    "social_scheduler_run_seconds",
+    "Duration of a dispatch run.",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+BATCH_SIZE = histogram(
+    "social_scheduler_batch_size",
+    "Posts claimed per batch.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500),
+)
+RESULTS = counter("social_scheduler_results_total", "Publish attempts by platform and resulting status.", ["platform", "status"])
+OVERRUNS = counter("social_scheduler_overruns_total", "Dispatch runs that took longer than POST_SCHEDULER_INTERVAL.")
+LAST_RUN = gauge("social_scheduler_last_run_timestamp", "Unix time the last dispatch run finished.")
+
+
+# Posting functions ------------------------------------------------------------
+# Each publishes through the platform's pooled client (see social_platforms),
+# or only simulates the post while no API is configured for the platform.
 
 def post_to_facebook(post: SocialMediaPost) -> None:
-    """Simulate sending a post to Facebook API."""
-    # Here you would use settings.FACEBOOK_API_TOKEN etc.
-    print(f"Posting to Facebook: {post.content}")
+    """Send a post to the Facebook API."""
+    client = get_platform_client("facebook")
+    if client is None:
+        print(f"Posting to Facebook: {post.content}")
+        return
+    client.publish(post)
 
 
 def post_to_x(post: SocialMediaPost) -> None:
-    """Simulate sending a post to X/Twitter API."""
-    print(f"Posting to X: {post.content}")
+    """Send a post to the X/Twitter API."""
+    client = get_platform_client("x")
+    if client is None:
+        print(f"Posting to X: {post.content}")
+        return
+    client.publish(post)
 
 
 def post_to_instagram(post: SocialMediaPost) -> None:
-    """Simulate sending a post to Instagram API."""
-    print(f"Posting to Instagram: {post.content}")
+    """Send a post to the Instagram API."""
+    client = get_platform_client("instagram")
+    if client is None:
+        print(f"Posting to Instagram: {post.content}")
+        return
+    client.publish(post)
 
 
 PLATFORM_HANDLERS: Dict[str, Callable[[SocialMediaPost], None]] = {
@@ -37,49 +130,241 @@ PLATFORM_HANDLERS: Dict[str, Callable[[SocialMediaPost], None]] = {
 
 # Core dispatch logic --------------------------------------------------------
 
-def _send_post(post: SocialMediaPost) -> bool:
-    handler = PLATFORM_HANDLERS.get(post.platform.lower())
-    if not handler:
-        return False
+_dispatcher: Optional[PostDispatcher] = None
+
+
+def get_dispatcher() -> PostDispatcher:
+    """The process-wide dispatcher; its rate limits persist across runs."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = PostDispatcher(
+            PLATFORM_HANDLERS,
+            concurrency=settings.SOCIAL_PLATFORM_CONCURRENCY,
+            rate_limits=settings.SOCIAL_PLATFORM_RATE_LIMITS,
+            timeout=settings.SOCIAL_DISPATCH_TIMEOUT_SECONDS,
+            default_concurrency=settings.SOCIAL_DEFAULT_CONCURRENCY,
+        )
+    return _dispatcher
+
+
+def claim_lease_seconds() -> float:
+    """How long claimed posts stay reserved: a full run plus a stuck handler, with margin."""
+    return settings.POST_SCHEDULER_INTERVAL + settings.SOCIAL_DISPATCH_TIMEOUT_SECONDS + 30
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait after failed attempt number ``attempts``: doubling, capped, with jitter."""
+    delay = min(settings.SOCIAL_RETRY_MAX_SECONDS, settings.SOCIAL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _is_transient(result) -> bool:
+    """Whether a failed attempt may succeed later: no response (transport error), 429 or 5xx."""
+    code = result.status_code
+    return code is None or code == TOO_MANY_REQUESTS or code >= 500
+
+
+def _outcome(
+    post: SocialMediaPost, result, now: datetime, retry_at: Dict[int, datetime]
+) -> Tuple[str, Optional[datetime], Optional[str]]:
+    """``(status, next_attempt_at, last_error)`` after this attempt of ``post``."""
+    if result.ok:
+        return POSTED, None, None
+    error = result.error or result.outcome
+    if result.outcome == TIMEOUT:
+        return DEAD_LETTER, None, "timed out; the post may still have been published, check before requeueing"
+    if result.outcome not in RETRYABLE_OUTCOMES or not _is_transient(result):
+        return "failed", None, error
+    attempts = (post.attempts or 0) + 1
+    if attempts >= settings.SOCIAL_RETRY_MAX_ATTEMPTS:
+        return DEAD_LETTER, None, error
+    next_attempt_at = retry_at[attempts]
+    if result.retry_after:
+        next_attempt_at = max(next_attempt_at, now + timedelta(seconds=result.retry_after))
+    return RETRY, next_attempt_at, error
+
+
+def _due_at(post: SocialMediaPost) -> datetime:
+    """When ``post`` became due: its retry time for retries, else its scheduled time."""
+    if post.status == RETRY and post.next_attempt_at is not None:
+        return post.next_attempt_at
+    return post.scheduled_at
+
+
+def _record_run(stats: Dict[str, float]) -> None:
+    """Export a finished run as metrics and log lines."""
+    RUN_SECONDS.observe(stats["duration"])
+    LAST_RUN.set(time.time())
+    if stats["posts"]:
+        fields = " ".join(f"{key}={round(value, 3) if isinstance(value, float) else value}" for key, value in stats.items())
+        logger.info(f"Social dispatch run {fields}", extra={"dispatch_run": dict(stats)})
+    if stats["duration"] > settings.POST_SCHEDULER_INTERVAL:
+        OVERRUNS.inc()
+        logger.warning(
+            f"Social dispatch run took {stats['duration']:.1f}s, longer than its "
+            f"{settings.POST_SCHEDULER_INTERVAL}s interval ({stats['posts']} posts in {stats['batches']} batches, "
+            f"max lag {stats['max_lag']:.0f}s)."
+        )
+
+
+def dispatch_due_posts() -> bool:
+    """
+    Publish all due posts and update their status.
+
+    Returns True if the run ended with due posts left over (time budget used up).
+
+    Safe to run from every worker at once: posts are claimed in batches before
+    publishing (see post_claims), so each is published by one worker only.
+    Retries due in the same run are claimed after fresh posts.
+    Platforms are published to concurrently (see post_dispatcher); posts that
+    could not be started within one scheduler interval are released and stay
+    due for the next run.
+    """
+    owner = new_owner()
+    batch_size = settings.SOCIAL_CLAIM_BATCH_SIZE
+    started = time.monotonic()
+    deadline = started + settings.POST_SCHEDULER_INTERVAL
+    more_due = False
+    stats: Dict[str, float] = {
+        "posts": 0, "batches": 0, POSTED: 0, RETRY: 0, "failed": 0, DEAD_LETTER: 0, "deferred": 0,
+        "max_lag": 0.0, "duration": 0.0,
+    }
+    db = SessionLocal()
     try:
-        handler(post)
-        return True
-    except Exception:
-        return False
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                more_due = True
+                break
+            posts = claim_due_posts(db, owner, batch_size, claim_lease_seconds())
+            if not posts:
+                break
+            BATCH_SIZE.observe(len(posts))
+            stats["batches"] += 1
+            stats["posts"] += len(posts)
+            results = get_dispatcher().dispatch(posts, max_run_seconds=remaining)
+            now = datetime.utcnow()
+            # One backoff per attempt number and batch, so retries share UPDATEs.
+            retry_at = {
+                attempts: now + timedelta(seconds=retry_delay(attempts))
+                for attempts in range(1, settings.SOCIAL_RETRY_MAX_ATTEMPTS)
+            }
+            writer = PostResultWriter(db, owner)
+            deferred = []
+            retries = []
+            for post in posts:
+                result = results[post.id]
+                if result.outcome == DEFERRED:
+                    deferred.append(post.id)
+                    stats["deferred"] += 1
+                    continue
+                status, next_attempt_at, error = _outcome(post, result, now, retry_at)
+                writer.add(post.id, status, next_attempt_at, error)
+                lag = max(0.0, (now - _due_at(post)).total_seconds())
+                DISPATCH_LAG.observe(lag, platform=result.platform)
+                RESULTS.inc(platform=result.platform, status=status)
+                stats[status] += 1
+                stats["max_lag"] = max(stats["max_lag"], lag)
+                if status == RETRY:
+                    retries.append((post.id, next_attempt_at))
+            writer.flush()
+            release_claims(db, owner, deferred)
+            for post_id, next_attempt_at in retries:
+                notify_post_scheduled(post_id, next_attempt_at)
+            if deferred:
+                more_due = True
+                break
+            if len(posts) < batch_size:
+                break
+    finally:
+        db.close()
+        stats["duration"] = time.monotonic() - started
+        _record_run(stats)
+    return more_due
+
 
+def _timestamp(scheduled_at: datetime) -> float:
+    return scheduled_at.replace(tzinfo=timezone.utc).timestamp()
 
-def dispatch_due_posts() -> None:
-    """Publish all due posts and update their status."""
+
+def _horizon() -> datetime:
+    """Posts due before this are kept in the timer; later ones are loaded by a later poll."""
+    return datetime.utcnow() + timedelta(seconds=2 * settings.POST_SCHEDULER_SAFETY_POLL_SECONDS)
+
+
+def refresh_timer() -> None:
+    """Safety poll: reload the posts due within the horizon (drafts and retries) into the timer."""
+    if _timer is None:
+        return
+    horizon = _horizon()
     db = SessionLocal()
     try:
-        now = datetime.utcnow()
-        due_posts = (
-            db.query(SocialMediaPost)
-            .filter(SocialMediaPost.status == "draft")
-            .filter(SocialMediaPost.scheduled_at <= now)
+        upcoming = (
+            db.query(SocialMediaPost.id, SocialMediaPost.status, SocialMediaPost.scheduled_at, SocialMediaPost.next_attempt_at)
+            .filter(or_(
+                and_(SocialMediaPost.status == DRAFT, SocialMediaPost.scheduled_at <= horizon),
+                and_(SocialMediaPost.status == RETRY, SocialMediaPost.next_attempt_at <= horizon),
+            ))
             .all()
         )
-        for post in due_posts:
-            success = _send_post(post)
-            post.status = "posted" if success else "failed"
-            db.add(post)
-        if due_posts:
-            db.commit()
     finally:
         db.close()
+    _timer.replace(
+        (post_id, _timestamp(next_attempt_at if status == RETRY else scheduled_at))
+        for post_id, status, scheduled_at, next_attempt_at in upcoming
+    )
+
+
+def notify_post_scheduled(post_id: int, scheduled_at: Optional[datetime]) -> None:
+    """Called when a post is created or rescheduled, so it fires on time."""
+    if _timer is None or scheduled_at is None:
+        return
+    if scheduled_at.tzinfo is not None:
+        scheduled_at = scheduled_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if scheduled_at <= _horizon():
+        _timer.schedule(post_id, _timestamp(scheduled_at))
+
+
+def requeue_post(db: Session, post_id: int) -> SocialMediaPost:
+    """Give a failed, retrying or dead-lettered post a fresh set of attempts, due now."""
+    post = db.query(SocialMediaPost).filter(SocialMediaPost.id == post_id).first()
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.status not in REQUEUEABLE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"A {post.status} post cannot be requeued.")
+    now = datetime.utcnow()
+    post.status = RETRY
+    post.attempts = 0
+    post.next_attempt_at = now
+    post.claimed_by = None
+    post.lease_until = None
+    db.commit()
+    db.refresh(post)
+    notify_post_scheduled(post.id, now)
+    return post
+
+
+def notify_post_removed(post_id: int) -> None:
+    """Called when a post is deleted."""
+    if _timer is not None:
+        _timer.cancel(post_id)
 
 
+_timer: PostTimer | None = None
 _scheduler: BackgroundScheduler | None = None
 
 def start_scheduler() -> None:
-    """Start the background scheduler if not already running."""
-    global _scheduler
+    """Start the post timer and its safety poll if not already running."""
+    global _scheduler, _timer
     if _scheduler:
         return
+    _timer = PostTimer(dispatch_due_posts)
+    refresh_timer()
+    _timer.start()
     scheduler = BackgroundScheduler()
     scheduler.add_job(
-        dispatch_due_posts,
-        IntervalTrigger(seconds=settings.POST_SCHEDULER_INTERVAL),
+        refresh_timer,
+        IntervalTrigger(seconds=settings.POST_SCHEDULER_SAFETY_POLL_SECONDS),
     )
     scheduler.start()
     _scheduler = scheduler
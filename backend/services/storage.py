@@ -0,0 +1,339 @@
+"""
+Media Storage Backends
+
+All upload paths store their bytes through a ``StorageBackend`` so media can
+live on local disk (single node) or in an S3-compatible bucket (AWS S3, MinIO,
+...) shared by every app node.
+
+Backends work on *keys*: the content-addressed file name produced by the upload
+service (``<sha256><ext>``). The URL saved in the database comes from
+``backend.url(key)``:
+
+    - LocalStorage: ``/static/uploads/<key>``, served by the static mount.
+    - S3Storage:    ``MEDIA_PUBLIC_BASE_URL/<key>`` when a public bucket/CDN is
+                    configured, otherwise ``/media/files/<key>``, which redirects
+                    to a short-lived pre-signed URL. Either way the media bytes
+                    never flow through our Python workers.
+
+Settings:
+    - MEDIA_STORAGE_BACKEND: "local" (default) or "s3".
+    - MEDIA_S3_BUCKET, MEDIA_S3_PREFIX, MEDIA_S3_REGION, MEDIA_S3_ENDPOINT_URL,
+      MEDIA_S3_ACCESS_KEY_ID, MEDIA_S3_SECRET_ACCESS_KEY: S3 connection details.
+      Leave the endpoint empty for AWS; set it for MinIO or other compatibles.
+    - MEDIA_PUBLIC_BASE_URL: Optional public base URL of the bucket or CDN.
+    - MEDIA_PRESIGNED_URL_EXPIRY: Lifetime of pre-signed URLs in seconds.
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from backend.core.config import settings
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ModuleNotFoundError:  # Only needed for the S3 backend.
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+# Directory to store uploaded media with the local backend (served at /static/uploads/)
+UPLOAD_DIR = os.path.join("frontend/static", "uploads")
+UPLOAD_URL_PREFIX = "/static/uploads/"
+MEDIA_FILES_PREFIX = "/media/files/"
+TEMP_PREFIX = ".upload-"
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """Interface shared by the storage drivers."""
+
+    #: Directory for in-progress uploads, or None for the system temp dir.
+    temp_dir: Optional[str] = None
+
+    @abstractmethod
+    def save_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> bool:
+        """
+        Move a finished local file into storage under ``key``.
+
+        The local file is consumed. Returns True if identical content was already
+        stored under ``key`` (the upload was deduplicated).
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether ``key`` is stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> int:
+        """Delete ``key``; returns the number of bytes freed (0 if it did not exist)."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open ``key`` for reading."""
+
+    @abstractmethod
+    def list_keys(self) -> Iterator[Tuple[str, float]]:
+        """Yield ``(key, last_modified_timestamp)`` for every stored object."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """The URL stored in the database for ``key``."""
+
+    def download_url(self, key: str) -> str:
+        """A URL the client can fetch the bytes from directly."""
+        return self.url(key)
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of ``key`` if the backend is local, else None."""
+        return None
+
+    def purge_temp_files(self, older_than: float) -> int:
+        """Remove abandoned in-progress uploads; returns the number of bytes freed."""
+        return 0
+
+
+def _valid_key(key: str) -> bool:
+    return bool(key) and "/" not in key and "\\" not in key and not key.startswith(".")
+
+
+class LocalStorage(StorageBackend):
+    """Stores media as files in a local directory."""
+
+    def __init__(self, root: str = UPLOAD_DIR, url_prefix: str = UPLOAD_URL_PREFIX):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.temp_dir = root  # same filesystem, so the final rename is atomic
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        if not _valid_key(key):
+            raise ValueError(f"Invalid media key: {key!r}")
+        return os.path.join(self.root, key)
+
+    def save_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> bool:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(local_path)
+            # Refresh the mtime so the media GC treats the file as freshly referenced.
+            os.utime(path)
+            return True
+        # mkstemp creates files readable by the owner only; uploads are public.
+        os.chmod(local_path, 0o644)
+        os.replace(local_path, path)
+        return False
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key: str) -> int:
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def list_keys(self) -> Iterator[Tuple[str, float]]:
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if _valid_key(name) and os.path.isfile(path):
+                yield name, os.path.getmtime(path)
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}{key}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def purge_temp_files(self, older_than: float) -> int:
+        freed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(TEMP_PREFIX) and os.path.getmtime(path) < older_than:
+                freed += os.path.getsize(path)
+                os.remove(path)
+        return freed
+
+
+class S3Storage(StorageBackend):
+    """Stores media in an S3-compatible bucket."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client=None,
+        public_base_url: Optional[str] = None,
+        presigned_expiry: int = 3600,
+    ):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("boto3 is required for the S3 media storage backend.")
+            client = boto3.client(
+                "s3",
+                region_name=settings.MEDIA_S3_REGION,
+                endpoint_url=settings.MEDIA_S3_ENDPOINT_URL,
+                aws_access_key_id=settings.MEDIA_S3_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.MEDIA_S3_SECRET_ACCESS_KEY,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+        self.presigned_expiry = presigned_expiry
+        # An injected client may be used without boto3; upload_file then uses its own defaults.
+        self.transfer_config = None
+        if boto3 is not None:
+            self.transfer_config = TransferConfig(
+                multipart_threshold=MULTIPART_THRESHOLD,
+                multipart_chunksize=MULTIPART_CHUNK_SIZE,
+            )
+
+    def _object_key(self, key: str) -> str:
+        if not _valid_key(key):
+            raise ValueError(f"Invalid media key: {key!r}")
+        return f"{self.prefix}{key}"
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def save_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> bool:
+        try:
+            head = self._head(key)
+            if head is not None:
+                # Copy onto itself to bump LastModified, so the GC keeps the object.
+                self.client.copy_object(
+                    Bucket=self.bucket,
+                    Key=self._object_key(key),
+                    CopySource={"Bucket": self.bucket, "Key": self._object_key(key)},
+                    MetadataDirective="REPLACE",
+                    ContentType=head.get("ContentType") or content_type or "application/octet-stream",
+                )
+                return True
+            extra_args = {"ContentType": content_type} if content_type else None
+            # upload_file switches to a streaming multipart upload above MULTIPART_THRESHOLD.
+            self.client.upload_file(
+                local_path,
+                self.bucket,
+                self._object_key(key),
+                ExtraArgs=extra_args,
+                Config=self.transfer_config,
+            )
+            return False
+        finally:
+            try:
+                os.remove(local_path)
+            except FileNotFoundError:
+                pass
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def delete(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            return 0
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return head.get("ContentLength", 0)
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+
+    def list_keys(self) -> Iterator[Tuple[str, float]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"][len(self.prefix):]
+                if _valid_key(key):
+                    yield key, obj["LastModified"].timestamp()
+
+    def url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{self._object_key(key)}"
+        return f"{MEDIA_FILES_PREFIX}{key}"
+
+    def download_url(self, key: str) -> str:
+        if self.public_base_url:
+            return self.url(key)
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=self.presigned_expiry,
+        )
+
+
+def create_storage() -> StorageBackend:
+    """Build the backend selected by MEDIA_STORAGE_BACKEND."""
+    backend = settings.MEDIA_STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalStorage()
+    if backend == "s3":
+        if not settings.MEDIA_S3_BUCKET:
+            raise RuntimeError("MEDIA_S3_BUCKET must be set for the S3 media storage backend.")
+        return S3Storage(
+            bucket=settings.MEDIA_S3_BUCKET,
+            prefix=settings.MEDIA_S3_PREFIX,
+            public_base_url=settings.MEDIA_PUBLIC_BASE_URL,
+            presigned_expiry=settings.MEDIA_PRESIGNED_URL_EXPIRY,
+        )
+    raise RuntimeError(f"Unknown MEDIA_STORAGE_BACKEND: {settings.MEDIA_STORAGE_BACKEND}")
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]) -> None:
+    """Replace the process-wide backend (used by tests and tooling)."""
+    global _storage
+    _storage = storage
+
+
+def media_url(url: Optional[str]) -> Optional[str]:
+    """
+    Template helper: serve a local upload through ``/media/files/`` (byte ranges,
+    conditional GETs, sendfile) instead of the plain static mount.
+    """
+    if url and url.startswith(UPLOAD_URL_PREFIX):
+        key = key_from_url(url)
+        if key:
+            return f"{MEDIA_FILES_PREFIX}{key}"
+    return url
+
+
+def key_from_url(url: Optional[str]) -> Optional[str]:
+    """Return the storage key referenced by a media URL, or None for other URLs."""
+    if not url:
+        return None
+    prefixes = [UPLOAD_URL_PREFIX, MEDIA_FILES_PREFIX]
+    if settings.MEDIA_PUBLIC_BASE_URL:
+        prefixes.append(f"{settings.MEDIA_PUBLIC_BASE_URL.rstrip('/')}/{settings.MEDIA_S3_PREFIX}")
+    for prefix in prefixes:
+        if url.startswith(prefix):
+            key = url[len(prefix):].split("?", 1)[0]
+            return key if _valid_key(key) else None
+    return None
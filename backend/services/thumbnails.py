@@ -0,0 +1,264 @@
+"""
+On-demand Thumbnails
+
+Resizes images from ``/static`` or media storage on first request and keeps
+the results in a size-bounded on-disk cache with least-recently-used eviction.
+
+- Thumbnails are cropped to cover the requested box (``height=0`` keeps the
+  aspect ratio) and encoded as WebP.
+- Cache file names are derived from the source path, its mtime and the box,
+  so replacing a source image naturally produces a new cache entry. Uploads in
+  remote storage are content-addressed, so their key alone identifies them.
+- ``thumbnail_url`` adds the source's version (``?v=``, from its mtime) for
+  files under ``/static``, so a replaced image gets a new URL and browsers
+  never keep showing the old thumbnail from their long-lived cache.
+- Concurrent first requests for the same thumbnail share a single resize.
+
+Settings:
+    - THUMBNAIL_CACHE_DIR: Directory for cached thumbnails.
+    - THUMBNAIL_CACHE_MAX_BYTES: Upper bound for the cache size on disk.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.core.metrics import counter, gauge
+from backend.services.image_processing import STATIC_URL_PREFIX, prepare_image, resize_to_width, url_to_path
+from backend.services.storage import StorageBackend, get_storage, key_from_url
+
+try:
+    from PIL import Image, ImageOps
+except ModuleNotFoundError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MAX_THUMBNAIL_DIMENSION = 1600
+THUMBNAIL_MEDIA_TYPE = "image/webp"
+THUMBNAIL_PREFIX = "/media/thumb"
+# Thumbnail path segment for uploads; matches the local /static/uploads/ layout.
+UPLOADS_SEGMENT = "uploads/"
+
+CACHE_REQUESTS = counter("thumbnail_cache_requests_total", "Thumbnail cache lookups by result.", ["result"])
+CACHE_EVICTIONS = counter("thumbnail_cache_evictions_total", "Thumbnails evicted from the cache.")
+CACHE_BYTES = gauge("thumbnail_cache_bytes", "Bytes of thumbnails in the cache.")
+CACHE_ENTRIES = gauge("thumbnail_cache_entries", "Thumbnails in the cache.")
+
+
+@dataclass(frozen=True)
+class StoredSource:
+    """An image held by a non-local storage backend."""
+
+    storage: StorageBackend
+    key: str
+
+    def read(self) -> io.BytesIO:
+        body = self.storage.open(self.key)
+        try:
+            return io.BytesIO(body.read())
+        finally:
+            body.close()
+
+
+Source = Union[str, StoredSource]
+
+
+def source_version(source: Source) -> Optional[str]:
+    """Version token for a local source (from its mtime); None for content-addressed stored uploads."""
+    if isinstance(source, StoredSource):
+        return None
+    return format(os.stat(source).st_mtime_ns, "x")
+
+
+def thumbnail_url(url: Optional[str], width: int, height: int = 0) -> Optional[str]:
+    """Template helper: the thumbnail URL for a ``/static/...`` or stored image, or ``url`` unchanged."""
+    if not url:
+        return url
+    if url.startswith(STATIC_URL_PREFIX):
+        thumb = f"{THUMBNAIL_PREFIX}/{width}x{height}/{url[len(STATIC_URL_PREFIX):].split('?', 1)[0]}"
+        path = url_to_path(url)
+        if path and os.path.isfile(path):
+            thumb = f"{thumb}?v={source_version(path)}"
+        return thumb
+    key = key_from_url(url)
+    if key:
+        return f"{THUMBNAIL_PREFIX}/{width}x{height}/{UPLOADS_SEGMENT}{key}"
+    return url
+
+
+def render_thumbnail(source: Source, width: int, height: int) -> bytes:
+    """Resize ``source`` to cover ``width`` x ``height`` and return WebP bytes."""
+    fp = source.read() if isinstance(source, StoredSource) else source
+    with Image.open(fp) as original:
+        image = prepare_image(original)
+        if height:
+            image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        else:
+            image = resize_to_width(image, width)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=80, method=4)
+        return buffer.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Bounded LRU cache of thumbnails on disk.
+
+    The LRU order is kept in memory and seeded from file mtimes on startup,
+    and cache hits touch the file so the order survives restarts.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _load_existing(self) -> None:
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".webp") and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+        CACHE_BYTES.set(self._total_bytes)
+        CACHE_ENTRIES.set(len(self._entries))
+
+    @staticmethod
+    def cache_key(source: Source, width: int, height: int) -> str:
+        if isinstance(source, StoredSource):
+            identity = f"storage:{source.key}"
+        else:
+            identity = f"{source}:{os.path.getmtime(source)}"
+        digest = hashlib.sha256(f"{identity}:{width}x{height}".encode("utf-8")).hexdigest()
+        return f"{digest[:40]}.webp"
+
+    def _lookup(self, name: str) -> Optional[str]:
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            if not os.path.exists(path):
+                self._total_bytes -= self._entries.pop(name)
+                return None
+            self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def _store(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if name in self._entries:
+                self._total_bytes -= self._entries.pop(name)
+            self._entries[name] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+            CACHE_BYTES.set(self._total_bytes)
+            CACHE_ENTRIES.set(len(self._entries))
+        return path
+
+    def _evict(self) -> None:
+        # Caller holds the lock (or runs before the cache is shared).
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            CACHE_EVICTIONS.inc()
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, source: Source, width: int, height: int) -> str:
+        """Return the path of the cached thumbnail, rendering it on a miss."""
+        name = self.cache_key(source, width, height)
+        cached = self._lookup(name)
+        if cached:
+            self.hits += 1
+            CACHE_REQUESTS.inc(result="hit")
+            return cached
+
+        pending = self._inflight.get(name)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        CACHE_REQUESTS.inc(result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            data = await run_in_threadpool(render_thumbnail, source, width, height)
+            path = await run_in_threadpool(self._store, name, data)
+            future.set_result(path)
+            return path
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters get the exception; don't also log it as "never retrieved".
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+
+_cache: Optional[ThumbnailCache] = None
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Return the process-wide thumbnail cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ThumbnailCache(settings.THUMBNAIL_CACHE_DIR, settings.THUMBNAIL_CACHE_MAX_BYTES)
+    return _cache
+
+
+def resolve_source(path: str) -> Optional[Source]:
+    """
+    Map the ``{path}`` of a thumbnail URL to an existing image.
+
+    Files under ``/static`` are used directly; ``uploads/<key>`` falls back to
+    the storage backend when uploads are not kept on local disk.
+    """
+    source = url_to_path(f"{STATIC_URL_PREFIX}{path}")
+    if source and os.path.isfile(source):
+        return source
+    if path.startswith(UPLOADS_SEGMENT):
+        storage = get_storage()
+        key = path[len(UPLOADS_SEGMENT):]
+        try:
+            if storage.local_path(key) is None and storage.exists(key):
+                return StoredSource(storage, key)
+        except ValueError:
+            return None
+    return None
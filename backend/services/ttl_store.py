@@ -0,0 +1,261 @@
+"""
+Expiring Key-Value Stores
+
+Small stores for short-lived data such as payment success tokens, where every
+entry must disappear on its own and one-time values must be consumed exactly
+once:
+
+- ``MemoryTTLStore``: per-process, bounded by entry count and by the size of the
+  JSON-encoded values; expired entries go first, then the oldest ones.
+- ``DatabaseTTLStore``: rows in ``ttl_entries``, so every worker sees the same
+  data; expired rows are purged periodically as new entries are written.
+
+Both offer ``set``/``get``/``pop``/``delete``. ``pop`` is atomic: when two
+requests race for the same key, exactly one of them gets the value. Values must
+be JSON-serializable.
+
+Size and evictions are exported as ``ttl_store_entries``, ``ttl_store_bytes``
+and ``ttl_store_evictions_total`` metrics.
+
+Settings:
+    - TTL_STORE_BACKEND: "database" (default) or "memory".
+    - TTL_STORE_MAX_ENTRIES / TTL_STORE_MAX_BYTES: Bounds of the in-memory store.
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.metrics import counter, gauge
+from backend.models.ttl_entry import TTLEntry
+
+STORE_ENTRIES = gauge("ttl_store_entries", "Entries held by an in-memory TTL store.", ["name"])
+STORE_BYTES = gauge("ttl_store_bytes", "Bytes of values held by an in-memory TTL store.", ["name"])
+STORE_EVICTIONS = counter("ttl_store_evictions_total", "Entries dropped from TTL stores.", ["name", "reason"])
+
+_MISSING = object()
+
+
+class TTLStore(ABC):
+    """Interface shared by the stores."""
+
+    default_ttl: float
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (``default_ttl`` when None)."""
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """The value of ``key``, or ``default`` if it is missing or expired."""
+
+    @abstractmethod
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove ``key`` and return its value; only one caller can get it."""
+
+    def delete(self, key: str) -> None:
+        self.pop(key)
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Remove expired entries; returns how many were removed."""
+
+
+class MemoryTTLStore(TTLStore):
+    def __init__(
+        self,
+        name: str,
+        default_ttl: float,
+        max_entries: int = 10000,
+        max_bytes: int = 8 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # key -> (expires_at, encoded value); insertion order == age.
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> Tuple[float, str]:
+        # Caller holds the lock.
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[1])
+        return entry
+
+    def _publish(self) -> None:
+        STORE_ENTRIES.set(len(self._entries), name=self.name)
+        STORE_BYTES.set(self._bytes, name=self.name)
+
+    def _purge_locked(self, now: float) -> int:
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        if expired:
+            STORE_EVICTIONS.inc(len(expired), name=self.name, reason="expired")
+        return len(expired)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        encoded = json.dumps(value)
+        if len(encoded) > self.max_bytes:
+            raise ValueError(f"Value for {key!r} is larger than the store ({self.max_bytes} bytes).")
+        now = self._clock()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now + (ttl if ttl is not None else self.default_ttl), encoded)
+            self._bytes += len(encoded)
+            if len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._purge_locked(now)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                STORE_EVICTIONS.inc(name=self.name, reason="capacity")
+            self._publish()
+
+    def _take(self, key: str, remove: bool) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= self._clock():
+                self._remove(key)
+                STORE_EVICTIONS.inc(name=self.name, reason="expired")
+                self._publish()
+                return _MISSING
+            if remove:
+                self._remove(key)
+                self._publish()
+        return json.loads(entry[1])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._take(key, remove=False)
+        return default if value is _MISSING else value
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self._take(key, remove=True)
+        return default if value is _MISSING else value
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            removed = self._purge_locked(self._clock())
+            self._publish()
+        return removed
+
+
+class DatabaseTTLStore(TTLStore):
+    """Entries live in the ``ttl_entries`` table under ``namespace``."""
+
+    def __init__(
+        self,
+        namespace: str,
+        default_ttl: float,
+        session_factory: sessionmaker = SessionLocal,
+        purge_interval: float = 300.0,
+    ):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.session_factory = session_factory
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+    def _query(self, db: Session, key: str):
+        return db.query(TTLEntry).filter(TTLEntry.namespace == self.namespace, TTLEntry.key == key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        encoded = json.dumps(value)
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl if ttl is not None else self.default_ttl)
+        db = self.session_factory()
+        try:
+            updated = self._query(db, key).update(
+                {TTLEntry.value: encoded, TTLEntry.expires_at: expires_at}, synchronize_session=False
+            )
+            if not updated:
+                db.add(TTLEntry(namespace=self.namespace, key=key, value=encoded, expires_at=expires_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Inserted concurrently; last writer wins.
+                db.rollback()
+                self._query(db, key).update(
+                    {TTLEntry.value: encoded, TTLEntry.expires_at: expires_at}, synchronize_session=False
+                )
+                db.commit()
+        finally:
+            db.close()
+        if time.monotonic() >= self._next_purge:
+            self.purge_expired()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        db = self.session_factory()
+        try:
+            row = self._query(db, key).filter(TTLEntry.expires_at > datetime.utcnow()).first()
+            return json.loads(row.value) if row else default
+        finally:
+            db.close()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        db = self.session_factory()
+        try:
+            row = self._query(db, key).filter(TTLEntry.expires_at > datetime.utcnow()).first()
+            if row is None:
+                return default
+            value = row.value
+            # Only the request whose DELETE removes the row gets the value.
+            deleted = self._query(db, key).filter(TTLEntry.value == value).delete(synchronize_session=False)
+            db.commit()
+            return json.loads(value) if deleted else default
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        self._next_purge = time.monotonic() + self.purge_interval
+        db = self.session_factory()
+        try:
+            removed = (
+                db.query(TTLEntry)
+                .filter(TTLEntry.namespace == self.namespace, TTLEntry.expires_at <= datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        if removed:
+            STORE_EVICTIONS.inc(removed, name=self.namespace, reason="expired")
+        return removed
+
+
+_stores: Dict[str, TTLStore] = {}
+
+
+def get_ttl_store(name: str, default_ttl: float) -> TTLStore:
+    """Return the process-wide store ``name`` using the backend chosen by TTL_STORE_BACKEND."""
+    store = _stores.get(name)
+    if store is None:
+        backend = settings.TTL_STORE_BACKEND.lower()
+        if backend == "memory":
+            store = MemoryTTLStore(name, default_ttl, settings.TTL_STORE_MAX_ENTRIES, settings.TTL_STORE_MAX_BYTES)
+        elif backend == "database":
+            store = DatabaseTTLStore(name, default_ttl)
+        else:
+            raise RuntimeError(f"Unknown TTL_STORE_BACKEND: {settings.TTL_STORE_BACKEND}")
+        _stores[name] = store
+    return store
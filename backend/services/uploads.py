@@ -0,0 +1,146 @@
+"""
+Upload Service
+
+Streams ``UploadFile`` bodies into media storage without blocking the event loop.
+
+- Chunks are read with ``await upload.read(...)`` and written from the threadpool,
+  so a large video never stalls other requests on the worker.
+- Per-kind size limits ("image", "video") are enforced while streaming; the copy
+  stops at the first chunk that crosses the limit.
+- A SHA-256 content hash is computed on the fly.
+- Data is written to a temporary file and only then handed to the storage
+  backend (atomic rename for local disk, multipart upload for S3), so readers
+  never observe a partially written file.
+- Files are content-addressed: they are named ``<sha256><ext>``, so uploading
+  the same bytes twice stores them once (see ``media_store`` for refcounting).
+
+Settings:
+    - UPLOAD_MAX_IMAGE_BYTES: Maximum size of an image upload.
+    - UPLOAD_MAX_VIDEO_BYTES: Maximum size of a video upload.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.services.storage import TEMP_PREFIX, StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+_EXTENSION_PATTERN = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+def upload_limits() -> Dict[str, int]:
+    """Maximum upload size in bytes, per kind of media."""
+    return {
+        "image": settings.UPLOAD_MAX_IMAGE_BYTES,
+        "video": settings.UPLOAD_MAX_VIDEO_BYTES,
+    }
+
+
+@dataclass
+class StoredUpload:
+    """Result of a completed upload."""
+
+    key: str
+    url: str
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+    deduplicated: bool = False
+
+
+def safe_extension(filename: Optional[str]) -> str:
+    """Return a normalised file extension, or "" if it looks suspicious."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXTENSION_PATTERN.match(ext) else ""
+
+
+async def save_upload(upload: UploadFile, kind: str, storage: Optional[StorageBackend] = None) -> StoredUpload:
+    """
+    Stream ``upload`` into media storage under its content hash.
+
+    Parameters
+    ----------
+    upload : UploadFile
+        The incoming file.
+    kind : str
+        Either "image" or "video"; selects the size limit.
+    storage : StorageBackend, optional
+        Destination backend; defaults to the configured one.
+
+    Returns
+    -------
+    StoredUpload
+        Storage key, public URL, size and SHA-256 of the stored file.
+
+    Raises
+    ------
+    HTTPException
+        - 413 if the upload exceeds the size limit for ``kind``.
+        - 500 if the file cannot be written.
+    """
+    storage = storage or get_storage()
+    limit = upload_limits()[kind]
+    if upload.size is not None and upload.size > limit:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{kind.capitalize()} exceeds the {limit // (1024 * 1024)} MB limit.",
+        )
+
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, prefix=TEMP_PREFIX, dir=storage.temp_dir)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"{kind.capitalize()} exceeds the {limit // (1024 * 1024)} MB limit.",
+                    )
+                hasher.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+            await run_in_threadpool(buffer.flush)
+
+        sha256 = hasher.hexdigest()
+        key = f"{sha256}{safe_extension(upload.filename)}"
+        deduplicated = await run_in_threadpool(storage.save_file, tmp_path, key, upload.content_type)
+    except HTTPException:
+        _discard(tmp_path)
+        raise
+    except Exception as e:
+        _discard(tmp_path)
+        logger.error(f"Error saving uploaded {kind}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving uploaded {kind}.")
+
+    logger.info(f"Stored {kind} upload {key} ({size} bytes, deduplicated={deduplicated})")
+    return StoredUpload(
+        key=key,
+        url=storage.url(key),
+        size=size,
+        sha256=sha256,
+        content_type=upload.content_type,
+        deduplicated=deduplicated,
+    )
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
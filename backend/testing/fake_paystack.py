@@ -0,0 +1,231 @@
+"""
+Fake Paystack Server
+
+A tiny stand-in for the parts of the Paystack API we use, with fault injection,
+for tests and local load/failure experiments.
+
+- POST /transaction/initialize and GET /transaction/verify/{reference} behave
+  like Paystack: initialized references verify as "success" unless marked
+  otherwise with ``FakePaystack.set_status``.
+- ``FaultConfig`` injects latency (with optional jitter), error responses (a
+  fixed number of upcoming failures or a random error rate) and hanging requests.
+- With ``webhook_url`` set, every initialized transaction is "paid" and a signed
+  ``charge.success`` event is POSTed there after ``webhook_delay`` seconds, like
+  Paystack does once the customer completes checkout.
+- ``requests`` and ``max_in_flight`` record the load the client generated.
+- GET/POST /_faults reads or replaces the fault configuration at runtime when
+  the server runs out of process.
+
+Usage:
+    # In tests, call it in-process without any sockets:
+    fake = FakePaystack()
+    client = PaystackClient(base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app))
+
+    # Or run it as a server and point PAYSTACK_BASE_URL at it:
+    python -m backend.testing.fake_paystack --port 8010 --latency 0.2 --error-rate 0.1 \
+        --webhook-url http://localhost:8002/api/paystack/webhook
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FaultConfig:
+    """Faults applied to every Paystack endpoint."""
+
+    latency: float = 0.0            # seconds added to each response
+    latency_jitter: float = 0.0     # plus a uniform random 0..jitter seconds
+    error_rate: float = 0.0         # probability of answering ``error_status``
+    error_status: int = 503
+    fail_next: int = 0              # answer ``error_status`` to the next N requests
+    hang: bool = False              # never answer (exercises client timeouts)
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakePaystack:
+    faults: FaultConfig = field(default_factory=FaultConfig)
+    transactions: Dict[str, dict] = field(default_factory=dict)
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    secret_key: str = field(default_factory=lambda: os.getenv("PAYSTACK_SECRET_KEY", ""))
+    webhook_url: Optional[str] = None
+    webhook_delay: float = 0.0
+    webhook_transport: Optional[httpx.AsyncBaseTransport] = None
+    webhooks_sent: int = 0
+    webhooks_failed: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.faults.seed)
+        self._next_id = 1000
+        self._webhook_tasks: Set[asyncio.Task] = set()
+        self.app = self._build_app()
+
+    def set_status(self, reference: str, status: str) -> None:
+        """Make ``reference`` verify with the given Paystack status ("failed", "abandoned", ...)."""
+        self.transactions.setdefault(reference, {"reference": reference, "amount": 0})["status"] = status
+
+    def webhook_body(self, reference: str) -> bytes:
+        transaction = self.transactions[reference]
+        event = "charge.success" if transaction["status"] == "success" else "charge.failed"
+        return json.dumps({"event": event, "data": transaction}).encode("utf-8")
+
+    async def send_webhook(self, reference: str) -> Optional[int]:
+        """POST the signed event for ``reference`` to ``webhook_url``; returns the response status."""
+        body = self.webhook_body(reference)
+        signature = hmac.new(self.secret_key.encode("utf-8"), body, hashlib.sha512).hexdigest()
+        try:
+            async with httpx.AsyncClient(transport=self.webhook_transport, timeout=10.0) as client:
+                response = await client.post(
+                    self.webhook_url,
+                    content=body,
+                    headers={"content-type": "application/json", "x-paystack-signature": signature},
+                )
+        except httpx.HTTPError as exc:
+            self.webhooks_failed += 1
+            logger.warning(f"Webhook for {reference} failed: {exc}")
+            return None
+        if response.status_code >= 300:
+            self.webhooks_failed += 1
+        else:
+            self.webhooks_sent += 1
+        return response.status_code
+
+    async def _deliver_later(self, reference: str) -> None:
+        if self.webhook_delay:
+            await asyncio.sleep(self.webhook_delay)
+        await self.send_webhook(reference)
+
+    async def drain_webhooks(self) -> None:
+        """Wait for scheduled webhook deliveries (tests, benchmark shutdown)."""
+        while self._webhook_tasks:
+            await asyncio.gather(*list(self._webhook_tasks), return_exceptions=True)
+
+    async def _inject_faults(self) -> Optional[JSONResponse]:
+        self.requests += 1
+        faults = self.faults
+        if faults.hang:
+            await asyncio.Event().wait()
+        if faults.latency or faults.latency_jitter:
+            await asyncio.sleep(faults.latency + self._rng.uniform(0, faults.latency_jitter))
+        if faults.fail_next > 0 or (faults.error_rate and self._rng.random() < faults.error_rate):
+            faults.fail_next = max(0, faults.fail_next - 1)
+            return JSONResponse({"status": False, "message": "Injected failure"}, status_code=faults.error_status)
+        return None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Paystack")
+
+        @app.middleware("http")
+        async def track_concurrency(request: Request, call_next):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.post("/transaction/initialize")
+        async def initialize(request: Request):
+            failure = await self._inject_faults()
+            if failure:
+                return failure
+            payload = await request.json()
+            reference = payload.get("reference")
+            if not reference or not payload.get("amount"):
+                return JSONResponse({"status": False, "message": "Invalid transaction"}, status_code=400)
+            self._next_id += 1
+            self.transactions[reference] = {
+                "id": self._next_id,
+                "reference": reference,
+                "amount": payload["amount"],
+                "customer": {"email": payload.get("email")},
+                "status": "success",
+                "paid_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            }
+            if self.webhook_url:
+                task = asyncio.create_task(self._deliver_later(reference))
+                self._webhook_tasks.add(task)
+                task.add_done_callback(self._webhook_tasks.discard)
+            return {
+                "status": True,
+                "message": "Authorization URL created",
+                "data": {
+                    "authorization_url": f"https://checkout.paystack.test/{reference}",
+                    "access_code": reference,
+                    "reference": reference,
+                },
+            }
+
+        @app.get("/transaction/verify/{reference}")
+        async def verify(reference: str):
+            failure = await self._inject_faults()
+            if failure:
+                return failure
+            transaction = self.transactions.get(reference)
+            if transaction is None:
+                return JSONResponse({"status": False, "message": "Transaction reference not found"}, status_code=400)
+            return {"status": True, "message": "Verification successful", "data": transaction}
+
+        @app.get("/_faults")
+        async def get_faults():
+            return asdict(self.faults)
+
+        @app.post("/_faults")
+        async def set_faults(config: dict):
+            self.faults = FaultConfig(**config)
+            self._rng = random.Random(self.faults.seed)
+            return asdict(self.faults)
+
+        return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Paystack API with fault injection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--webhook-url", help="Where to POST charge events, e.g. http://localhost:8002/api/paystack/webhook")
+    parser.add_argument("--webhook-delay", type=float, default=1.0)
+    parser.add_argument("--secret-key", default=os.getenv("PAYSTACK_SECRET_KEY", ""), help="Signs webhooks (default: $PAYSTACK_SECRET_KEY)")
+    args = parser.parse_args()
+
+    faults = FaultConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    fake = FakePaystack(
+        faults,
+        secret_key=args.secret_key,
+        webhook_url=args.webhook_url,
+        webhook_delay=args.webhook_delay,
+    )
+    uvicorn.run(fake.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Fake Social Platform Server
+
+A local stand-in for the social platform APIs spoken by
+``backend.services.social_platforms``, for tests and offline throughput
+benchmarks of the post dispatcher.
+
+- POST /media/upload/init, /media/upload/{id}/append, /media/upload/{id}/finalize
+  accept chunked media uploads; POST /posts publishes a post.
+- ``PlatformFaults`` adds latency (with jitter), a request rate limit answered
+  with ``429`` and ``Retry-After`` like the real APIs, and random errors.
+- ``posts``, ``media``, ``requests``, ``rate_limited`` and ``max_in_flight``
+  record what the clients did.
+- GET/POST /_faults reads or replaces the fault configuration at runtime.
+
+Usage:
+    # One server for all platforms, each under its own prefix:
+    python -m backend.testing.fake_platform --port 8020 --latency 0.2 --rate-limit 5
+    SOCIAL_PLATFORM_BASE_URLS='{"facebook": "http://localhost:8020/facebook", "x": "http://localhost:8020/x"}'
+
+    # In tests and benchmarks:
+    with running_server(build_app({"x": FakePlatform("x")})) as base_url:
+        ...
+"""
+
+import argparse
+import asyncio
+import contextlib
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PLATFORMS = ("facebook", "x", "instagram")
+
+
+@dataclass
+class PlatformFaults:
+    """Behaviour applied to every platform endpoint."""
+
+    latency: float = 0.0            # seconds added to each response
+    latency_jitter: float = 0.0     # plus a uniform random 0..jitter seconds
+    rate_limit: float = 0.0         # requests per second before answering 429 (0: unlimited)
+    error_rate: float = 0.0         # probability of answering ``error_status``
+    error_status: int = 503
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakePlatform:
+    name: str = "platform"
+    token: Optional[str] = None
+    faults: PlatformFaults = field(default_factory=PlatformFaults)
+    posts: List[dict] = field(default_factory=list)
+    media: Dict[str, dict] = field(default_factory=dict)
+    requests: int = 0
+    rate_limited: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.faults.seed)
+        self._window_start = 0.0
+        self._window_count = 0
+        self.app = self._build_app()
+
+    def _check(self, request: Request) -> Optional[JSONResponse]:
+        """Authentication, rate limit and injected errors; None if the request may proceed."""
+        self.requests += 1
+        if self.token and request.headers.get("authorization") != f"Bearer {self.token}":
+            return JSONResponse({"error": "invalid token"}, status_code=401)
+        faults = self.faults
+        if faults.rate_limit:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            if self._window_count >= faults.rate_limit:
+                self.rate_limited += 1
+                retry_after = max(1, math.ceil(self._window_start + 1.0 - now))
+                return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": str(retry_after)})
+            self._window_count += 1
+        if faults.error_rate and self._rng.random() < faults.error_rate:
+            return JSONResponse({"error": "injected failure"}, status_code=faults.error_status)
+        return None
+
+    async def _delay(self) -> None:
+        faults = self.faults
+        if faults.latency or faults.latency_jitter:
+            await asyncio.sleep(faults.latency + self._rng.uniform(0, faults.latency_jitter))
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title=f"Fake {self.name}")
+
+        @app.middleware("http")
+        async def track(request: Request, call_next):
+            if request.url.path.endswith("/_faults"):
+                return await call_next(request)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await self._delay()
+                rejected = self._check(request)
+                return rejected or await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.post("/media/upload/init")
+        async def upload_init(payload: dict):
+            media_id = uuid.uuid4().hex
+            self.media[media_id] = {"media_type": payload.get("media_type"), "segments": {}, "size": None}
+            return {"media_id": media_id}
+
+        @app.post("/media/upload/{media_id}/append")
+        async def upload_append(media_id: str, segment_index: int, request: Request):
+            upload = self.media.get(media_id)
+            if upload is None:
+                return JSONResponse({"error": "unknown media"}, status_code=404)
+            upload["segments"][segment_index] = len(await request.body())
+            return {"media_id": media_id, "segment_index": segment_index}
+
+        @app.post("/media/upload/{media_id}/finalize")
+        async def upload_finalize(media_id: str, payload: dict):
+            upload = self.media.get(media_id)
+            if upload is None:
+                return JSONResponse({"error": "unknown media"}, status_code=404)
+            size = sum(upload["segments"].values())
+            if size != payload.get("total_bytes"):
+                return JSONResponse({"error": f"received {size} bytes"}, status_code=400)
+            upload["size"] = size
+            return {"media_id": media_id, "size": size}
+
+        @app.post("/posts", status_code=201)
+        async def create_post(payload: dict):
+            for media_id in payload.get("media_ids", []):
+                if self.media.get(media_id, {}).get("size") is None:
+                    return JSONResponse({"error": f"media {media_id} is not finalized"}, status_code=400)
+            post = {"id": str(len(self.posts) + 1), **payload}
+            self.posts.append(post)
+            return {"id": post["id"]}
+
+        @app.get("/_faults")
+        async def get_faults():
+            return asdict(self.faults)
+
+        @app.post("/_faults")
+        async def set_faults(config: dict):
+            self.faults = PlatformFaults(**config)
+            self._rng = random.Random(self.faults.seed)
+            return asdict(self.faults)
+
+        return app
+
+
+def build_app(platforms: Dict[str, FakePlatform]) -> FastAPI:
+    """One app serving each fake platform under ``/<name>``."""
+    app = FastAPI(title="Fake social platforms")
+    for name, platform in platforms.items():
+        app.mount(f"/{name}", platform.app)
+    return app
+
+
+@contextlib.contextmanager
+def running_server(app, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Serve ``app`` with uvicorn on a background thread; yields its base URL."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Fake platform server did not start.")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        thread.join(10)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run fake social platform APIs under /facebook, /x and /instagram.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second per platform (0: unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    platforms = {
+        name: FakePlatform(name, faults=PlatformFaults(
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            rate_limit=args.rate_limit,
+            error_rate=args.error_rate,
+        ))
+        for name in PLATFORMS
+    }
+    uvicorn.run(build_app(platforms), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware.sessions import SessionMiddleware
+
+from backend.core.database import Base, get_db
+from backend.routers import api_router, pages_router
+from backend.services.post_claims import claim_due_posts
+from benchmarks.dataset import SIZES, seed_dataset
+from benchmarks.suite import Thresholds, build_scenarios, compare, format_results, page_depths, run_suite
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    manifest = seed_dataset(factory, SIZES["tiny"])
+    yield factory, manifest
+    engine.dispose()
+
+
+@pytest.fixture
+def app(seeded):
+    factory, _ = seeded
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key="test")
+    app.include_router(api_router, prefix="/api")
+    app.include_router(pages_router)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def _results(dataset=None, **scenarios):
+    return {
+        "meta": {"dataset": dataset or {"courses": 10}},
+        "scenarios": {
+            name: {"requests": 100, "errors": 0, "rps": 100.0, "p50_ms": 10.0, "p99_ms": 30.0, **values}
+            for name, values in scenarios.items()
+        },
+    }
+
+
+def test_page_depths():
+    assert page_depths(95) == [1, 5, 10]
+    assert page_depths(3) == [1]
+    assert page_depths(0) == [1]
+
+
+def test_seeded_posts_are_never_due(seeded):
+    factory, _ = seeded
+    db = factory()
+    claimed = claim_due_posts(db, "scheduler", limit=100, lease_seconds=60)
+    db.close()
+    assert claimed == []
+
+
+def test_seeding_twice_is_refused(seeded):
+    factory, _ = seeded
+    with pytest.raises(RuntimeError):
+        seed_dataset(factory, SIZES["tiny"])
+
+
+async def test_suite_runs_every_scenario_against_the_app(app, seeded):
+    _, manifest = seeded
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app.test") as client:
+        results = await run_suite(client, manifest, requests=4, concurrency=2, warmup=1)
+
+    names = [scenario.name for scenario in build_scenarios(manifest)]
+    assert list(results["scenarios"]) == names
+    assert "GET /admin/manage-registrations?page=1" in names
+    assert len([name for name in names if name.startswith("GET /admin/manage-registrations")]) == 3
+    for name, summary in results["scenarios"].items():
+        assert (name, summary["requests"], summary["errors"]) == (name, 4, 0)
+    assert results["meta"]["dataset"] == manifest["counts"]
+    assert "GET /courses/{id}" in format_results(results)
+
+
+def test_compare_flags_regressions_beyond_thresholds():
+    baseline = _results(**{
+        "GET /": {"p95_ms": 20.0},
+        "GET /registration": {"p95_ms": 20.0},
+        "GET /api/courses?search": {"p95_ms": 2.0},
+        "GET /admin/dashboard": {"p95_ms": 20.0},
+    })
+    current = _results(**{
+        "GET /": {"p95_ms": 24.0, "rps": 85.0},                   # within 25% / 20%
+        "GET /registration": {"p95_ms": 30.0, "rps": 60.0},       # slower and fewer
+        "GET /api/courses?search": {"p95_ms": 6.0, "errors": 3},  # 3x, but under min_ms; errors
+    })
+
+    found = {(r.scenario, r.metric) for r in compare(baseline, current, Thresholds())}
+
+    assert found == {
+        ("GET /registration", "p95_ms"),
+        ("GET /registration", "rps"),
+        ("GET /api/courses?search", "errors"),
+        ("GET /admin/dashboard", "scenario"),
+    }
+
+
+def test_compare_uses_per_scenario_overrides_and_checks_dataset():
+    baseline = _results(**{"GET /": {"p95_ms": 20.0}, "GET /admin/dashboard": {"p95_ms": 20.0}})
+    current = _results({"courses": 500}, **{"GET /": {"p95_ms": 28.0}, "GET /admin/dashboard": {"p95_ms": 28.0}})
+
+    regressions = compare(baseline, current, Thresholds(), {"GET /admin/*": Thresholds(p95_pct=50)})
+
+    assert {(r.scenario, r.metric) for r in regressions} == {("suite", "dataset"), ("GET /", "p95_ms")}
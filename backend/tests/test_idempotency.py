@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.core.database import get_db
+from backend.models.course import Course
+from backend.models.idempotency_key import IdempotencyKey
+from backend.models.payment import Payment
+from backend.models.user import User
+from backend.routers import api_router
+from backend.services import idempotency
+from backend.services.paystack_service import PaystackClient, set_paystack_client
+from backend.testing.fake_paystack import FakePaystack
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    db = session_factory()
+    db.add(Course(title="Scratch", description="Intro", price=50.0, age_group="8-12", duration="4 weeks"))
+    db.commit()
+    db.close()
+    return session_factory
+
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakePaystack()
+    set_paystack_client(PaystackClient(
+        secret_key="sk_test", base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app)))
+    with TestClient(app) as test_client:
+        test_client.fake = fake
+        yield test_client
+    set_paystack_client(None)
+
+
+REGISTRATION = {
+    "fullName": "Ada", "email": "ada@example.com", "password": "secret-pass",
+    "confirm_password": "secret-pass", "phone": "080", "course_ids": [1],
+}
+
+
+def test_begin_replays_completed_and_rejects_conflicts(session_factory):
+    db = session_factory()
+    fingerprint = idempotency.request_fingerprint({"order_id": 1})
+    assert idempotency.begin(db, "test", "k1", fingerprint) is None
+
+    with pytest.raises(HTTPException) as in_progress:
+        idempotency.begin(db, "test", "k1", fingerprint)
+    assert in_progress.value.status_code == 409
+
+    idempotency.complete(db, "test", "k1", 200, {"reference": "TX-1"})
+    stored = idempotency.begin(db, "test", "k1", fingerprint)
+    assert (stored.status_code, stored.body) == (200, {"reference": "TX-1"})
+
+    with pytest.raises(HTTPException) as mismatch:
+        idempotency.begin(db, "test", "k1", idempotency.request_fingerprint({"order_id": 2}))
+    assert mismatch.value.status_code == 422
+    db.close()
+
+
+def test_lapsed_claims_and_expired_records_can_be_taken_over(session_factory):
+    db = session_factory()
+    past = datetime.utcnow() - timedelta(seconds=1)
+    db.add(IdempotencyKey(scope="test", key="crashed", fingerprint="a", status="in_progress",
+                          locked_until=past, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.add(IdempotencyKey(scope="test", key="old", fingerprint="a", status="completed",
+                          response_status=200, response_body="{}", expires_at=past))
+    db.commit()
+
+    assert idempotency.begin(db, "test", "crashed", "b") is None
+    assert idempotency.begin(db, "test", "old", "b") is None
+    assert idempotency.purge_expired_idempotency_keys(db) == 0
+    db.close()
+
+
+def test_public_register_retry_replays_the_original_order(client, session_factory):
+    headers = {"Idempotency-Key": "reg-1"}
+    first = client.post("/api/registrations/public-register", json=REGISTRATION, headers=headers)
+    retry = client.post("/api/registrations/public-register", json=REGISTRATION, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert session_factory().query(User).count() == 1
+    # Without a key a duplicate is still rejected as before.
+    assert client.post("/api/registrations/public-register", json=REGISTRATION).status_code == 400
+
+
+def test_failed_request_releases_the_key(client, session_factory):
+    mismatched = dict(REGISTRATION, confirm_password="other")
+    headers = {"Idempotency-Key": "reg-2"}
+    assert client.post("/api/registrations/public-register", json=mismatched, headers=headers).status_code == 400
+    assert session_factory().query(IdempotencyKey).count() == 0
+
+
+def test_paystack_init_retry_does_not_call_paystack_again(client, session_factory):
+    order_id = client.post("/api/registrations/public-register", json=REGISTRATION).json()["order_id"]
+    body = {"order_id": order_id, "email": REGISTRATION["email"]}
+    headers = {"Idempotency-Key": "init-1"}
+
+    first = client.post("/api/paystack/init", json=body, headers=headers)
+    retry = client.post("/api/paystack/init", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["reference"] == first.json()["reference"]
+    assert client.fake.requests == 1
+    assert session_factory().query(Payment).count() == 1
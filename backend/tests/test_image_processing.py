@@ -0,0 +1,45 @@
+import os
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from backend.services import image_processing
+
+
+@pytest.fixture
+def static_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processing, "STATIC_ROOT", str(tmp_path))
+    monkeypatch.setattr(image_processing, "DERIVATIVE_ROOT", str(tmp_path / "derivatives"))
+    image_processing._manifest_cache.clear()
+    os.makedirs(tmp_path / "images")
+    Image.new("RGB", (1000, 500), "red").save(tmp_path / "images" / "hero.png")
+    return tmp_path
+
+
+def test_generate_derivatives_never_upscales(static_root):
+    manifest = image_processing.generate_derivatives_for_url("/static/images/hero.png")
+
+    assert manifest["width"] == 1000
+    assert manifest["placeholder"].startswith("data:image/webp;base64,")
+    widths = [w for w, _ in manifest["variants"]["webp"]]
+    assert widths == [320, 640, 960, 1000]
+    for _, url in manifest["variants"]["webp"]:
+        assert os.path.isfile(image_processing.url_to_path(url))
+
+
+def test_responsive_image_emits_srcset(static_root):
+    plain = image_processing.responsive_image("/static/images/hero.png", alt="Hero", loading="lazy")
+    assert plain == '<img src="/static/images/hero.png" alt="Hero" loading="lazy">'
+
+    image_processing.generate_derivatives_for_url("/static/images/hero.png")
+    html = image_processing.responsive_image("/static/images/hero.png", alt="Hero", sizes="50vw")
+
+    assert html.startswith("<picture>")
+    assert 'type="image/webp"' in html
+    assert "/static/derivatives/images/hero.png/640.webp 640w" in html
+    assert 'sizes="50vw"' in html
+
+
+def test_external_urls_are_ignored(static_root):
+    assert image_processing.generate_derivatives_for_url("https://example.com/a.jpg") is None
+    assert image_processing.url_to_path("/static/../secret.png") is None
@@ -0,0 +1,97 @@
+import io
+import os
+import pytest
+
+try:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+except ModuleNotFoundError:
+    pytest.skip("sqlalchemy is required", allow_module_level=True)
+
+from fastapi import UploadFile
+
+from backend.core.database import Base
+from backend.models.course import Course
+from backend.models.media_blob import MediaBlob
+from backend.services import media_store
+from backend.services.storage import LocalStorage, key_from_url
+from backend.services.uploads import save_upload
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def make_course(image_url):
+    return Course(title="AI", description="d", price=10, age_group="8-12", duration="6 weeks", image_url=image_url)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path))
+
+
+async def test_identical_uploads_are_stored_once(db, storage, tmp_path):
+    first = await save_upload(UploadFile(file=io.BytesIO(b"same"), filename="a.png"), "image", storage)
+    second = await save_upload(UploadFile(file=io.BytesIO(b"same"), filename="b.png"), "image", storage)
+    for stored in (first, second):
+        db.add(make_course(stored.url))
+        media_store.acquire(db, stored)
+    db.commit()
+
+    assert first.url == second.url
+    assert second.deduplicated
+    assert os.listdir(tmp_path) == [first.key]
+    blob = db.query(MediaBlob).one()
+    assert blob.ref_count == 2
+
+
+async def test_gc_removes_only_unreferenced_files(db, storage, tmp_path):
+    kept = await save_upload(UploadFile(file=io.BytesIO(b"kept"), filename="k.png"), "image", storage)
+    replaced = await save_upload(UploadFile(file=io.BytesIO(b"old"), filename="o.png"), "image", storage)
+    course = make_course(replaced.url)
+    db.add(course)
+    media_store.acquire(db, replaced)
+    db.commit()
+
+    # Replace the course image, as update_course does.
+    media_store.acquire(db, kept)
+    media_store.release(db, course.image_url)
+    course.image_url = kept.url
+    db.commit()
+    (tmp_path / "legacy-uuid.jpg").write_bytes(b"legacy")
+
+    stats = media_store.collect_garbage(db, storage=storage, grace_seconds=0)
+
+    assert stats["deleted"] == 2
+    assert sorted(os.listdir(tmp_path)) == [kept.key]
+    assert [b.filename for b in db.query(MediaBlob).all()] == [kept.key]
+
+
+async def test_gc_keeps_uploaded_course_previews(db, storage, tmp_path):
+    preview = await save_upload(UploadFile(file=io.BytesIO(b"preview"), filename="p.mp4"), "video", storage)
+    course = make_course(None)
+    course.preview_link = preview.url
+    external = make_course(None)
+    external.preview_link = "https://www.youtube.com/watch?v=abc"
+    db.add_all([course, external])
+    db.commit()
+
+    stats = media_store.collect_garbage(db, storage=storage, grace_seconds=0)
+
+    assert stats["deleted"] == 0
+    assert os.listdir(tmp_path) == [preview.key]
+
+
+def test_key_from_url_ignores_foreign_urls():
+    assert key_from_url("/static/uploads/abc.png") == "abc.png"
+    assert key_from_url("/media/files/abc.png") == "abc.png"
+    assert key_from_url("/static/images/hero.png") is None
+    assert key_from_url("/static/uploads/../main.py") is None
+    assert key_from_url("https://example.com/abc.png") is None
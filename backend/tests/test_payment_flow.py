@@ -0,0 +1,90 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.database import Base, get_db
+from backend.core.singleflight import SingleFlight
+from backend.models.course import Course
+from backend.models.payment import Payment
+from backend.routers import api_router
+from backend.routers import paystack as paystack_router
+from backend.services import payment_verification, paystack_webhooks, ttl_store
+from backend.services.paystack_service import PaystackClient, set_paystack_client
+from backend.testing.fake_paystack import FakePaystack
+from benchmarks.payment_flow import format_report, percentile, run_payment_flow
+
+SECRET = "sk_test_secret"
+
+
+@pytest.fixture
+def db_factory(monkeypatch, tmp_path):
+    # A file database: concurrent checkouts need a connection each.
+    engine = create_engine(f"sqlite:///{tmp_path / 'flow.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(Course(title="Scratch", description="Intro", price=50.0, age_group="8-12", duration="4 weeks"))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(payment_verification, "SessionLocal", factory)
+    monkeypatch.setattr(payment_verification, "_verifications", SingleFlight("test_flow", ttl=30))
+    monkeypatch.setattr(paystack_webhooks, "SessionLocal", factory)
+    monkeypatch.setattr(ttl_store, "_stores", {
+        "payment_success": ttl_store.MemoryTTLStore("payment_success", default_ttl=60)})
+    monkeypatch.setattr(paystack_router, "verify_signature",
+                        lambda body, sig: paystack_webhooks.verify_signature(body, sig, SECRET))
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def app(db_factory):
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+
+    def override_get_db():
+        db = db_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+async def test_checkout_flow_against_fake_paystack(app, db_factory):
+    fake = FakePaystack(
+        secret_key=SECRET,
+        webhook_url="http://app.test/api/paystack/webhook",
+        webhook_transport=httpx.ASGITransport(app=app),
+    )
+    set_paystack_client(PaystackClient(
+        secret_key=SECRET, base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app)))
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app.test") as client:
+            report = await run_payment_flow(client, rps=50, duration=0.1, course_ids=[1])
+        await fake.drain_webhooks()
+    finally:
+        set_paystack_client(None)
+
+    summary = report.summary()
+    assert summary["completed"] == summary["started"] == 5
+    for step in ("register", "init", "verify"):
+        assert summary["steps"][step]["requests"] == 5
+        assert summary["steps"][step]["errors"] == 0
+    assert fake.webhooks_sent == 5
+    db = db_factory()
+    assert {p.status for p in db.query(Payment).all()} == {"completed"}
+    db.close()
+    assert "verify" in format_report(report)
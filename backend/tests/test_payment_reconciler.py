@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from backend.core.resilience import Backoff
+from backend.models.order import Order
+from backend.models.payment import Payment
+from backend.services import payment_reconciler
+from backend.services.paystack_service import PaystackClient
+from backend.testing.fake_paystack import FakePaystack, FaultConfig
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(payment_reconciler, "SessionLocal", session_factory)
+    return session_factory
+
+
+def add_payment(db, reference: str, age: timedelta) -> None:
+    order = Order(user_id=1, total_amount=50.0, status="pending")
+    db.add(order)
+    db.flush()
+    db.add(Payment(order_id=order.id, transaction_id=reference, amount=50.0, status="pending",
+                   payment_date=datetime.utcnow() - age))
+
+
+async def test_stale_pending_payments_are_reconciled_in_bulk(session_factory, monkeypatch):
+    monkeypatch.setattr(payment_reconciler.settings, "PAYMENT_RECONCILE_BATCH_SIZE", 2)
+    monkeypatch.setattr(payment_reconciler.settings, "PAYMENT_RECONCILE_CONCURRENCY", 2)
+    fake = FakePaystack(FaultConfig(latency=0.01))
+    fake.set_status("TX-paid", "success")
+    fake.set_status("TX-declined", "failed")
+    fake.set_status("TX-ongoing", "ongoing")
+    fake.set_status("TX-fresh", "success")
+
+    db = session_factory()
+    add_payment(db, "TX-paid", timedelta(hours=1))
+    add_payment(db, "TX-declined", timedelta(hours=1))
+    add_payment(db, "TX-ongoing", timedelta(hours=1))
+    add_payment(db, "TX-never-initialized", timedelta(days=2))
+    add_payment(db, "TX-fresh", timedelta(minutes=1))
+    db.commit()
+
+    client = PaystackClient(base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app),
+                            backoff=Backoff(0, 0))
+    stats = await payment_reconciler.reconcile_pending_payments(client)
+
+    statuses = {p.transaction_id: p.status for p in db.query(Payment)}
+    assert statuses == {
+        "TX-paid": "completed",
+        "TX-declined": "failed",
+        "TX-ongoing": "pending",
+        "TX-never-initialized": "failed",
+        "TX-fresh": "pending",
+    }
+    paid_order = db.query(Payment).filter(Payment.transaction_id == "TX-paid").one().order
+    assert paid_order.status == "paid"
+    assert (stats["checked"], stats["completed"], stats["failed"], stats["unresolved"]) == (4, 1, 2, 1)
+    assert stats["lag"] >= 3600
+    assert fake.max_in_flight <= 2
+
+
+async def test_unfinished_checkouts_stay_pending_until_they_expire(session_factory):
+    fake = FakePaystack()
+    for reference in ("TX-abandoned", "TX-abandoned-long-ago", "TX-ongoing-long-ago"):
+        fake.set_status(reference, reference.split("-")[1])
+
+    db = session_factory()
+    add_payment(db, "TX-abandoned", timedelta(hours=1))
+    add_payment(db, "TX-abandoned-long-ago", timedelta(days=2))
+    add_payment(db, "TX-ongoing-long-ago", timedelta(days=2))
+    db.commit()
+
+    client = PaystackClient(base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app),
+                            backoff=Backoff(0, 0))
+    stats = await payment_reconciler.reconcile_pending_payments(client)
+
+    assert {p.transaction_id: p.status for p in db.query(Payment)} == {
+        "TX-abandoned": "pending",
+        "TX-abandoned-long-ago": "failed",
+        "TX-ongoing-long-ago": "failed",
+    }
+    assert (stats["checked"], stats["failed"], stats["unresolved"]) == (3, 2, 1)
+
+
+@pytest.mark.parametrize("status_code", [400, 401])
+async def test_rejected_key_does_not_abandon_old_payments(session_factory, status_code):
+    def invalid_key(request):
+        return httpx.Response(status_code, json={"status": False, "message": "Invalid key"})
+
+    db = session_factory()
+    add_payment(db, "TX-paid-long-ago", timedelta(days=2))
+    db.commit()
+
+    client = PaystackClient(base_url="http://paystack.test", transport=httpx.MockTransport(invalid_key),
+                            backoff=Backoff(0, 0))
+    stats = await payment_reconciler.reconcile_pending_payments(client)
+
+    assert db.query(Payment).one().status == "pending"
+    assert (stats["checked"], stats["failed"], stats["unresolved"]) == (1, 0, 1)
+
+
+async def test_one_worker_reconciles_per_interval(session_factory):
+    fake = FakePaystack()
+    fake.set_status("TX-paid", "success")
+    db = session_factory()
+    add_payment(db, "TX-paid", timedelta(hours=1))
+    db.commit()
+    client = PaystackClient(base_url="http://paystack.test", transport=httpx.ASGITransport(app=fake.app))
+
+    first = await payment_reconciler.reconcile_pending_payments(client, owner="worker-1")
+    second = await payment_reconciler.reconcile_pending_payments(client, owner="worker-2")
+    again = await payment_reconciler.reconcile_pending_payments(client, owner="worker-1")
+
+    assert first["completed"] == 1
+    assert second is None
+    assert again is not None
+    assert fake.requests == 1
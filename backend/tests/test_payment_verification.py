@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.singleflight import SingleFlight
+from backend.models.lease import Lease
+from backend.models.order import Order
+from backend.models.payment import Payment
+from backend.services import payment_verification
+from backend.services.leases import acquire_lease, release_lease
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    db = session_factory()
+    order = Order(user_id=1, total_amount=50.0, status="pending")
+    db.add(order)
+    db.flush()
+    db.add(Payment(order_id=order.id, transaction_id="TX-1", amount=50.0, status="pending"))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(payment_verification, "SessionLocal", session_factory)
+    monkeypatch.setattr(payment_verification, "_verifications", SingleFlight(
+        "test_verify", ttl=30, cacheable=lambda s: s == "completed"))
+    return session_factory
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    async def fake_verify(reference):
+        calls.append(reference)
+        await asyncio.sleep(0.05)
+        return {"status": True, "data": {"status": "success"}}
+
+    monkeypatch.setattr(payment_verification, "verify_transaction", fake_verify)
+    return calls
+
+
+async def test_single_flight_coalesces_and_caches():
+    calls = []
+    flight = SingleFlight("test", ttl=10)
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+    assert results == ["done"] * 5
+    assert await flight.do("k", work) == "done"
+    assert len(calls) == 1
+
+
+async def test_concurrent_verifications_share_one_upstream_call(session_factory, upstream):
+    statuses = await asyncio.gather(*(payment_verification.verify_payment("TX-1") for _ in range(5)))
+
+    assert statuses == ["completed"] * 5
+    assert upstream == ["TX-1"]
+    assert session_factory().query(Lease).count() == 0
+
+    assert await payment_verification.verify_payment("TX-1") == "completed"
+    assert upstream == ["TX-1"]
+
+
+async def test_other_workers_lease_is_awaited_instead_of_calling_paystack(session_factory, upstream):
+    db = session_factory()
+    assert acquire_lease(db, payment_verification.lease_name("TX-1"), "other-worker", ttl=10)
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.3)
+        db.query(Payment).update({Payment.status: "completed"})
+        db.commit()
+        release_lease(db, payment_verification.lease_name("TX-1"), "other-worker")
+
+    status, _ = await asyncio.gather(payment_verification.verify_payment("TX-1"), other_worker_finishes())
+
+    assert status == "completed"
+    assert upstream == []
+
+
+async def test_failed_payments_are_verified_again(session_factory, upstream):
+    db = session_factory()
+    db.query(Payment).update({Payment.status: "failed"})
+    db.commit()
+
+    assert await payment_verification.verify_payment("TX-1") == "completed"
+    assert upstream == ["TX-1"]
+    assert db.query(Order).one().status == "paid"
+
+
+def test_leases_expire_and_belong_to_their_owner(session_factory):
+    db = session_factory()
+    assert acquire_lease(db, "job", "a", ttl=10)
+    assert not acquire_lease(db, "job", "b", ttl=10)
+    release_lease(db, "job", "b")
+    assert not acquire_lease(db, "job", "b", ttl=10)
+
+    db.query(Lease).update({Lease.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert acquire_lease(db, "job", "b", ttl=10)
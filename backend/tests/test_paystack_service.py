@@ -0,0 +1,109 @@
+import json
+import pytest
+import httpx
+
+from fastapi import HTTPException
+
+from backend.core.resilience import Backoff, CircuitBreaker
+from backend.services import paystack_service
+from backend.services.paystack_service import PaystackClient
+from backend.testing.fake_paystack import FakePaystack, FaultConfig
+
+
+def make_client(handler, **kwargs) -> PaystackClient:
+    return PaystackClient(
+        secret_key="sk_test",
+        base_url="https://paystack.test",
+        transport=httpx.MockTransport(handler),
+        backoff=Backoff(0, 0),
+        **kwargs,
+    )
+
+
+def fake_client(fake: FakePaystack, **kwargs) -> PaystackClient:
+    return PaystackClient(
+        base_url="http://paystack.test",
+        transport=httpx.ASGITransport(app=fake.app),
+        backoff=Backoff(0, 0),
+        **kwargs,
+    )
+
+
+async def test_initialize_transaction_posts_payload_with_auth():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"status": True, "data": {"authorization_url": "https://pay/abc"}})
+
+    client = make_client(handler)
+    data = await client.initialize_transaction("kid@example.com", 5000, "https://cb", "TX-1")
+    await client.aclose()
+
+    assert data["data"]["authorization_url"] == "https://pay/abc"
+    assert seen[0].url == "https://paystack.test/transaction/initialize"
+    assert seen[0].headers["authorization"] == "Bearer sk_test"
+    assert json.loads(seen[0].content) == {
+        "email": "kid@example.com", "amount": 5000, "callback_url": "https://cb", "reference": "TX-1",
+    }
+
+
+async def test_status_false_is_a_client_error():
+    client = make_client(lambda request: httpx.Response(200, json={"status": False, "message": "Invalid key"}))
+
+    with pytest.raises(HTTPException) as exc:
+        await client.verify_transaction("TX-1")
+
+    assert exc.value.status_code == 400
+    assert "Invalid key" in exc.value.detail
+
+
+async def test_network_errors_are_retried_then_reported_as_bad_gateway():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(HTTPException) as exc:
+        await client.verify_transaction("TX-1")
+
+    assert exc.value.status_code == 502
+    assert len(calls) == 3
+
+
+async def test_transient_errors_are_retried_against_fake_paystack():
+    fake = FakePaystack(FaultConfig(fail_next=2))
+    client = fake_client(fake)
+
+    data = await client.initialize_transaction("kid@example.com", 5000, "https://cb", "TX-1")
+
+    assert data["data"]["reference"] == "TX-1"
+    assert fake.requests == 3
+
+
+async def test_open_circuit_fails_fast_with_payments_unavailable():
+    fake = FakePaystack(FaultConfig(error_rate=1.0))
+    client = fake_client(fake, breaker=CircuitBreaker("paystack-test", failure_threshold=3, recovery_timeout=60))
+
+    with pytest.raises(HTTPException) as first:
+        await client.verify_transaction("TX-1")
+    with pytest.raises(HTTPException) as second:
+        await client.verify_transaction("TX-1")
+
+    assert first.value.status_code == 502
+    assert second.value.status_code == 503
+    assert second.value.detail == paystack_service.PAYMENTS_UNAVAILABLE
+    assert int(second.value.headers["Retry-After"]) > 0
+    assert fake.requests == 3
+
+
+async def test_shared_client_lifecycle():
+    paystack_service.set_paystack_client(None)
+    await paystack_service.start_paystack_client()
+    client = paystack_service.get_paystack_client()
+
+    assert paystack_service.get_paystack_client() is client
+    await paystack_service.close_paystack_client()
+    assert client.is_closed
@@ -0,0 +1,102 @@
+import hashlib
+import hmac
+import json
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.database import get_db
+from backend.models.order import Order
+from backend.models.payment import Payment
+from backend.models.paystack_event import PaystackEvent
+from backend.routers import paystack as paystack_router
+from backend.services import paystack_webhooks
+
+SECRET = "sk_test_secret"
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    order = Order(user_id=1, total_amount=100.0, status="pending")
+    session.add(order)
+    session.flush()
+    session.add(Payment(order_id=order.id, transaction_id="TX-1", amount=100.0, status="pending"))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+def event_body(event="charge.success", reference="TX-1", status="success", event_id=42) -> bytes:
+    data = {"id": event_id, "reference": reference, "status": status, "paid_at": "2026-10-18T10:00:00.000Z"}
+    return json.dumps({"event": event, "data": data}).encode()
+
+
+def sign(body: bytes) -> str:
+    return hmac.new(SECRET.encode(), body, hashlib.sha512).hexdigest()
+
+
+def test_verify_signature():
+    body = event_body()
+    assert paystack_webhooks.verify_signature(body, sign(body), SECRET)
+    assert not paystack_webhooks.verify_signature(body + b" ", sign(body), SECRET)
+    assert not paystack_webhooks.verify_signature(body, None, SECRET)
+
+
+def test_events_are_recorded_once_and_applied_idempotently(session_factory):
+    db = session_factory()
+    event_id, created = paystack_webhooks.record_event(db, event_body())
+    again, created_again = paystack_webhooks.record_event(db, event_body())
+
+    assert created and not created_again and again == event_id
+    assert paystack_webhooks.process_event(db, event_id)
+    assert not paystack_webhooks.process_event(db, event_id)
+
+    payment = db.query(Payment).one()
+    assert payment.status == "completed"
+    assert payment.payment_date.isoformat() == "2026-10-18T10:00:00"
+    assert db.query(Order).one().status == "paid"
+    assert db.query(PaystackEvent).one().status == "processed"
+
+
+def test_unknown_reference_is_retried_then_marked_failed(session_factory, monkeypatch):
+    monkeypatch.setattr(paystack_webhooks.settings, "PAYSTACK_WEBHOOK_MAX_ATTEMPTS", 2)
+    db = session_factory()
+    event_id, _ = paystack_webhooks.record_event(db, event_body(reference="TX-unknown"))
+
+    paystack_webhooks.process_event(db, event_id)
+    assert db.query(PaystackEvent).one().status == "pending"
+    paystack_webhooks.process_event(db, event_id)
+
+    event = db.query(PaystackEvent).one()
+    assert event.status == "failed"
+    assert event.attempts == 2
+
+
+def test_webhook_endpoint_acknowledges_and_defers_processing(session_factory, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(paystack_router, "verify_signature", lambda body, sig: paystack_webhooks.verify_signature(body, sig, SECRET))
+    monkeypatch.setattr(paystack_router, "process_event_by_id", scheduled.append)
+
+    app = FastAPI()
+    app.include_router(paystack_router.router)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    body = event_body()
+
+    assert client.post("/paystack/webhook", content=body, headers={"x-paystack-signature": "bad"}).status_code == 401
+    first = client.post("/paystack/webhook", content=body, headers={"x-paystack-signature": sign(body)})
+    redelivery = client.post("/paystack/webhook", content=body, headers={"x-paystack-signature": sign(body)})
+
+    assert first.status_code == redelivery.status_code == 200
+    assert len(scheduled) == 1
+    assert session_factory().query(Payment).one().status == "pending"
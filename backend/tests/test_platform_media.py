@@ -0,0 +1,95 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.database import Base
+from backend.models.social_post import SocialMediaPost
+from backend.services import media_store, platform_media
+from backend.services.platform_media import (
+    PLATFORM_MEDIA_SPECS,
+    MediaSpec,
+    derivative_key,
+    platform_image_url,
+    prepare_post_media,
+    render_platform_image,
+)
+from backend.services.storage import LocalStorage, set_storage
+
+
+def _png(width, height, mode="RGBA"):
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert(mode).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = LocalStorage(str(tmp_path))
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+
+
+def test_render_fits_platform_limits():
+    rendered = render_platform_image(_png(1500, 500), PLATFORM_MEDIA_SPECS["instagram"])
+    with Image.open(io.BytesIO(rendered)) as image:
+        assert image.format == "JPEG"
+        assert image.width <= 1080
+        assert image.width / image.height == pytest.approx(1.91, abs=0.01)
+
+
+def test_render_lowers_quality_and_size_to_fit_byte_limit():
+    spec = MediaSpec(max_width=2000, max_height=2000, max_bytes=15_000)
+    rendered = render_platform_image(_png(800, 800, "RGB"), spec)
+    assert len(rendered) <= 15_000
+
+
+async def test_prepared_derivative_is_reused_at_dispatch(storage, tmp_path, monkeypatch):
+    (tmp_path / "photo.png").write_bytes(_png(600, 1200))
+    url = storage.url("photo.png")
+    try:
+        prepared = await prepare_post_media("instagram", url)
+    finally:
+        platform_media.shutdown_media_pool()
+
+    expected = derivative_key("photo.png", "instagram", PLATFORM_MEDIA_SPECS["instagram"])
+    assert prepared == storage.url(expected)
+
+    def fail(*args):
+        raise AssertionError("rendered again at dispatch")
+
+    monkeypatch.setattr(platform_media, "render_platform_image", fail)
+    assert platform_image_url(url, "instagram") == prepared
+
+
+def test_dispatch_renders_missing_derivative(storage, tmp_path):
+    (tmp_path / "photo.png").write_bytes(_png(2000, 200))
+    url = storage.url("photo.png")
+
+    derived = platform_image_url(url, "twitter")
+
+    assert derived == storage.url(derivative_key("photo.png", "x", PLATFORM_MEDIA_SPECS["x"]))
+    assert platform_image_url("https://example.com/a.png", "x") == "https://example.com/a.png"
+    assert platform_image_url(url, "mastodon") == url
+
+
+def test_gc_keeps_derivatives_of_referenced_images(storage, tmp_path):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for name in ("kept.png", "gone.png"):
+        (tmp_path / name).write_bytes(_png(64, 64))
+        platform_image_url(storage.url(name), "facebook")
+    db.add(SocialMediaPost(platform="facebook", content="c", content_type="feed", image_url=storage.url("kept.png")))
+    db.commit()
+
+    media_store.collect_garbage(db, storage=storage, grace_seconds=0)
+
+    spec = PLATFORM_MEDIA_SPECS["facebook"]
+    assert sorted(os.listdir(tmp_path)) == sorted(["kept.png", derivative_key("kept.png", "facebook", spec)])
+    db.close()
+    engine.dispose()
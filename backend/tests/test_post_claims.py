@@ -0,0 +1,205 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from backend.models.social_post import SocialMediaPost
+from backend.services import social_scheduler
+from backend.services.post_claims import claim_due_posts, release_claims
+from backend.services.post_dispatcher import PostDispatcher
+from backend.services.social_platforms import PlatformError
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    db = session_factory()
+    past = datetime.utcnow() - timedelta(minutes=5)
+    for i in range(5):
+        db.add(SocialMediaPost(platform="facebook", content=f"post {i}", content_type="feed",
+                               scheduled_at=past + timedelta(seconds=i), status="draft"))
+    db.add(SocialMediaPost(platform="facebook", content="later", content_type="feed",
+                           scheduled_at=datetime.utcnow() + timedelta(hours=1), status="draft"))
+    db.commit()
+    db.close()
+    return session_factory
+
+
+def test_workers_claim_disjoint_batches(session_factory):
+    first, second = session_factory(), session_factory()
+    a = claim_due_posts(first, "worker-a", limit=3, lease_seconds=60)
+    b = claim_due_posts(second, "worker-b", limit=3, lease_seconds=60)
+
+    assert [p.content for p in a] == ["post 0", "post 1", "post 2"]
+    assert [p.content for p in b] == ["post 3", "post 4"]
+    assert claim_due_posts(first, "worker-c", limit=3, lease_seconds=60) == []
+    first.close()
+    second.close()
+
+
+def test_expired_and_released_claims_can_be_taken_again(session_factory):
+    db = session_factory()
+    claimed = claim_due_posts(db, "crashed", limit=2, lease_seconds=60)
+    db.query(SocialMediaPost).filter(SocialMediaPost.id == claimed[0].id).update(
+        {SocialMediaPost.lease_until: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    release_claims(db, "crashed", [claimed[1].id])
+
+    retaken = claim_due_posts(db, "worker-b", limit=10, lease_seconds=60)
+    assert {p.id for p in retaken} == {p.id for p in db.query(SocialMediaPost).filter(
+        SocialMediaPost.content.like("post%")).all()}
+    db.close()
+
+
+def test_dispatch_skips_posts_claimed_by_another_worker(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+    sent = []
+    monkeypatch.setitem(social_scheduler.PLATFORM_HANDLERS, "facebook", lambda post: sent.append(post.content))
+    monkeypatch.setattr(social_scheduler.settings, "SOCIAL_CLAIM_BATCH_SIZE", 2)
+
+    db = session_factory()
+    claim_due_posts(db, "other-worker", limit=1, lease_seconds=60)
+    social_scheduler.dispatch_due_posts()
+
+    assert sorted(sent) == ["post 1", "post 2", "post 3", "post 4"]
+    statuses = {p.content: (p.status, p.claimed_by) for p in db.query(SocialMediaPost).all()}
+    assert statuses["post 0"] == ("draft", "other-worker")
+    assert statuses["post 4"] == ("posted", None)
+    assert statuses["later"] == ("draft", None)
+    db.close()
+
+
+def test_failed_posts_back_off_then_dead_letter(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+    monkeypatch.setattr(social_scheduler.settings, "SOCIAL_RETRY_MAX_ATTEMPTS", 2)
+
+    def broken(post):
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setitem(social_scheduler.PLATFORM_HANDLERS, "facebook", broken)
+    social_scheduler.dispatch_due_posts()
+
+    db = session_factory()
+    post = db.query(SocialMediaPost).filter(SocialMediaPost.content == "post 0").one()
+    assert (post.status, post.attempts) == ("retry", 1)
+    assert "rate limited" in post.last_error
+    assert post.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+
+    # Make the retries due; the second failure exhausts the attempts.
+    db.query(SocialMediaPost).filter(SocialMediaPost.status == "retry").update(
+        {SocialMediaPost.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    social_scheduler.dispatch_due_posts()
+    db.expire_all()
+    assert (post.status, post.attempts, post.next_attempt_at) == ("dead_letter", 2, None)
+
+    monkeypatch.setitem(social_scheduler.PLATFORM_HANDLERS, "facebook", lambda p: None)
+    social_scheduler.requeue_post(db, post.id)
+    social_scheduler.dispatch_due_posts()
+    db.expire_all()
+    assert (post.status, post.attempts) == ("posted", 1)
+    db.close()
+
+
+def test_fresh_posts_are_claimed_before_retries(session_factory):
+    db = session_factory()
+    retrying = db.query(SocialMediaPost).filter(SocialMediaPost.content == "post 0").one()
+    retrying.status = "retry"
+    retrying.next_attempt_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+
+    batch = claim_due_posts(db, "worker", limit=4, lease_seconds=60)
+    assert [p.content for p in batch] == ["post 1", "post 2", "post 3", "post 4"]
+    assert [p.content for p in claim_due_posts(db, "worker", limit=4, lease_seconds=60)] == ["post 0"]
+    db.close()
+
+
+def test_results_are_written_in_one_update_per_outcome(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+
+    def handler(post):
+        if post.content in ("post 1", "post 3"):
+            raise RuntimeError(f"API down for {post.content}")
+
+    monkeypatch.setitem(social_scheduler.PLATFORM_HANDLERS, "facebook", handler)
+    engine = session_factory.kw["bind"]
+    updates = []
+
+    def count_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_updates)
+    try:
+        social_scheduler.dispatch_due_posts()
+    finally:
+        event.remove(engine, "before_cursor_execute", count_updates)
+
+    # One claim, one UPDATE for the posted posts, one for the retries (each with its own error).
+    assert len(updates) == 3
+    db = session_factory()
+    statuses = sorted((p.content, p.status, p.attempts) for p in db.query(SocialMediaPost).all())
+    assert statuses[:5] == [("later", "draft", 0), ("post 0", "posted", 1), ("post 1", "retry", 1),
+                            ("post 2", "posted", 1), ("post 3", "retry", 1)]
+    errors = {p.content: p.last_error for p in db.query(SocialMediaPost).filter(SocialMediaPost.status == "retry")}
+    assert errors == {"post 1": "RuntimeError('API down for post 1')", "post 3": "RuntimeError('API down for post 3')"}
+    db.close()
+
+
+def test_timed_out_posts_are_not_retried(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+    published = []
+    finished = threading.Event()
+
+    def slow_then_successful(post):
+        content = post.content
+        if content == "post 0":
+            time.sleep(0.5)
+            finished.set()
+        published.append(content)
+
+    monkeypatch.setattr(social_scheduler, "_dispatcher",
+                        PostDispatcher({"facebook": slow_then_successful}, timeout=0.2))
+    social_scheduler.dispatch_due_posts()
+    assert finished.wait(5)
+    time.sleep(0.05)
+    # Even with any backoff elapsed, the next run must not publish it again.
+    db = session_factory()
+    db.query(SocialMediaPost).filter(SocialMediaPost.next_attempt_at.isnot(None)).update(
+        {SocialMediaPost.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    social_scheduler.dispatch_due_posts()
+
+    post = db.query(SocialMediaPost).filter(SocialMediaPost.content == "post 0").one()
+    assert (post.status, post.next_attempt_at) == ("dead_letter", None)
+    assert "timed out" in post.last_error
+    assert published.count("post 0") == 1
+    db.close()
+
+
+def test_only_transient_platform_errors_are_retried(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+    errors = {
+        "post 0": PlatformError("facebook", None, "ConnectError"),
+        "post 1": PlatformError("facebook", 429, "slow down", retry_after=7200),
+        "post 2": PlatformError("facebook", 503, "unavailable"),
+        "post 3": PlatformError("facebook", 400, "invalid message"),
+        "post 4": PlatformError("facebook", 401, "token expired"),
+    }
+
+    def handler(post):
+        raise errors[post.content]
+
+    monkeypatch.setitem(social_scheduler.PLATFORM_HANDLERS, "facebook", handler)
+    social_scheduler.dispatch_due_posts()
+
+    db = session_factory()
+    posts = {p.content: p for p in db.query(SocialMediaPost).filter(SocialMediaPost.status != "draft")}
+    assert {content: p.status for content, p in posts.items()} == {
+        "post 0": "retry", "post 1": "retry", "post 2": "retry", "post 3": "failed", "post 4": "failed",
+    }
+    assert posts["post 1"].next_attempt_at > datetime.utcnow() + timedelta(seconds=7100)
+    assert posts["post 2"].next_attempt_at < datetime.utcnow() + timedelta(seconds=7100)
+    assert "token expired" in posts["post 4"].last_error
+    db.close()
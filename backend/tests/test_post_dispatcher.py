@@ -0,0 +1,86 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from backend.services.post_dispatcher import (
+    DEFERRED,
+    FAILED,
+    POSTED,
+    TIMEOUT,
+    UNSUPPORTED,
+    DISPATCHED,
+    PostDispatcher,
+)
+
+
+def post(post_id, platform):
+    return SimpleNamespace(id=post_id, platform=platform, content=f"post {post_id}")
+
+
+def test_slow_platform_does_not_delay_others():
+    release = threading.Event()
+    finished = []
+
+    def slow(p):
+        release.wait(2)
+        finished.append(p.id)
+
+    def fast(p):
+        finished.append(p.id)
+
+    dispatcher = PostDispatcher({"facebook": slow, "x": fast}, concurrency={"facebook": 1, "x": 1})
+    results = {}
+    posts = [post(1, "facebook"), post(2, "x"), post(3, "x")]
+    runner = threading.Thread(target=lambda: results.update(dispatcher.dispatch(posts)))
+    runner.start()
+    deadline = time.monotonic() + 2
+    while finished != [2, 3] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert finished == [2, 3]
+    release.set()
+    runner.join()
+    assert {r.outcome for r in results.values()} == {POSTED}
+
+
+def test_concurrency_is_capped_per_platform():
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def handler(p):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.02)
+        with lock:
+            in_flight["now"] -= 1
+
+    dispatcher = PostDispatcher({"instagram": handler}, concurrency={"instagram": 2})
+    results = dispatcher.dispatch([post(i, "instagram") for i in range(8)])
+    assert all(r.ok for r in results.values())
+    assert in_flight["max"] == 2
+
+
+def test_failures_timeouts_and_unknown_platforms_are_reported():
+    def broken(p):
+        raise RuntimeError("API down")
+
+    hang = threading.Event()
+    dispatcher = PostDispatcher(
+        {"facebook": broken, "twitter": lambda p: hang.wait(5)},
+        timeout=0.2,
+    )
+    before = DISPATCHED.get(platform="x", outcome=TIMEOUT)
+    results = dispatcher.dispatch([post(1, "facebook"), post(2, "twitter"), post(3, "myspace")])
+    hang.set()
+
+    assert results[1].outcome == FAILED and "API down" in results[1].error
+    assert results[2].outcome == TIMEOUT and results[2].platform == "x"
+    assert results[3].outcome == UNSUPPORTED
+    assert DISPATCHED.get(platform="x", outcome=TIMEOUT) == before + 1
+
+
+def test_posts_not_started_within_the_run_are_deferred():
+    dispatcher = PostDispatcher({"x": lambda p: time.sleep(0.3)}, concurrency={"x": 1})
+    results = dispatcher.dispatch([post(1, "x"), post(2, "x"), post(3, "x")], max_run_seconds=0.1)
+    assert results[1].outcome == POSTED
+    assert results[2].outcome == results[3].outcome == DEFERRED
@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.database import get_db
+from backend.models.media_blob import MediaBlob
+from backend.models.social_post import SocialMediaPost, SocialPostGroup
+from backend.routers import social_media
+from backend.routers.auth import get_current_user
+from backend.services import social_scheduler
+from backend.services.post_dispatcher import PostDispatcher
+from backend.services.storage import LocalStorage, set_storage
+
+
+@pytest.fixture
+def env(session_factory, tmp_path, monkeypatch):
+    factory = session_factory
+    monkeypatch.setattr(social_scheduler, "SessionLocal", factory)
+    prepared = []
+    monkeypatch.setattr(social_media, "prepare_post_media", lambda platform, url: prepared.append(platform))
+    set_storage(LocalStorage(str(tmp_path)))
+
+    app = FastAPI()
+    app.include_router(social_media.router, prefix="/api")
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role="admin")
+    yield SimpleNamespace(client=TestClient(app), factory=factory, storage_dir=tmp_path, prepared=prepared)
+    set_storage(None)
+
+
+def _create_group(client, platforms, **fields):
+    data = {"platforms": platforms, "content": "Summer camp is open!", "content_type": "image", **fields}
+    return client.post("/api/admin/social-posts/groups", data=data,
+                       files={"image": ("camp.png", b"png-bytes", "image/png")})
+
+
+def test_group_fans_out_to_targets_sharing_one_upload(env):
+    response = _create_group(env.client, ["facebook,x", "Instagram", "x"])
+
+    assert response.status_code == 201
+    group = response.json()
+    assert [t["platform"] for t in group["targets"]] == ["facebook", "x", "instagram"]
+    assert {t["image_url"] for t in group["targets"]} == {group["image_url"]}
+    assert all(t["group_id"] == group["id"] and t["status"] == "draft" for t in group["targets"])
+    assert len(list(env.storage_dir.iterdir())) == 1
+    assert env.prepared == ["facebook", "x", "instagram"]
+    db = env.factory()
+    assert db.query(MediaBlob).one().ref_count == 4
+    db.close()
+
+
+def test_targets_are_published_in_parallel(env, monkeypatch):
+    due = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+    _create_group(env.client, ["facebook", "x", "instagram"], scheduled_at=due)
+    barrier = threading.Barrier(3, timeout=5)
+    handler = lambda post: barrier.wait()  # noqa: E731 - passes only if all three run at once
+    monkeypatch.setattr(social_scheduler, "_dispatcher", PostDispatcher(
+        {"facebook": handler, "x": handler, "instagram": handler}, timeout=10))
+
+    social_scheduler.dispatch_due_posts()
+
+    db = env.factory()
+    assert [p.status for p in db.query(SocialMediaPost).all()] == ["posted"] * 3
+    db.close()
+
+
+def test_delete_group_removes_targets_and_media_references(env):
+    group = _create_group(env.client, ["facebook", "x"]).json()
+
+    response = env.client.delete(f"/api/admin/social-posts/groups/{group['id']}")
+
+    assert response.status_code == 204
+    db = env.factory()
+    assert db.query(SocialPostGroup).count() == 0
+    assert db.query(SocialMediaPost).count() == 0
+    assert db.query(MediaBlob).one().ref_count == 0
+    db.close()
+    assert env.client.delete(f"/api/admin/social-posts/groups/{group['id']}").status_code == 404
+
+
+def test_group_requires_a_platform(env):
+    response = _create_group(env.client, [" , "])
+    assert response.status_code == 422
+    assert list(env.storage_dir.iterdir()) == []
@@ -0,0 +1,78 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.services import social_scheduler
+from backend.services.post_timer import PostTimer
+
+
+class Recorder:
+    def __init__(self, results=()):
+        self.calls = []
+        self.results = list(results)
+        self.called = threading.Event()
+
+    def __call__(self):
+        self.calls.append(time.time())
+        self.called.set()
+        return self.results.pop(0) if self.results else False
+
+
+def test_timer_sleeps_until_the_earliest_post():
+    recorder = Recorder()
+    timer = PostTimer(recorder)
+    timer.start()
+    try:
+        start = time.time()
+        timer.schedule(1, start + 5)
+        timer.schedule(2, start + 0.1)  # earlier: wakes the timer to re-arm
+        assert recorder.called.wait(2)
+        assert 0.09 <= recorder.calls[0] - start < 1
+        assert timer.next_due() == start + 5
+    finally:
+        timer.stop(1)
+
+
+def test_cancelled_and_replaced_posts_do_not_fire():
+    recorder = Recorder()
+    timer = PostTimer(recorder)
+    now = time.time()
+    timer.schedule(1, now + 0.05)
+    timer.cancel(1)
+    timer.schedule(2, now + 0.05)
+    timer.replace([(3, now + 60)])
+    timer.start()
+    try:
+        assert not recorder.called.wait(0.3)
+        assert len(timer) == 1 and timer.next_due() == now + 60
+    finally:
+        timer.stop(1)
+
+
+def test_leftover_work_reruns_the_callback():
+    recorder = Recorder(results=[True, False])
+    timer = PostTimer(recorder)
+    timer.start()
+    try:
+        timer.wake()
+        deadline = time.time() + 2
+        while len(recorder.calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(recorder.calls) == 2
+    finally:
+        timer.stop(1)
+
+
+def test_router_notifications_feed_the_timer(monkeypatch):
+    timer = PostTimer(Recorder())
+    monkeypatch.setattr(social_scheduler, "_timer", timer)
+    soon = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    social_scheduler.notify_post_scheduled(7, soon)
+    social_scheduler.notify_post_scheduled(8, datetime.utcnow() + timedelta(days=30))  # beyond the horizon
+    social_scheduler.notify_post_scheduled(9, None)
+    assert timer.next_due() == soon.timestamp()
+    assert len(timer) == 1
+
+    social_scheduler.notify_post_removed(7)
+    assert timer.next_due() is None
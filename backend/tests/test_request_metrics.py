@@ -0,0 +1,85 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from starlette.routing import Mount
+
+from backend import middleware
+from backend.core.config import settings
+from backend.core.metrics import ShardedCounter, ShardedHistogram, counter, registry
+from backend.middleware import MetricsMiddleware
+from backend.routers.metrics import router as metrics_router
+
+
+def test_sharded_metrics_are_exact_across_threads():
+    hits = ShardedCounter("test_sharded_hits_total", "Test.", ["kind"])
+    latency = ShardedHistogram("test_sharded_seconds", "Test.", buckets=(1.0,))
+
+    def work():
+        for _ in range(5000):
+            hits.inc(kind="a")
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert hits.get(kind="a") == 40000
+    assert latency.count() == 40000
+    assert 'test_sharded_seconds_bucket{le="1"} 40000' in latency.render()
+
+
+def test_collectors_run_before_render():
+    calls = counter("test_collector_runs_total", "Test.")
+    registry.add_collector(calls.inc)
+    before = calls.get()
+    registry.render()
+    assert calls.get() == before + 1
+
+
+def _app():
+    inner = FastAPI()
+
+    @inner.get("/hello/{name}")
+    def hello(name: str):
+        return PlainTextResponse(f"hi {name}")
+
+    app = FastAPI(routes=[Mount("/sub", app=inner)])
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def test_middleware_labels_requests_by_route_template(monkeypatch):
+    client = TestClient(_app())
+    requests = middleware.HTTP_REQUESTS
+    before = {
+        route: requests.get(method="GET", route=route, status=status)
+        for route, status in (("/items/{item_id}", "200"), ("/sub/hello/{name}", "200"), ("<unmatched>", "404"))
+    }
+    sizes = middleware.HTTP_RESPONSE_SIZE.sum(method="GET", route="/sub/hello/{name}")
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/sub/hello/ada")
+    client.get("/no/such/path")
+
+    assert requests.get(method="GET", route="/items/{item_id}", status="200") == before["/items/{item_id}"] + 2
+    assert requests.get(method="GET", route="/sub/hello/{name}", status="200") == before["/sub/hello/{name}"] + 1
+    assert requests.get(method="GET", route="<unmatched>", status="404") == before["<unmatched>"] + 1
+    assert middleware.HTTP_RESPONSE_SIZE.sum(method="GET", route="/sub/hello/{name}") == sizes + len("hi ada")
+    assert middleware.HTTP_IN_PROGRESS.get(method="GET") == 0
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    text = client.get("/metrics", headers={"Authorization": "Bearer secret"}).text
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'db_pool_connections{state="checked_out"}' in text
@@ -0,0 +1,100 @@
+import random
+import pytest
+
+from backend.core.metrics import Histogram, registry
+from backend.core.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    Backoff,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_backoff_grows_exponentially_with_full_jitter():
+    backoff = Backoff(base=0.1, max_delay=1.0, rng=random.Random(7))
+
+    delays = [[backoff.delay(attempt) for _ in range(200)] for attempt in range(6)]
+
+    assert all(0 <= d <= 0.1 for d in delays[0])
+    assert all(0 <= d <= 1.0 for d in delays[5])
+    assert max(delays[3]) > 0.4
+    assert len(set(delays[2])) > 100
+
+
+def test_retry_budget_limits_retries_to_a_fraction_of_calls():
+    clock = FakeClock()
+    budget = RetryBudget("test", ratio=0.1, min_retries=1, window=10, clock=clock)
+    for _ in range(20):
+        budget.record_call()
+
+    granted = sum(budget.try_acquire_retry() for _ in range(10))
+    assert granted == 3
+
+    clock.now = 11
+    assert budget.try_acquire_retry()
+
+
+def test_circuit_breaker_opens_half_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test-breaker", failure_threshold=2, recovery_timeout=30, clock=clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 30
+
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial call at a time
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    metrics = registry.render()
+    assert 'circuit_breaker_transitions_total{name="test-breaker",state="half_open"} 1' in metrics
+    assert 'circuit_breaker_state{name="test-breaker"} 0' in metrics
+
+
+def test_token_bucket_allows_bursts_then_paces_calls():
+    clock = FakeClock()
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=sleep)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    clock.now += 10
+    assert bucket.acquire() == 0
+
+
+def test_histogram_renders_cumulative_buckets():
+    latency = Histogram("test_latency_seconds", "Test latency.", ["platform"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        latency.observe(value, platform="x")
+    assert latency.count(platform="x") == 3
+    assert latency.sum(platform="x") == pytest.approx(2.55)
+    rendered = latency.render()
+    assert 'test_latency_seconds_bucket{platform="x",le="0.1"} 1' in rendered
+    assert 'test_latency_seconds_bucket{platform="x",le="1"} 2' in rendered
+    assert 'test_latency_seconds_bucket{platform="x",le="+Inf"} 3' in rendered
+    assert 'test_latency_seconds_count{platform="x"} 3' in rendered
@@ -0,0 +1,75 @@
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.responses import ZERO_COPY_SEND, MediaFileResponse
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(DATA)
+    app = FastAPI()
+
+    @app.api_route("/clip", methods=["GET", "HEAD"])
+    def clip():
+        return MediaFileResponse(str(path), headers={"ETag": '"abc"'})
+
+    return TestClient(app)
+
+
+def test_single_range_returns_partial_content(client):
+    response = client.get("/clip", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+    assert response.content == DATA[100:200]
+
+    suffix = client.get("/clip", headers={"Range": "bytes=-10"})
+    assert suffix.content == DATA[-10:]
+
+
+def test_multi_range_and_unsatisfiable_ranges_are_rejected(client):
+    multi = client.get("/clip", headers={"Range": "bytes=0-9,500-509"})
+    beyond = client.get("/clip", headers={"Range": f"bytes={len(DATA)}-"})
+
+    assert multi.status_code == 416
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_conditional_requests(client):
+    assert client.get("/clip", headers={"If-None-Match": '"abc"'}).status_code == 304
+    last_modified = client.head("/clip").headers["last-modified"]
+    assert client.get("/clip", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    stale = client.get("/clip", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200
+    assert stale.content == DATA
+
+
+async def test_zero_copy_send_is_used_when_offered(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(DATA)
+    messages = []
+
+    async def send(message):
+        if message["type"] == ZERO_COPY_SEND:
+            message["file"].seek(message["offset"])
+            message = {**message, "body": message["file"].read(message["count"])}
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(b"range", b"bytes=10-19")],
+        "extensions": {ZERO_COPY_SEND: {}},
+    }
+    await MediaFileResponse(str(path))(scope, None, send)
+
+    assert messages[0]["status"] == 206
+    assert messages[1]["type"] == ZERO_COPY_SEND
+    assert messages[1]["body"] == DATA[10:20]
@@ -0,0 +1,97 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.config import settings
+from backend.models.social_post import SocialMediaPost
+from backend.routers.metrics import router as metrics_router
+from backend.services import social_scheduler
+from backend.services.post_dispatcher import PostDispatcher
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(social_scheduler, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _use_handlers(monkeypatch, handlers):
+    monkeypatch.setattr(social_scheduler, "_dispatcher", PostDispatcher(handlers, timeout=5))
+
+
+def _add_posts(factory, platform, count, minutes_late):
+    db = factory()
+    for i in range(count):
+        db.add(SocialMediaPost(platform=platform, content=f"post {i}", content_type="feed", status="draft",
+                               scheduled_at=datetime.utcnow() - timedelta(minutes=minutes_late)))
+    db.commit()
+    db.close()
+
+
+def test_run_records_lag_results_and_summary(session_factory, monkeypatch, caplog):
+    def flaky(post):
+        if post.content == "post 1":
+            raise RuntimeError("boom")
+
+    _use_handlers(monkeypatch, {"instagram": flaky})
+    _add_posts(session_factory, "instagram", 3, minutes_late=2)
+    lag_count = social_scheduler.DISPATCH_LAG.count(platform="instagram")
+    lag_sum = social_scheduler.DISPATCH_LAG.sum(platform="instagram")
+    posted = social_scheduler.RESULTS.get(platform="instagram", status="posted")
+    retried = social_scheduler.RESULTS.get(platform="instagram", status="retry")
+    runs = social_scheduler.RUN_SECONDS.count()
+
+    with caplog.at_level(logging.INFO, logger=social_scheduler.__name__):
+        social_scheduler.dispatch_due_posts()
+
+    assert social_scheduler.DISPATCH_LAG.count(platform="instagram") == lag_count + 3
+    assert social_scheduler.DISPATCH_LAG.sum(platform="instagram") - lag_sum >= 3 * 120
+    assert social_scheduler.RESULTS.get(platform="instagram", status="posted") == posted + 2
+    assert social_scheduler.RESULTS.get(platform="instagram", status="retry") == retried + 1
+    assert social_scheduler.RUN_SECONDS.count() == runs + 1
+    [record] = [r for r in caplog.records if hasattr(r, "dispatch_run")]
+    assert "posts=3 batches=1 posted=2 retry=1" in record.getMessage()
+    assert record.dispatch_run["max_lag"] >= 120
+
+
+def test_overrun_is_counted_and_logged(session_factory, monkeypatch, caplog):
+    _use_handlers(monkeypatch, {"facebook": lambda post: time.sleep(1.2)})
+    monkeypatch.setattr(settings, "POST_SCHEDULER_INTERVAL", 1)
+    _add_posts(session_factory, "facebook", 1, minutes_late=0)
+    overruns = social_scheduler.OVERRUNS.get()
+
+    with caplog.at_level(logging.WARNING, logger=social_scheduler.__name__):
+        social_scheduler.dispatch_due_posts()
+
+    assert social_scheduler.OVERRUNS.get() == overruns + 1
+    assert any("longer than its 1s interval" in r.getMessage() for r in caplog.records)
+
+
+def test_idle_run_is_not_logged(session_factory, monkeypatch, caplog):
+    _use_handlers(monkeypatch, {})
+    with caplog.at_level(logging.INFO, logger=social_scheduler.__name__):
+        social_scheduler.dispatch_due_posts()
+    assert caplog.records == []
+
+
+def test_metrics_endpoint(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics_router)
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    monkeypatch.setattr(settings, "DEBUG", "False")
+    assert client.get("/metrics").status_code == 403
+
+    monkeypatch.setattr(settings, "DEBUG", "True")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE social_scheduler_lag_seconds histogram" in response.text
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core.config import settings
+from backend.services import social_platforms, social_scheduler
+from backend.services.social_platforms import PlatformClient, PlatformError
+from backend.services.storage import LocalStorage
+from backend.testing.fake_platform import FakePlatform, PlatformFaults, build_app, running_server
+from benchmarks.social_dispatch import make_posts, run_dispatch
+
+TOKEN = "x-token"
+
+
+@pytest.fixture
+def fake():
+    platform = FakePlatform("x", token=TOKEN)
+    with running_server(build_app({"x": platform})) as base_url:
+        platform.base_url = f"{base_url}/x"
+        yield platform
+
+
+def _post(**fields):
+    defaults = dict(content="Hello", content_type="text", image_url=None, video_url=None)
+    return SimpleNamespace(**{**defaults, **fields})
+
+
+def test_publish_uploads_media_in_chunks(fake, tmp_path):
+    storage = LocalStorage(root=str(tmp_path), url_prefix="/static/uploads/")
+    (tmp_path / "clip.mp4").write_bytes(b"v" * 10_000)
+    client = PlatformClient("x", fake.base_url, token=TOKEN, chunk_size=4096, storage=storage)
+    try:
+        post_id = client.publish(_post(content_type="video", video_url=storage.url("clip.mp4")))
+    finally:
+        client.close()
+
+    assert post_id == "1"
+    [media_id] = fake.posts[0]["media_ids"]
+    upload = fake.media[media_id]
+    assert upload["media_type"] == "video/mp4"
+    assert upload["size"] == 10_000
+    assert sorted(upload["segments"]) == [0, 1, 2]
+
+
+def test_rate_limit_raises_with_retry_after(fake):
+    fake.faults = PlatformFaults(rate_limit=1)
+    client = PlatformClient("x", fake.base_url, token=TOKEN)
+    try:
+        client.publish(_post())
+        with pytest.raises(PlatformError) as excinfo:
+            client.publish(_post())
+    finally:
+        client.close()
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after == 1
+    assert fake.rate_limited == 1
+
+
+def test_rejected_token(fake):
+    client = PlatformClient("x", fake.base_url, token="wrong")
+    try:
+        with pytest.raises(PlatformError) as excinfo:
+            client.publish(_post())
+    finally:
+        client.close()
+    assert excinfo.value.status_code == 401
+    assert fake.posts == []
+
+
+def test_handler_uses_shared_client_when_configured(fake, monkeypatch):
+    monkeypatch.setattr(settings, "SOCIAL_PLATFORM_BASE_URLS", {"x": fake.base_url})
+    monkeypatch.setattr(settings, "X_API_TOKEN", TOKEN)
+    try:
+        social_scheduler.post_to_x(_post(content="One"))
+        social_scheduler.post_to_x(_post(content="Two"))
+        client = social_platforms.get_platform_client("x")
+        assert social_platforms.get_platform_client("x") is client
+    finally:
+        social_platforms.close_platform_clients()
+
+    assert client.is_closed
+    assert [post["text"] for post in fake.posts] == ["One", "Two"]
+
+
+def test_unconfigured_platform_has_no_client(monkeypatch):
+    monkeypatch.setattr(settings, "SOCIAL_PLATFORM_BASE_URLS", {})
+    assert social_platforms.get_platform_client("facebook") is None
+    social_scheduler.post_to_facebook(_post())  # simulated, does not raise
+
+
+def test_dispatch_benchmark_runs_lanes_concurrently():
+    platforms = {name: FakePlatform(name, faults=PlatformFaults(latency=0.05)) for name in ("x", "facebook")}
+    with running_server(build_app(platforms)) as base_url:
+        report = run_dispatch(
+            {name: f"{base_url}/{name}" for name in platforms},
+            make_posts(12, ("x", "facebook")),
+            concurrency={"x": 3, "facebook": 3},
+        )
+
+    assert report.outcomes == {"posted": 12}
+    assert all(len(platform.posts) == 6 for platform in platforms.values())
+    assert all(platform.max_in_flight == 3 for platform in platforms.values())
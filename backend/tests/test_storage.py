@@ -0,0 +1,67 @@
+import os
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from backend.services.storage import LocalStorage, S3Storage, StorageBackend, media_url
+
+
+def write_temp(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.fixture
+def s3_storage():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="media")
+        yield S3Storage("media", prefix="uploads/", client=client)
+
+
+def test_s3_storage_saves_deduplicates_and_deletes(s3_storage, tmp_path):
+    assert s3_storage.save_file(write_temp(tmp_path, "a", b"image"), "abc.png", "image/png") is False
+    assert s3_storage.save_file(write_temp(tmp_path, "b", b"image"), "abc.png", "image/png") is True
+    assert os.listdir(tmp_path) == []
+
+    assert s3_storage.exists("abc.png")
+    assert [key for key, _ in s3_storage.list_keys()] == ["abc.png"]
+    assert s3_storage.open("abc.png").read() == b"image"
+    assert s3_storage.url("abc.png") == "/media/files/abc.png"
+    assert "uploads/abc.png" in s3_storage.download_url("abc.png")
+
+    assert s3_storage.delete("abc.png") == len(b"image")
+    assert not s3_storage.exists("abc.png")
+    assert s3_storage.delete("abc.png") == 0
+
+
+def test_s3_storage_uses_public_base_url(s3_storage):
+    s3_storage.public_base_url = "https://cdn.example.com"
+    assert s3_storage.download_url("abc.png") == "https://cdn.example.com/uploads/abc.png"
+
+
+def test_local_storage_rejects_path_traversal(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    with pytest.raises(ValueError):
+        storage.local_path("../main.py")
+    assert storage.save_file(write_temp(tmp_path, ".upload-x", b"data"), "abc.png") is False
+    assert list(storage.list_keys())[0][0] == "abc.png"
+    with storage.open("abc.png") as fh:
+        assert fh.read() == b"data"
+
+
+def test_media_url_routes_local_uploads_through_media_files():
+    assert media_url("/static/uploads/abc.mp4") == "/media/files/abc.mp4"
+    assert media_url("https://youtu.be/xyz") == "https://youtu.be/xyz"
+    assert media_url(None) is None
+
+
+def test_incomplete_driver_fails_on_construction():
+    class NoListing(StorageBackend):
+        def save_file(self, local_path, key, content_type=None):
+            return False
+
+    with pytest.raises(TypeError, match="list_keys"):
+        NoListing()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+Image = pytest.importorskip("PIL.Image")
+
+from backend.routers import media
+from backend.services import image_processing, thumbnails
+from backend.services.thumbnails import ThumbnailCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "course.png"
+    Image.new("RGB", (800, 600), "blue").save(path)
+    return str(path)
+
+
+async def test_concurrent_misses_are_coalesced(tmp_path, source, monkeypatch):
+    calls = []
+    original = thumbnails.render_thumbnail
+
+    def counting_render(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(thumbnails, "render_thumbnail", counting_render)
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024)
+
+    paths = await asyncio.gather(*(cache.get(source, 200, 150) for _ in range(5)))
+
+    assert len(set(paths)) == 1
+    assert len(calls) == 1
+    with Image.open(paths[0]) as thumb:
+        assert thumb.size == (200, 150)
+
+    await cache.get(source, 200, 150)
+    assert cache.hits == 1
+
+
+async def test_lru_eviction_keeps_cache_bounded(tmp_path, source):
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=1)
+
+    first = await cache.get(source, 100, 100)
+    second = await cache.get(source, 120, 120)
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    assert cache.evictions == 1
+
+
+def test_thumbnail_url_only_rewrites_static_images():
+    assert thumbnails.thumbnail_url("/static/uploads/a.jpg", 80, 80) == "/media/thumb/80x80/uploads/a.jpg"
+    assert thumbnails.thumbnail_url("https://example.com/a.jpg", 80, 80) == "https://example.com/a.jpg"
+    assert thumbnails.thumbnail_url(None, 80) is None
+
+
+async def test_thumbnail_urls_pin_the_source_version(tmp_path, monkeypatch):
+    static_root = tmp_path / "static"
+    (static_root / "images").mkdir(parents=True)
+    image = static_root / "images" / "course.png"
+    Image.new("RGB", (400, 300), "blue").save(image)
+    monkeypatch.setattr(image_processing, "STATIC_ROOT", str(static_root))
+    monkeypatch.setattr(thumbnails, "_cache", ThumbnailCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024))
+    app = FastAPI()
+    app.include_router(media.router)
+
+    old_url = thumbnails.thumbnail_url("/static/images/course.png", 80, 80)
+    assert old_url.startswith("/media/thumb/80x80/images/course.png?v=")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app.test") as client:
+        pinned = await client.get(old_url)
+        assert pinned.headers["cache-control"] == media.LONG_LIVED_CACHE
+
+        Image.new("RGB", (400, 300), "red").save(image)
+        os.utime(image, ns=(0, os.stat(image).st_mtime_ns + 10**9))
+        new_url = thumbnails.thumbnail_url("/static/images/course.png", 80, 80)
+        assert new_url != old_url
+
+        stale = await client.get(old_url)
+        assert stale.headers["cache-control"] == media.REVALIDATE_CACHE
+        assert stale.headers["etag"] != pinned.headers["etag"]
+        assert (await client.get(new_url)).headers["cache-control"] == media.LONG_LIVED_CACHE
+        unpinned = await client.get("/media/thumb/80x80/images/course.png")
+        assert unpinned.headers["cache-control"] == media.REVALIDATE_CACHE
+        revalidated = await client.get(
+            "/media/thumb/80x80/images/course.png", headers={"If-None-Match": unpinned.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.ttl_entry import TTLEntry
+from backend.services.ttl_store import DatabaseTTLStore, MemoryTTLStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_store_expires_entries():
+    clock = FakeClock()
+    store = MemoryTTLStore("test", default_ttl=10, clock=clock)
+    store.set("a", {"order_id": 1})
+    store.set("b", 2, ttl=60)
+    assert store.get("a") == {"order_id": 1}
+
+    clock.now += 11
+    assert store.get("a") is None
+    assert store.get("b") == 2
+    assert len(store) == 1
+
+
+def test_memory_store_pop_is_one_time():
+    store = MemoryTTLStore("test", default_ttl=10)
+    store.set("token", {"amount": 50.0})
+    assert store.pop("token") == {"amount": 50.0}
+    assert store.pop("token") is None
+    assert store.total_bytes == 0
+
+
+def test_memory_store_pop_has_one_winner_under_contention():
+    store = MemoryTTLStore("test", default_ttl=10)
+    store.set("token", "payload")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: store.pop("token"), range(32)))
+    assert results.count("payload") == 1
+
+
+def test_memory_store_bounds_entries_and_bytes():
+    clock = FakeClock()
+    store = MemoryTTLStore("test", default_ttl=10, max_entries=3, max_bytes=40, clock=clock)
+    store.set("expired", "x", ttl=1)
+    clock.now += 2
+    for key in ("a", "b", "c"):
+        store.set(key, "0123456789")  # 12 bytes encoded
+    # The expired entry is dropped before any live one.
+    assert store.get("a") == "0123456789"
+    assert len(store) == 3
+
+    store.set("d", "0123456789")
+    assert store.get("a") is None  # oldest evicted
+    assert len(store) == 3
+    assert store.total_bytes == 36
+
+    with pytest.raises(ValueError):
+        store.set("huge", "x" * 100)
+
+
+def test_database_store_round_trip_and_overwrite(session_factory):
+    store = DatabaseTTLStore("payments", default_ttl=60, session_factory=session_factory)
+    store.set("token", {"order_id": 1})
+    store.set("token", {"order_id": 2})
+    assert store.get("token") == {"order_id": 2}
+
+    other = DatabaseTTLStore("other", default_ttl=60, session_factory=session_factory)
+    assert other.get("token") is None
+
+    assert store.pop("token") == {"order_id": 2}
+    assert store.pop("token") is None
+
+
+def test_database_store_ignores_and_purges_expired_rows(session_factory):
+    store = DatabaseTTLStore("payments", default_ttl=60, session_factory=session_factory)
+    db = session_factory()
+    db.add(TTLEntry(namespace="payments", key="old", value="1",
+                    expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    db.close()
+
+    assert store.get("old") is None
+    assert store.pop("old") is None
+    store.set("fresh", 1)
+    assert store.purge_expired() == 0  # set() already purged the expired row
+    db = session_factory()
+    assert [row.key for row in db.query(TTLEntry).all()] == ["fresh"]
+    db.close()
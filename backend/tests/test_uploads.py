@@ -0,0 +1,46 @@
+import hashlib
+import io
+import os
+import pytest
+
+from fastapi import HTTPException, UploadFile
+
+from backend.services import uploads
+from backend.services.storage import LocalStorage
+
+
+def make_upload(data: bytes, filename: str = "photo.JPG") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+async def test_save_upload_streams_and_hashes(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 4)
+    data = b"0123456789" * 3
+
+    storage = LocalStorage(str(tmp_path))
+    stored = await uploads.save_upload(make_upload(data), "image", storage)
+
+    assert stored.key.endswith(".jpg")
+    assert stored.url == f"/static/uploads/{stored.key}"
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    with open(storage.local_path(stored.key), "rb") as fh:
+        assert fh.read() == data
+    assert os.listdir(tmp_path) == [stored.key]
+
+
+async def test_save_upload_rejects_oversized_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 4)
+    monkeypatch.setattr(uploads, "upload_limits", lambda: {"image": 10, "video": 10})
+
+    with pytest.raises(HTTPException) as exc:
+        await uploads.save_upload(make_upload(b"x" * 11), "image", LocalStorage(str(tmp_path)))
+
+    assert exc.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_safe_extension_drops_suspicious_suffixes():
+    assert uploads.safe_extension("clip.MP4") == ".mp4"
+    assert uploads.safe_extension("../../evil.py;rm -rf") == ""
+    assert uploads.safe_extension(None) == ""
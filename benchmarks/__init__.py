@@ -0,0 +1 @@
+"""Load and performance scenarios; run them as ``python -m benchmarks.<name>``."""
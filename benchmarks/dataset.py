@@ -0,0 +1,195 @@
+"""
+Benchmark Dataset
+
+Seeds a scratch database with a deterministic, sized dataset so page and API
+latencies are measured against realistic row counts instead of an empty
+schema: courses, customers with orders, registrations and payments,
+testimonials and social posts, plus one admin account for the admin pages.
+
+The same size and seed always produce the same rows, so results from two runs
+(or two commits) are comparable. ``seed_dataset`` returns a manifest (row
+counts, course IDs, search terms, the admin login) that the suite in
+``benchmarks.suite`` uses to build its scenarios.
+
+Sizes (``SIZES``; each order registers for one to three courses):
+    tiny    -  12 courses,     30 customers,     40 orders (tests)
+    small   -  50 courses,    500 customers,  1 000 orders
+    medium  - 200 courses,  5 000 customers, 10 000 orders
+    large   - 500 courses, 20 000 customers, 50 000 orders
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from passlib.hash import bcrypt
+from sqlalchemy.orm import Session
+
+from backend.models.course import Course
+from backend.models.order import Order
+from backend.models.payment import Payment
+from backend.models.registration import Registration
+from backend.models.social_post import SocialMediaPost
+from backend.models.testimonial import Testimonial
+from backend.models.user import User
+
+ADMIN_EMAIL = "bench-admin@example.test"
+ADMIN_PASSWORD = "bench-admin-pass"
+CUSTOMER_PASSWORD = "bench-customer-pass"
+
+# Course titles are built from these, so every search term matches a share of the catalogue.
+SUBJECTS = ("Robotics", "Python", "Scratch", "Game Design", "Web Development", "Electronics", "AI", "3D Printing")
+LEVELS = ("Intro to", "Hands-on", "Advanced", "Weekend", "Holiday Camp:")
+CATEGORIES = ("Coding", "Robotics", "Design", "Science")
+AGE_GROUPS = ("5-7", "8-12", "13-17", "Adults")
+SEARCH_TERMS = ("robot", "python", "game", "camp")
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    courses: int
+    customers: int
+    orders: int
+    testimonials: int
+    social_posts: int
+
+
+SIZES = {
+    "tiny": DatasetSize(courses=12, customers=30, orders=40, testimonials=10, social_posts=10),
+    "small": DatasetSize(courses=50, customers=500, orders=1000, testimonials=50, social_posts=100),
+    "medium": DatasetSize(courses=200, customers=5000, orders=10000, testimonials=200, social_posts=500),
+    "large": DatasetSize(courses=500, customers=20000, orders=50000, testimonials=500, social_posts=2000),
+}
+
+
+def _insert(db: Session, rows: List) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.add_all(rows[start:start + BATCH_SIZE])
+        db.flush()
+
+
+def seed_dataset(session_factory: Callable[[], Session], size: DatasetSize, seed: int = 1) -> Dict:
+    """Insert a dataset of ``size`` into an empty database; returns its manifest."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db = session_factory()
+    try:
+        if db.query(User).filter(User.email == ADMIN_EMAIL).first() is not None:
+            raise RuntimeError("The database already holds a benchmark dataset; seed a scratch database.")
+
+        # Hashing is deliberately slow, so every customer shares one hash.
+        customer_hash = bcrypt.hash(CUSTOMER_PASSWORD)
+        admin = User(email=ADMIN_EMAIL, password_hash=bcrypt.hash(ADMIN_PASSWORD), role="admin",
+                     is_active=True, is_verified=True)
+        db.add(admin)
+
+        courses = [
+            Course(
+                title=f"{rng.choice(LEVELS)} {rng.choice(SUBJECTS)} {i}",
+                summary="A benchmark course.",
+                description="Learn by building projects. " * 20,
+                price=round(rng.uniform(50, 500), 2),
+                category=rng.choice(CATEGORIES),
+                age_group=rng.choice(AGE_GROUPS),
+                duration=rng.choice(("4 weeks", "6 weeks", "8 weeks", "12 weeks")),
+                rating=round(rng.uniform(3.0, 5.0), 1),
+            )
+            for i in range(1, size.courses + 1)
+        ]
+        _insert(db, courses)
+
+        customers = [
+            User(
+                email=f"customer{i}@example.test",
+                password_hash=customer_hash,
+                role="student",
+                is_verified=True,
+                created_at=now - timedelta(days=rng.randint(0, 720)),
+            )
+            for i in range(1, size.customers + 1)
+        ]
+        _insert(db, customers)
+
+        orders = []
+        for _ in range(size.orders):
+            # A few heavy customers, like real repeat buyers.
+            customer = customers[min(int(rng.paretovariate(1.2)) - 1, len(customers) - 1)] \
+                if rng.random() < 0.2 else rng.choice(customers)
+            orders.append(Order(user_id=customer.id, status="pending",
+                                created_at=now - timedelta(days=rng.randint(0, 365))))
+        _insert(db, orders)
+
+        registrations, payments = [], []
+        for order in orders:
+            picked = rng.sample(courses, k=min(len(courses), rng.randint(1, 3)))
+            order.total_amount = round(sum(course.price for course in picked), 2)
+            for course in picked:
+                registrations.append(Registration(
+                    fullName=f"Student {order.user_id}",
+                    phone=f"080{rng.randint(10_000_000, 99_999_999)}",
+                    course_id=course.id,
+                    user_id=order.user_id,
+                    order_id=order.id,
+                    registered_at=order.created_at,
+                    status="confirmed",
+                    is_verified="verified",
+                ))
+            if rng.random() < 0.7:
+                status = rng.choices(("completed", "pending", "failed"), weights=(80, 15, 5))[0]
+                if status == "completed":
+                    order.status = "paid"
+                payments.append(Payment(order_id=order.id, transaction_id=f"bench-{order.id}",
+                                        amount=order.total_amount, status=status, payment_date=order.created_at))
+        _insert(db, registrations)
+        _insert(db, payments)
+
+        _insert(db, [
+            Testimonial(name=f"Parent {i}", content="My child loved it. " * 5, is_approved=rng.random() < 0.5)
+            for i in range(1, size.testimonials + 1)
+        ])
+        # Nothing is ever due: the app's scheduler must not publish (and so
+        # change) the dataset while it is being measured. Drafts are scheduled
+        # a year ahead, published and failed posts in the past.
+        social_posts = []
+        for i in range(1, size.social_posts + 1):
+            status = rng.choice(("draft", "posted", "failed"))
+            offset = timedelta(days=365, hours=i) if status == "draft" else -timedelta(hours=i)
+            social_posts.append(SocialMediaPost(
+                platform=rng.choice(("facebook", "x", "instagram")),
+                content=f"Benchmark post {i}",
+                content_type="text",
+                status=status,
+                scheduled_at=now + offset,
+            ))
+        _insert(db, social_posts)
+        db.commit()
+
+        # The customer with the most registrations makes the customer-courses page heaviest.
+        counts: Dict[int, int] = {}
+        for registration in registrations:
+            counts[registration.user_id] = counts.get(registration.user_id, 0) + 1
+        return {
+            "size": asdict(size),
+            "seed": seed,
+            "counts": {
+                "courses": len(courses),
+                "users": len(customers) + 1,  # customers and the admin
+                "orders": len(orders),
+                "registrations": len(registrations),
+                "payments": len(payments),
+                "testimonials": size.testimonials,
+                "social_posts": size.social_posts,
+            },
+            "course_ids": [course.id for course in courses],
+            "heavy_customer_id": max(counts, key=counts.get),
+            "search_terms": list(SEARCH_TERMS),
+            "admin_email": ADMIN_EMAIL,
+            "admin_password": ADMIN_PASSWORD,
+        }
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,199 @@
+"""
+Checkout Load Test
+
+Drives the public checkout flow the way a browser does, at a fixed arrival rate:
+
+1. POST /api/registrations/public-register   (creates user, order and registrations)
+2. POST /api/paystack/init     (creates the pending Payment, calls Paystack)
+3. GET  /api/paystack/verify   (the redirect back from checkout)
+
+Arrivals are open-loop: a new checkout starts every 1/RPS seconds whether or not
+earlier ones finished, so a slow server shows up as growing latency instead of
+a quietly lower request rate. Latency percentiles (p50/p95/p99) and error counts
+are reported per step.
+
+Point the app at the fake Paystack (backend/testing/fake_paystack.py) so no real
+API is called:
+
+    python -m backend.testing.fake_paystack --port 8010 \\
+        --latency 0.15 --latency-jitter 0.1 \\
+        --webhook-url http://localhost:8002/api/paystack/webhook
+    PAYSTACK_BASE_URL=http://localhost:8010 uvicorn main:app --port 8002
+    python -m benchmarks.payment_flow --base-url http://localhost:8002 \\
+        --rps 20 --duration 60 --course-ids 1,2
+
+Every checkout registers a new user, so run it against a scratch database.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+STEPS = ("register", "init", "verify")
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 when empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class StepStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, elapsed: float, error: Optional[str] = None) -> None:
+        self.latencies.append(elapsed)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.errors),
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 1),
+        }
+
+
+@dataclass
+class FlowReport:
+    target_rps: float
+    duration: float
+    started: int = 0
+    completed: int = 0
+    elapsed: float = 0.0
+    steps: Dict[str, StepStats] = field(default_factory=lambda: {step: StepStats() for step in STEPS})
+
+    def summary(self) -> dict:
+        return {
+            "target_rps": self.target_rps,
+            "achieved_rps": round(self.completed / self.elapsed, 2) if self.elapsed else 0.0,
+            "started": self.started,
+            "completed": self.completed,
+            "steps": {step: stats.summary() for step, stats in self.steps.items()},
+        }
+
+
+async def _step(report: FlowReport, step: str, send) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await send()
+    except httpx.HTTPError as exc:
+        report.steps[step].record(time.perf_counter() - start, type(exc).__name__)
+        return None
+    elapsed = time.perf_counter() - start
+    ok = response.status_code < 300 or (step == "verify" and response.status_code in (302, 303, 307))
+    report.steps[step].record(elapsed, None if ok else str(response.status_code))
+    return response if ok else None
+
+
+async def checkout(client: httpx.AsyncClient, report: FlowReport, course_ids: Sequence[int]) -> None:
+    """One user going through register -> init -> verify."""
+    report.started += 1
+    email = f"load-{uuid.uuid4().hex[:12]}@example.test"
+    # Idempotency keys, as a client that may retry would send them.
+    registered = await _step(report, "register", lambda: client.post(
+        "/api/registrations/public-register",
+        headers={"Idempotency-Key": f"register-{email}"},
+        json={
+            "fullName": "Load Test",
+            "email": email,
+            "password": "load-test-pass",
+            "confirm_password": "load-test-pass",
+            "phone": "0000000000",
+            "course_ids": list(course_ids),
+        },
+    ))
+    if registered is None:
+        return
+    order_id = registered.json()["order_id"]
+
+    initialized = await _step(report, "init", lambda: client.post(
+        "/api/paystack/init",
+        headers={"Idempotency-Key": f"init-{order_id}"},
+        json={"order_id": order_id, "email": email},
+    ))
+    if initialized is None:
+        return
+    reference = initialized.json()["reference"]
+
+    verified = await _step(report, "verify", lambda: client.get(
+        "/api/paystack/verify", params={"reference": reference}))
+    if verified is not None:
+        report.completed += 1
+
+
+async def run_payment_flow(
+    client: httpx.AsyncClient,
+    rps: float,
+    duration: float,
+    course_ids: Sequence[int],
+) -> FlowReport:
+    """Start ``rps`` checkouts per second for ``duration`` seconds and wait for all of them."""
+    report = FlowReport(target_rps=rps, duration=duration)
+    total = max(1, int(rps * duration))
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    tasks = []
+    for i in range(total):
+        delay = begin + i / rps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(checkout(client, report, course_ids)))
+    await asyncio.gather(*tasks)
+    report.elapsed = loop.time() - begin
+    return report
+
+
+def format_report(report: FlowReport) -> str:
+    summary = report.summary()
+    lines = [
+        f"target {summary['target_rps']} rps, achieved {summary['achieved_rps']} rps "
+        f"({summary['completed']}/{summary['started']} checkouts completed)",
+        f"{'step':<10}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for step, stats in summary["steps"].items():
+        lines.append(
+            f"{step:<10}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test register -> paystack/init -> paystack/verify.")
+    parser.add_argument("--base-url", default="http://localhost:8002")
+    parser.add_argument("--rps", type=float, default=10.0, help="Checkouts started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting checkouts")
+    parser.add_argument("--course-ids", default="1", help="Comma-separated course IDs to register for")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    course_ids = [int(c) for c in args.course_ids.split(",") if c.strip()]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async def run() -> FlowReport:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            return await run_payment_flow(client, args.rps, args.duration, course_ids)
+
+    report = asyncio.run(run())
+    print(json.dumps(report.summary(), indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Social Dispatch Throughput
+
+Publishes a batch of synthetic posts through ``PostDispatcher`` and the pooled
+``PlatformClient``s, against the fake platform APIs
+(backend/testing/fake_platform.py), and reports posts per second, outcomes and
+per-platform latency. No database or real platform is involved, so the effect
+of concurrency, rate limits and platform latency can be measured offline:
+
+    python -m benchmarks.social_dispatch --posts 200 --latency 0.2 \\
+        --concurrency '{"facebook": 4, "x": 4, "instagram": 2}' \\
+        --rate-limits '{"x": 5}'
+
+The fake runs in-process unless --base-url points at one started with
+``python -m backend.testing.fake_platform``.
+"""
+
+import argparse
+import contextlib
+import json
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from backend.services.post_dispatcher import PostDispatcher
+from backend.services.social_platforms import PlatformClient
+from backend.testing.fake_platform import PLATFORMS, FakePlatform, PlatformFaults, build_app, running_server
+from benchmarks.payment_flow import percentile
+
+
+@dataclass
+class DispatchReport:
+    posts: int
+    elapsed: float = 0.0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        return {
+            "posts": self.posts,
+            "elapsed_s": round(self.elapsed, 3),
+            "posts_per_second": round(self.posts / self.elapsed, 2) if self.elapsed else 0.0,
+            "outcomes": dict(self.outcomes),
+            "platforms": {
+                platform: {
+                    "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                }
+                for platform, samples in self.latencies.items()
+            },
+        }
+
+
+def make_posts(count: int, platforms: Sequence[str] = PLATFORMS) -> List[SimpleNamespace]:
+    """Text posts spread round-robin over ``platforms``."""
+    return [
+        SimpleNamespace(
+            id=i,
+            platform=platforms[i % len(platforms)],
+            content=f"Benchmark post {i}",
+            content_type="text",
+            image_url=None,
+            video_url=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def run_dispatch(
+    base_urls: Mapping[str, str],
+    posts: Sequence[SimpleNamespace],
+    concurrency: Optional[Mapping[str, int]] = None,
+    rate_limits: Optional[Mapping[str, float]] = None,
+    timeout: float = 30.0,
+) -> DispatchReport:
+    """Dispatch ``posts`` with one pooled client per platform in ``base_urls``."""
+    clients = {name: PlatformClient(name, url) for name, url in base_urls.items()}
+    try:
+        handlers = {name: client.publish for name, client in clients.items()}
+        dispatcher = PostDispatcher(handlers, concurrency=concurrency, rate_limits=rate_limits, timeout=timeout)
+        start = time.perf_counter()
+        results = dispatcher.dispatch(posts)
+        report = DispatchReport(posts=len(posts), elapsed=time.perf_counter() - start)
+    finally:
+        for client in clients.values():
+            client.close()
+    for result in results.values():
+        report.outcomes[result.outcome] = report.outcomes.get(result.outcome, 0) + 1
+        report.latencies.setdefault(result.platform, []).append(result.seconds)
+    return report
+
+
+def format_report(report: DispatchReport) -> str:
+    summary = report.summary()
+    lines = [
+        f"{summary['posts']} posts in {summary['elapsed_s']}s: {summary['posts_per_second']} posts/s",
+        "outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(summary["outcomes"].items())),
+        f"{'platform':<12}{'p50 ms':>10}{'p95 ms':>10}",
+    ]
+    for platform, stats in summary["platforms"].items():
+        lines.append(f"{platform:<12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure social post dispatch throughput against fake platforms.")
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--base-url", help="External fake_platform server; started in-process when omitted")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument("--platform-rate-limit", type=float, default=0.0, help="Fake API requests/second (0: unlimited)")
+    parser.add_argument("--concurrency", type=json.loads, default=None, help="JSON handlers in flight per platform")
+    parser.add_argument("--rate-limits", type=json.loads, default=None, help="JSON posts per second per platform")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    faults = PlatformFaults(latency=args.latency, latency_jitter=args.latency_jitter, rate_limit=args.platform_rate_limit)
+    with contextlib.ExitStack() as stack:
+        base_url = args.base_url or stack.enter_context(
+            running_server(build_app({name: FakePlatform(name, faults=faults) for name in PLATFORMS})))
+        report = run_dispatch(
+            {name: f"{base_url.rstrip('/')}/{name}" for name in PLATFORMS},
+            make_posts(args.posts),
+            concurrency=args.concurrency,
+            rate_limits=args.rate_limits,
+        )
+    print(json.dumps(report.summary(), indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
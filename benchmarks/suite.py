@@ -0,0 +1,365 @@
+"""
+Page and API Benchmark Suite
+
+Measures throughput and latency of the hot paths against a seeded dataset
+(benchmarks/dataset.py), stores the results as JSON and compares them with a
+baseline, so regressions are caught before deploy:
+
+- Public pages: ``/``, ``/registration`` and ``/courses/{id}`` (rotating over
+  the catalogue), and ``/api/courses/?search=...`` over several terms.
+- Admin pages, logged in as the seeded admin. The paginated ones (courses,
+  registrations, payments, customers) are requested at the first, middle and
+  last page, since OFFSET cost grows with depth.
+- The register-and-pay flow from ``benchmarks.payment_flow`` (optional; point
+  the app at the fake Paystack first).
+
+Each page scenario sends a fixed number of requests from ``--concurrency``
+concurrent clients (closed loop) after a short warmup, and reports requests
+per second and p50/p95/p99 latency. ``compare`` flags a scenario when its p95
+latency grows, its throughput drops or its error rate rises beyond the
+thresholds; per-scenario thresholds can be given as shell patterns in a JSON
+file: ``{"default": {"p95_pct": 25}, "scenarios": {"GET /api/*": {"p95_pct": 10}}}``.
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.suite seed --size medium \\
+        --create-tables --manifest bench-dataset.json
+    DATABASE_URL=sqlite:///bench.db uvicorn main:app --port 8002 --workers 4
+    python -m benchmarks.suite run --base-url http://localhost:8002 \\
+        --manifest bench-dataset.json --out results.json --baseline baseline.json
+    python -m benchmarks.suite compare baseline.json results.json
+
+``run`` and ``compare`` exit with status 1 when a scenario regressed.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import itertools
+import json
+import math
+import sys
+import time
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.dataset import SIZES, seed_dataset
+from benchmarks.payment_flow import STEPS, StepStats, run_payment_flow
+
+PAGE_LIMIT = 10  # the admin pages' default page size
+PAGINATED_ADMIN_PAGES = {
+    "/admin/manage-courses": "courses",
+    "/admin/manage-registrations": "registrations",
+    "/admin/manage-payments": "payments",
+    "/admin/manage-customers": "users",
+}
+ADMIN_PAGES = ("/admin/dashboard", "/admin/manage-testimonials", "/admin/social-media")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    urls: Tuple[str, ...]  # requested in rotation
+    admin: bool = False
+
+
+@dataclass
+class ScenarioResult:
+    stats: StepStats = field(default_factory=StepStats)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        requests = len(self.stats.latencies)
+        return {
+            "rps": round(requests / self.elapsed, 2) if self.elapsed else 0.0,
+            **self.stats.summary(),
+        }
+
+
+def page_depths(total: int, limit: int = PAGE_LIMIT) -> List[int]:
+    """The first, middle and last page of a ``total``-row listing."""
+    pages = max(1, math.ceil(total / limit))
+    return sorted({1, (pages + 1) // 2, pages})
+
+
+def build_scenarios(manifest: Mapping) -> List[Scenario]:
+    counts = manifest["counts"]
+    course_ids = manifest["course_ids"]
+    scenarios = [
+        Scenario("GET /", ("/",)),
+        Scenario("GET /registration", ("/registration",)),
+        Scenario("GET /courses/{id}", tuple(f"/courses/{course_id}" for course_id in course_ids)),
+        Scenario("GET /api/courses?search", tuple(
+            f"/api/courses/?search={term}" for term in manifest["search_terms"])),
+    ]
+    scenarios += [Scenario(f"GET {path}", (path,), admin=True) for path in ADMIN_PAGES]
+    for path, table in PAGINATED_ADMIN_PAGES.items():
+        scenarios += [
+            Scenario(f"GET {path}?page={page}", (f"{path}?page={page}&limit={PAGE_LIMIT}",), admin=True)
+            for page in page_depths(counts[table])
+        ]
+    customer_id = manifest["heavy_customer_id"]
+    scenarios.append(Scenario("GET /admin/customer-courses/{id}", (f"/admin/customer-courses/{customer_id}",), admin=True))
+    return scenarios
+
+
+async def admin_login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Log in through the API; returns the ``access_token`` cookie."""
+    response = await client.post("/api/auth/login", json={"username": email, "password": password})
+    response.raise_for_status()
+    token = response.cookies["access_token"]
+    client.cookies.clear()  # public pages are measured anonymously
+    return token
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    headers: Optional[Mapping[str, str]] = None,
+) -> ScenarioResult:
+    """Send ``requests`` requests from ``concurrency`` concurrent clients; anything but 200 is an error."""
+    result = ScenarioResult()
+    for i in range(warmup):
+        await client.get(scenario.urls[i % len(scenario.urls)], headers=headers)
+    counter = itertools.count()
+
+    async def worker() -> None:
+        while (i := next(counter)) < requests:
+            start = time.perf_counter()
+            try:
+                response = await client.get(scenario.urls[i % len(scenario.urls)], headers=headers)
+            except httpx.HTTPError as exc:
+                result.stats.record(time.perf_counter() - start, type(exc).__name__)
+                continue
+            error = None if response.status_code == 200 else str(response.status_code)
+            result.stats.record(time.perf_counter() - start, error)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - begin
+    return result
+
+
+async def run_suite(
+    client: httpx.AsyncClient,
+    manifest: Mapping,
+    requests: int = 200,
+    concurrency: int = 8,
+    warmup: int = 5,
+    checkout_rps: float = 0.0,
+    checkout_duration: float = 10.0,
+) -> dict:
+    """Run every scenario in turn; returns the results document written by ``run``."""
+    token = await admin_login(client, manifest["admin_email"], manifest["admin_password"])
+    admin_headers = {"Cookie": f"access_token={token}"}
+    results = {}
+    for scenario in build_scenarios(manifest):
+        result = await run_scenario(client, scenario, requests, concurrency, warmup,
+                                    headers=admin_headers if scenario.admin else None)
+        results[scenario.name] = result.summary()
+
+    if checkout_rps > 0:
+        report = await run_payment_flow(client, checkout_rps, checkout_duration, manifest["course_ids"][:2])
+        achieved = report.summary()["achieved_rps"]
+        for step in STEPS:
+            results[f"checkout {step}"] = {"rps": achieved, **report.steps[step].summary()}
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "target": str(client.base_url),
+            "dataset": manifest["counts"],
+            "requests": requests,
+            "concurrency": concurrency,
+            "checkout_rps": checkout_rps,
+        },
+        "scenarios": results,
+    }
+
+
+# Comparison ------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Thresholds:
+    p95_pct: float = 25.0    # allowed p95 latency growth, in percent
+    min_ms: float = 5.0      # ... ignored below this many milliseconds (timer noise)
+    rps_pct: float = 20.0    # allowed throughput drop, in percent
+    error_rate: float = 0.0  # allowed error rate growth (fraction of requests)
+
+
+@dataclass(frozen=True)
+class Regression:
+    scenario: str
+    metric: str
+    baseline: object
+    current: object
+    detail: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.scenario}: {self.metric} {self.baseline} -> {self.current}" + (f" ({self.detail})" if self.detail else "")
+
+
+def load_thresholds(path: Optional[str], default: Thresholds) -> Tuple[Thresholds, Dict[str, Thresholds]]:
+    """Read a thresholds file; ``default`` fills whatever it does not set."""
+    if not path:
+        return default, {}
+    with open(path) as fh:
+        config = json.load(fh)
+    default = replace(default, **config.get("default", {}))
+    return default, {pattern: replace(default, **values) for pattern, values in config.get("scenarios", {}).items()}
+
+
+def _error_rate(summary: Mapping) -> float:
+    return summary["errors"] / summary["requests"] if summary["requests"] else 0.0
+
+
+def compare(
+    baseline: Mapping,
+    current: Mapping,
+    thresholds: Thresholds = Thresholds(),
+    overrides: Optional[Mapping[str, Thresholds]] = None,
+) -> List[Regression]:
+    """Scenarios of ``current`` that regressed against ``baseline``; scenarios new in ``current`` are ignored."""
+    regressions = []
+    if baseline["meta"]["dataset"] != current["meta"]["dataset"]:
+        regressions.append(Regression("suite", "dataset", baseline["meta"]["dataset"], current["meta"]["dataset"],
+                                      "results of different datasets are not comparable"))
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            regressions.append(Regression(name, "scenario", "present", "missing"))
+            continue
+        limits = next((t for pattern, t in (overrides or {}).items() if fnmatch.fnmatchcase(name, pattern)), thresholds)
+
+        p95_limit = max(base["p95_ms"] * (1 + limits.p95_pct / 100), base["p95_ms"] + limits.min_ms)
+        if now["p95_ms"] > p95_limit:
+            regressions.append(Regression(name, "p95_ms", base["p95_ms"], now["p95_ms"], f"limit {p95_limit:.1f}"))
+        rps_limit = base["rps"] * (1 - limits.rps_pct / 100)
+        if now["rps"] < rps_limit:
+            regressions.append(Regression(name, "rps", base["rps"], now["rps"], f"limit {rps_limit:.1f}"))
+        if _error_rate(now) > _error_rate(base) + limits.error_rate:
+            regressions.append(Regression(name, "errors", base["errors"], now["errors"],
+                                          f"of {now['requests']} requests"))
+    return regressions
+
+
+def format_results(results: Mapping) -> str:
+    lines = [f"{'scenario':<48}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+    for name, stats in results["scenarios"].items():
+        lines.append(
+            f"{name:<48}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>9}"
+            f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def _report_regressions(regressions: Sequence[Regression]) -> int:
+    if not regressions:
+        print("No regressions against the baseline.")
+        return 0
+    print(f"{len(regressions)} regression(s) against the baseline:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+# Command line ----------------------------------------------------------------
+
+def _seed(args) -> int:
+    from backend.core.database import SessionLocal, engine, init_db
+
+    engine.echo = False  # one log line per inserted batch is noise here
+    if args.create_tables:
+        init_db()
+    manifest = seed_dataset(SessionLocal, SIZES[args.size], seed=args.seed)
+    with open(args.manifest, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    print(f"Seeded {json.dumps(manifest['counts'])}; manifest written to {args.manifest}")
+    return 0
+
+
+def _run(args) -> int:
+    with open(args.manifest) as fh:
+        manifest = json.load(fh)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async def run() -> dict:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            return await run_suite(client, manifest, args.requests, args.concurrency, args.warmup,
+                                   args.checkout_rps, args.checkout_duration)
+
+    results = asyncio.run(run())
+    with open(args.out, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(format_results(results))
+    print(f"Results written to {args.out}")
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    return _report_regressions(compare(baseline, results, *load_thresholds(args.thresholds, _thresholds(args))))
+
+
+def _compare(args) -> int:
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+    return _report_regressions(compare(baseline, current, *load_thresholds(args.thresholds, _thresholds(args))))
+
+
+def _thresholds(args) -> Thresholds:
+    return Thresholds(**{f.name: getattr(args, f.name) for f in fields(Thresholds)})
+
+
+def _add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = asdict(Thresholds())
+    parser.add_argument("--thresholds", help="JSON file with default and per-scenario thresholds")
+    parser.add_argument("--p95-pct", type=float, default=defaults["p95_pct"], help="Allowed p95 growth in percent")
+    parser.add_argument("--min-ms", type=float, default=defaults["min_ms"], help="Ignore p95 growth below this")
+    parser.add_argument("--rps-pct", type=float, default=defaults["rps_pct"], help="Allowed throughput drop in percent")
+    parser.add_argument("--error-rate", type=float, default=defaults["error_rate"], help="Allowed error rate growth")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pages and APIs against a seeded dataset.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Seed the database at DATABASE_URL (a scratch database)")
+    seed.add_argument("--size", choices=sorted(SIZES), default="small")
+    seed.add_argument("--seed", type=int, default=1)
+    seed.add_argument("--create-tables", action="store_true", help="Create the schema first")
+    seed.add_argument("--manifest", default="bench-dataset.json")
+    seed.set_defaults(handler=_seed)
+
+    run = commands.add_parser("run", help="Run the suite against a running app")
+    run.add_argument("--base-url", default="http://localhost:8002")
+    run.add_argument("--manifest", default="bench-dataset.json")
+    run.add_argument("--out", default="bench-results.json")
+    run.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--warmup", type=int, default=5, help="Unmeasured requests before each scenario")
+    run.add_argument("--checkout-rps", type=float, default=0.0, help="Checkouts started per second (0: skip)")
+    run.add_argument("--checkout-duration", type=float, default=10.0)
+    run.add_argument("--timeout", type=float, default=30.0)
+    run.add_argument("--baseline", help="Results file to compare against")
+    _add_threshold_arguments(run)
+    run.set_defaults(handler=_run)
+
+    compare_ = commands.add_parser("compare", help="Compare two results files")
+    compare_.add_argument("baseline")
+    compare_.add_argument("current")
+    _add_threshold_arguments(compare_)
+    compare_.set_defaults(handler=_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,15 @@ from fastapi.middleware.wsgi import WSGIMiddleware
 from starlette.middleware.sessions import SessionMiddleware # Import SessionMiddleware
 import uvicorn
 import uvicorn
-from backend.middleware import blacklist_middleware
-from backend.routers import api_router, pages_router
+from backend.middleware import BlacklistMiddleware, MetricsMiddleware
+from backend.routers import api_router, pages_router, media_router, metrics_router
 from backend.services.social_scheduler import start_scheduler
+from backend.services.social_platforms import close_platform_clients
+from backend.services.platform_media import shutdown_media_pool
+from backend.services.media_store import start_media_gc
+from backend.services.paystack_service import close_paystack_client, start_paystack_client
+from backend.services.paystack_webhooks import start_webhook_worker
+from backend.services.payment_reconciler import start_payment_reconciler, stop_payment_reconciler
 from backend.core.database import init_db
 
 logging.basicConfig(
@@ -54,7 +60,9 @@ app.add_middleware(
 
 # Add Session Middleware
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY) # Add Session Middleware
-app.middleware("http")(blacklist_middleware)
+app.add_middleware(BlacklistMiddleware)
+# Outermost, so request metrics include the time spent in the other middleware.
+app.add_middleware(MetricsMiddleware)
 # Mount static folder for CSS/JS
 static_folder_path = os.path.join(os.path.dirname(__file__), "frontend", "static")
 app.mount("/static", StaticFiles(directory=static_folder_path), name="static")
@@ -67,12 +75,36 @@ app.include_router(api_router, prefix="/api")
 # Include the pages router for frontend routes
 app.include_router(pages_router)
 
+# Include the media router (thumbnails and other derived media)
+app.include_router(media_router)
+
+# Prometheus metrics
+app.include_router(metrics_router)
+
 
 @app.on_event("startup")
 def start_background_tasks() -> None:
     """Start recurring schedulers."""
     init_db()
     start_scheduler()
+    start_media_gc()
+    start_webhook_worker()
+
+
+@app.on_event("startup")
+async def start_http_clients() -> None:
+    """Open pooled connections to external APIs and start jobs that use them."""
+    await start_paystack_client()
+    start_payment_reconciler()
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    """Stop jobs using external APIs and close pooled connections."""
+    await stop_payment_reconciler()
+    await close_paystack_client()
+    close_platform_clients()
+    shutdown_media_pool()
 
 
 